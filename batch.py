@@ -0,0 +1,130 @@
+"""
+Runs levels headlessly across a process pool, optionally over a grid of physics parameters, and writes one CSV row per
+run as each finishes.
+
+    python batch.py                                   every level once, with no input
+    python batch.py -l 2 3 --script climb.txt         levels 2 and 3 flown by a script
+    python batch.py --set gravity=10,15,20 --set drag=1,1.15 --set Steel.kinetic=0.1,0.133 -o sweep.csv
+
+Parameters that can be swept:
+    gravity, airdensity      override the level's constants.csv
+    drag                     PLAYER_DRAG_COEFFICIENT
+    <Material>.static        static friction coefficient of a material in MATERIALS, e.g. Asphalt.static
+    <Material>.kinetic       kinetic friction coefficient, e.g. Steel.kinetic
+
+A script file lists what to hold and for how long, one segment per line, e.g. "400,thrust+left". The keys are thrust,
+reverse, left and right, or nothing to coast. Once the script runs out nothing is held.
+"""
+import os, sys, csv, bisect, argparse, itertools, multiprocessing
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import physics
+from constants import PHYSICS_RATE
+from sim import Simulation, Inputs
+
+FIELDS = ["level", "objectives met", "objectives", "time", "collisions", "fuel left", "score", "completed", "failed"]
+
+defaults = {} # Parameter name -> value before any run changed it; each worker process has its own copy
+
+def readScript(path):
+    """:return: List of (steps, Inputs) segments"""
+    segments = []
+    with open(path, "r") as file:
+        for row in csv.reader(file):
+            if not row or row[0].startswith("#"):
+                continue
+            keys = set(row[1].split("+")) if len(row) > 1 and row[1] else set()
+            unknown = keys - {"thrust", "reverse", "left", "right"}
+            if unknown:
+                raise ValueError(f"Unknown keys in {path}: {', '.join(sorted(unknown))}")
+            segments.append((int(row[0]), Inputs("thrust" in keys, "reverse" in keys, "left" in keys, "right" in keys)))
+    return segments
+
+def scriptInputs(segments):
+    """:return: A function giving the Inputs for a step number, for Simulation.Run()"""
+    ends = list(itertools.accumulate(steps for steps, _ in segments))
+    held = [inputs for _, inputs in segments] + [Inputs()]
+    return lambda step: held[bisect.bisect_right(ends, step)]
+
+def parseGrid(settings):
+    """
+    :param settings: Strings of the form "name=value,value,..."
+    :return: List of dictionaries, one for every combination of the values
+    """
+    names, values = [], []
+    for setting in settings:
+        name, _, options = setting.partition("=")
+        if not options:
+            raise ValueError(f"Expected name=value,value,... but got {setting}")
+        material, _, kind = name.partition(".")
+        if name not in ("gravity", "airdensity", "drag") and (material not in physics.MATERIALS or kind not in ("static", "kinetic")):
+            raise ValueError(f"Unknown parameter {name}")
+        names.append(name)
+        values.append([float(x) for x in options.split(",")])
+    return [dict(zip(names, combination)) for combination in itertools.product(*values)]
+
+def applyParameters(parameters):
+    """Sets the module level parameters for a run, putting back the defaults of any the run doesn't set"""
+    if not defaults:
+        defaults["drag"] = physics.PLAYER_DRAG_COEFFICIENT
+        for name, material in physics.MATERIALS.items():
+            defaults[f"{name}.static"], defaults[f"{name}.kinetic"] = material.static, material.kinetic
+    for name, default in defaults.items():
+        value = parameters.get(name, default)
+        if name == "drag":
+            physics.PLAYER_DRAG_COEFFICIENT = value # Read by Player.__init__
+        else:
+            material, _, kind = name.partition(".")
+            setattr(physics.MATERIALS[material], kind, value) # Colliders share these, so it has to be set before loading
+
+def run(task):
+    """
+    Simulates one level with one set of parameters; called in a worker process.
+
+    :param task: (level, parameters, script segments, most steps to run)
+    :return: Dictionary of the run's outcome
+    """
+    level, parameters, segments, steps = task
+    applyParameters(parameters)
+    simulation = Simulation(level)
+    for name in ("gravity", "airdensity"):
+        if name in parameters:
+            simulation.constants[name] = parameters[name]
+    simulation.Run(scriptInputs(segments), steps)
+    score, _ = simulation.Score()
+    result = {"level": level, "objectives met": simulation.ObjectivesMet(), "objectives": len(simulation.objectives),
+              "time": round(simulation.time, 3), "collisions": simulation.player.collisions,
+              "fuel left": round(simulation.FuelFraction(), 4), "score": score,
+              "completed": simulation.completed, "failed": simulation.failed}
+    result.update(parameters)
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run levels headlessly in parallel and record how each run ends")
+    parser.add_argument("-l", "--levels", nargs="+", help="Levels to run (default: every level)")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=V1,V2,...",
+                        help="Parameter values to sweep; every combination of every --set is run")
+    parser.add_argument("--script", help="Input script to fly every run with (default: hold nothing)")
+    parser.add_argument("--seconds", type=float, default=60, help="Simulated seconds before a run is stopped")
+    parser.add_argument("-j", "--processes", type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument("-o", "--output", default="batch.csv", help="Where to write the results")
+    args = parser.parse_args(argv)
+
+    levels = args.levels or sorted(os.listdir("levels"), key=int)
+    grid = parseGrid(args.set)
+    segments = readScript(args.script) if args.script else []
+    steps = int(args.seconds * PHYSICS_RATE)
+    tasks = [(level, parameters, segments, steps) for level in levels for parameters in grid]
+
+    context = multiprocessing.get_context("spawn") # Workers start clean instead of inheriting this process's SDL state
+    with open(args.output, "w", newline="") as file, context.Pool(args.processes) as pool:
+        writer = csv.DictWriter(file, FIELDS + list(grid[0]))
+        writer.writeheader()
+        for i, result in enumerate(pool.imap_unordered(run, tasks)): # Each run is written as soon as it finishes
+            writer.writerow(result)
+            file.flush()
+            print(f"{i + 1}/{len(tasks)} level {result['level']}: score {result['score']}", file=sys.stderr)
+        pool.close() # Let the workers exit on their own rather than being terminated on the way out
+        pool.join()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Vec2 and identity() exactly as they were in physics.py before Vec2 was slotted and given in-place operators, kept so
+benchmarks/vectors.py can measure the old class against the current one.
+"""
+import math
+
+def identity(n):
+    """Returns the normalised version of the vector or number that is input. E.g: (-500, 0) becomes (-1,0)"""
+    if isinstance(n, Vec2):
+        return n.noErrorDiv(abs(n))
+    if n != 0:
+        return n / abs(n)
+    else:
+        return n
+
+class Vec2:
+    def __init__(self, *args):
+        if len(args) == 1 and (isinstance(args[0], tuple) or isinstance(args[0], list)):
+            self.x, self.y = args[0]
+        elif len(args) == 2:
+            self.x, self.y = args[0], args[1]
+    def __abs__(self):
+        return Vec2(abs(self.x), abs(self.y))
+    def __add__(self, n):
+        if isinstance(n, Vec2):
+            return Vec2(self.x + n.x, self.y + n.y)
+        return Vec2(self.x + n, self.y + n)
+    def __radd__(self, n):
+        return self + n
+    def __sub__(self, n):
+        if isinstance(n, Vec2):
+            return Vec2(self.x - n.x, self.y - n.y)
+        return Vec2(self.x - n, self.y - n)
+    def __eq__(self, v2):
+        return self.x == v2.x and self.y == v2.y
+    def __mul__(self, n):
+        if isinstance(n, Vec2):
+            return Vec2(self.x * n.x, self.y * n.y)
+        return Vec2(self.x * n, self.y * n)
+    def __rmul__(self, n):
+        return self * n
+    def __truediv__(self, n):
+        if isinstance(n, Vec2):
+            return Vec2(self.x / n.x, self.y / n.y)
+        return Vec2(self.x / n, self.y / n)
+    def __floordiv__(self, n):
+        if isinstance(n, Vec2):
+            return Vec2(self.x // n.x, self.y // n.y)
+        return Vec2(self.x // n, self.y // n)
+    def __pow__(self, pow):
+        return Vec2(self.x ** pow, self.y ** pow)
+    def __str__(self):
+        return f"{str(self.x)}, {str(self.y)}"
+    def __round__(self, n):
+        return Vec2(round(self.x, n), round(self.y, n))
+    def __iter__(self):
+        yield self.x
+        yield self.y
+    def Integer(self):
+        return Vec2(int(self.x), int(self.y))
+    def Set(self, x, y):
+        self.x, self.y = x, y
+    def SetX(self, x):
+        self.x = x
+    def GetX(self):
+        return self.x
+    def SetY(self, y):
+        self.y = y
+    def GetY(self):
+        return self.y
+    def SetVec2(self, v2):
+        self.x, self.y = v2.x, v2.y
+    def GetSqrMag(self):
+        return self.x ** 2 + self.y ** 2
+    def GetMag(self):
+        return math.sqrt(self.x ** 2 + self.y ** 2)
+    def GetNormalized(self):
+        mag = self.GetMag()
+        return self.noErrorDiv(mag)
+    def Inverse(self):
+        return self * -1
+    def noErrorDiv(self, n):
+        new = Vec2(0, 0)
+        if isinstance(n, Vec2):
+            new.x = self.x / n.x if n.x != 0 else 0
+            new.y = self.y / n.y if n.y != 0 else 0
+            return new
+        else:
+            new = self / n if n != 0 else 0
+            return new
@@ -0,0 +1,103 @@
+"""
+Microbenchmark for the Vec2 operations used in the physics loop.
+
+The Vec2 class and identity() from before the slotting change (benchmarks/vec2_baseline.py, a verbatim copy) are run
+against the current ones from physics.py. Every case runs the same statement on both, timed with timeit and run once
+more while counting how many vectors it constructs per operation. In-place statements such as v += a * dt only add in
+place on the current class; the old one falls back to __add__ and rebinds v, which is the cost being compared. The
+memory used by one vector is measured with tracemalloc for each class.
+
+Run from the repository root:  python benchmarks/vectors.py
+"""
+import os, sys, timeit, tracemalloc
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import physics
+import vec2_baseline
+
+NUMBER = 200000
+created = 0
+
+def counting(init):
+    def wrapped(self, *args):
+        global created
+        created += 1
+        init(self, *args)
+    return wrapped
+
+def vectorsPerOp(cls, fn, n=1000):
+    """:return: Average number of vectors of class cls constructed per call of fn"""
+    global created
+    init = cls.__init__
+    cls.__init__ = counting(init)
+    created = 0
+    try:
+        for _ in range(n):
+            fn()
+    finally:
+        cls.__init__ = init
+    return created / n
+
+def bytesPerVector(cls, n=10000):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [cls(1.5, 2.5) for _ in range(n)]
+    for v in kept:
+        v.x # Touch each one, which is when the __dict__ of an unslotted instance gets filled in
+    size = (tracemalloc.get_traced_memory()[0] - before) / n
+    tracemalloc.stop()
+    return size
+
+def cases(module):
+    """:return: (name, function) for every case, working on vectors of the given module's Vec2"""
+    Vec2, identity = module.Vec2, module.identity
+    dt = 1 / 200
+    state = {"pos": Vec2(10, 20), "velocity": Vec2(3, -4)}
+    acceleration = Vec2(0, 15)
+    def integrate():
+        state["velocity"] = state["velocity"] + acceleration * dt
+        state["pos"] = state["pos"] + state["velocity"] * dt
+    def integrateInPlace():
+        velocity = state["velocity"]
+        velocity += acceleration * dt
+        pos = state["pos"]
+        pos += velocity * dt
+        state["velocity"], state["pos"] = velocity, pos
+    def add():
+        state["pos"] = state["pos"] + acceleration
+    def addInPlace():
+        pos = state["pos"]
+        pos += acceleration
+        state["pos"] = pos
+    velocity = Vec2(3, -4)
+    return [
+        ("construct", lambda: Vec2(1.5, 2.5)),
+        ("integrate v = v + a*dt, p = p + v*dt", integrate),
+        ("integrate v += a*dt, p += v*dt", integrateInPlace),
+        ("add p = p + v", add),
+        ("add p += v", addInPlace),
+        ("negligible check round(v, 1)", lambda: round(velocity, 1) != Vec2(0, 0)),
+        ("noErrorDiv(abs(v))", lambda: velocity.noErrorDiv(abs(velocity))),
+        ("identity(v)", lambda: identity(velocity)),
+        ("GetNormalized()", lambda: velocity.GetNormalized()),
+    ]
+
+def main():
+    print(f"Memory per vector: {bytesPerVector(vec2_baseline.Vec2):.0f} bytes before, "
+          f"{bytesPerVector(physics.Vec2):.0f} bytes after")
+    print(f"    {'':<38} {'before':>22} {'after':>22}")
+    for (name, before), (_, after) in zip(cases(vec2_baseline), cases(physics)):
+        results = []
+        for module, fn in ((vec2_baseline, before), (physics, after)):
+            ns = timeit.timeit(fn, number=NUMBER) / NUMBER * 1e9
+            results.append(f"{ns:>8.1f} ns {vectorsPerOp(module.Vec2, fn):>4.1f} vec")
+        print(f"    {name:<38} {results[0]:>22} {results[1]:>22}")
+
+    # The scaled add has no equivalent on the old class, so it's only timed for the current one
+    velocity, acceleration = physics.Vec2(3, -4), physics.Vec2(0, 15)
+    fn = lambda: velocity.AddScaled(acceleration, 1 / 200)
+    ns = timeit.timeit(fn, number=NUMBER) / NUMBER * 1e9
+    print(f"    {'v.AddScaled(a, dt) (after only)':<38} {'':>22} {ns:>8.1f} ns {vectorsPerOp(physics.Vec2, fn):>4.1f} vec")
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-import pygame, math, os
+import pygame, math, os, struct
 
 DEBUG = False
 DEBUG_LEVEL = 1
@@ -27,16 +27,21 @@ EXO = os.path.join("assets", "fonts", "Exo2-Regular.otf")
 WINDOW_SIZE = (1600, 900)
 WINDOW_CENTRE = (WINDOW_SIZE[0] // 2, WINDOW_SIZE[1] // 2)
 swidth, sheight = WINDOW_SIZE
-FPS = 200
+FPS = 120 # Frame rate cap for drawing
+IDLE_TIMEOUT = 1000 # Longest a menu with nothing moving waits for input before running a frame anyway, in milliseconds
+PHYSICS_RATE = 200 # Simulation steps per second, independent of the frame rate
+MAX_CATCHUP_STEPS = 8 # Most simulation steps run in one frame; any time beyond that is dropped rather than caught up
 
-screen = pygame.display.set_mode(WINDOW_SIZE, 0, 32)
-
-player_image = pygame.image.load("assets/sprites/character.png").convert_alpha()
-ball_image = pygame.image.load("assets/sprites/ball.png").convert_alpha()
-ball_image_white = pygame.image.load("assets/sprites/ball_white.png").convert_alpha()
-ball_image_orange = pygame.image.load("assets/sprites/ball_orange.png").convert_alpha()
+PLAYER_SPRITE = os.path.join("assets", "sprites", "character.png")
+BALL_SPRITE = os.path.join("assets", "sprites", "ball.png")
+BALL_SPRITE_WHITE = os.path.join("assets", "sprites", "ball_white.png")
+BALL_SPRITE_ORANGE = os.path.join("assets", "sprites", "ball_orange.png")
 
 RAD = math.pi / 180
+ROTATION_STEP = 1 # Degrees between the cached rotations of a sprite; 0 rotates to the exact angle every time
+ROTATION_CACHE_SIZE = 720 # Most rotated sprites kept in memory
+TEXT_CACHE_SIZE = 512 # Most rendered strings kept in memory
+ASSET_CACHE_BUDGET = 256 * 1024 * 1024 # Most bytes of decoded images kept in memory
 
 GRAVITYON = True
 GRAVITY = 15
@@ -46,8 +51,28 @@ SPHERE_DRAG_COEFFICIENT = 0.5
 PLAYER_ROTATION_SPEED = 100
 
 AIRSTREAM_PARTICLENUM = 50
+PARTICLE_CAPACITY = 20000 # Most particles alive at once; new ones are dropped while the pool is full
+COLLISION_MASK_CELL = 2 # Cell size in pixels of the static geometry mask particles collide against
+
+SPATIAL_CELL_SIZE = 128 # Cell size in pixels of the collision broadphase grid
+CCD = False # Continuous collision detection; stops fast bodies tunnelling through thin colliders when dt is large
+CCD_ITERATIONS = 4 # Most contacts resolved in a single move
+SLEEP_TIME = 1 # Seconds a body has to stay at rest before it sleeps and stops being stepped; 0 never sleeps bodies
+SLEEP_VELOCITY = 0.01 # Speed in m/s below which a body counts as at rest
+SLEEP_FORCE = 0.1 # Resultant force in N below which a body counts as at rest
+PREVIEW_SECONDS = 2 # How far ahead the player's trajectory preview looks
+PREVIEW_BUDGET = 0.001 # Most seconds per frame spent extending the preview; the rest is done on later frames
+PREVIEW_TOLERANCE = 0.5 # Pixels the player can stray from the preview before it is worked out again
+
+def imageSize(path):
+    """:return: (width, height) of an image file; PNG headers are read directly, anything else is decoded"""
+    with open(path, "rb") as file:
+        header = file.read(24)
+    if header[:8] == b"\x89PNG\r\n\x1a\n":
+        return struct.unpack(">II", header[16:24])
+    return pygame.image.load(path).get_size()
 
-METRE = player_image.get_height() * (1 / 1.7)
+METRE = imageSize(PLAYER_SPRITE)[1] * (1 / 1.7) # The player is 1.7m tall
 
 SCOREBASE = 10000
 HITPENALTY = 500
@@ -0,0 +1,122 @@
+"""
+Everything that needs a window. Importing this opens the game's display and loads the sprites that are converted to
+its pixel format, so only the interactive game should import it; the simulation itself runs without it.
+"""
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import pygame
+from constants import *
+
+screen = pygame.display.set_mode(WINDOW_SIZE, 0, 32)
+pygame.display.set_caption("Physics")
+
+class AssetCache:
+    def __init__(self, budget=ASSET_CACHE_BUDGET):
+        """
+        Decodes and converts each image file once and hands the same surface to everything that loads it, so it must
+        not be drawn onto; copy it first.
+
+        :param int budget: Most bytes of pixel data kept; the least recently used images are dropped first
+        """
+        self.budget = budget
+        self.surfaces = OrderedDict() # (path, alpha) -> Surface, oldest first
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.pending = {} # path -> (Future of the decoded image, bytes it will take), for images Preload() has asked for
+        self.pendingBytes = 0 # Counted against the budget along with the loaded images
+        self.lock = threading.Lock() # Guards pending, which PreloadFrom() changes from the worker thread
+        self.worker = ThreadPoolExecutor(1, "assets")
+    @staticmethod
+    def Size(surface):
+        """:return: Bytes of pixel data the surface holds"""
+        return surface.get_pitch() * surface.get_height()
+    def Load(self, path, alpha=True):
+        """
+        :param path: Image file
+        :param bool alpha: Keep per pixel transparency (convert_alpha) or not (convert, which blits faster)
+        :return: The surface in the screen's pixel format
+        """
+        key = (path, alpha)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            self.misses += 1
+            with self.lock:
+                future, size = self.pending.pop(path, (None, 0))
+                self.pendingBytes -= size
+            image = future.result() if future is not None else pygame.image.load(path) # Waits if still decoding
+            surface = self.surfaces[key] = image.convert_alpha() if alpha else image.convert()
+            self.bytes += self.Size(surface)
+            while self.bytes + self.pendingBytes > self.budget and len(self.surfaces) > 1: # Anything still using a dropped image keeps it
+                _, dropped = self.surfaces.popitem(last=False)
+                self.bytes -= self.Size(dropped)
+        else:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+        return surface
+    def Preload(self, paths):
+        """
+        Starts decoding images on a worker thread, so that loading them later only has to convert the pixels to the
+        screen's format. Converting is left to Load() on the main thread, which owns the display.
+
+        Each call replaces the last: images asked for before that aren't in paths are cancelled, or dropped if already
+        decoded. Decoded images waiting for Load() count against the budget at the size their file header gives, and
+        any that wouldn't fit aren't preloaded.
+
+        :param paths: Image files
+        """
+        paths = list(paths)
+        sizes = {path: imageSize(path) for path in paths} # Read before taking the lock, so Load() never waits on disk
+        with self.lock:
+            for path in [x for x in self.pending if x not in paths]:
+                future, size = self.pending.pop(path)
+                future.cancel() # One that has already started finishes, and its result is thrown away
+                self.pendingBytes -= size
+            for path in paths:
+                if path in self.pending or (path, True) in self.surfaces or (path, False) in self.surfaces:
+                    continue
+                width, height = sizes[path]
+                size = width * height * 4 # Decoded pixels are 32 bit
+                if self.bytes + self.pendingBytes + size > self.budget:
+                    continue
+                self.pending[path] = (self.worker.submit(pygame.image.load, path), size)
+                self.pendingBytes += size
+    def PreloadFrom(self, getPaths):
+        """
+        Preload(), but the paths are found on the worker thread too, for when finding them is slow itself.
+
+        :param getPaths: Function returning the image files
+        """
+        self.worker.submit(lambda: self.Preload(getPaths()))
+    def Clear(self):
+        self.Preload([])
+        self.surfaces.clear()
+        self.bytes = self.hits = self.misses = 0
+    def __len__(self):
+        return len(self.surfaces)
+
+assets = AssetCache()
+
+def loadSprite(path):
+    """Image loader for level_load() that produces surfaces ready to be drawn to the screen"""
+    return assets.Load(path)
+
+player_image = loadSprite(PLAYER_SPRITE)
+ball_image = loadSprite(BALL_SPRITE)
+ball_image_white = loadSprite(BALL_SPRITE_WHITE)
+ball_image_orange = loadSprite(BALL_SPRITE_ORANGE)
+
+def blitVisible(surface, layer, offset):
+    """
+    Blits only the part of a large layer that lands on the surface, so the cost depends on the window size rather
+    than the layer's.
+
+    :param surface: Where to draw
+    :param layer: The layer, e.g. a whole level
+    :param offset: Where the layer's top left corner is on the surface
+    """
+    x, y = int(offset[0]), int(offset[1])
+    left, top = max(0, -x), max(0, -y) # The first row and column of the layer that are on screen
+    area = pygame.Rect(left, top, surface.get_width() - (left + x), surface.get_height() - (top + y))
+    surface.blit(layer, (left + x, top + y), area)
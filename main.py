@@ -1,21 +1,24 @@
 from physics import *
 from constants import *
+from display import *
+from scheduler import FixedStep
+from text import getFont, textCache
+from sim import Simulation, Inputs, Recording, Trajectory, level_images, level_score
 import os, csv
 
-largeBoldMenu = pygame.font.Font(QUALY, 100)
-slightlylargeBold = pygame.font.Font(EXO, 75)
-mediumText = pygame.font.Font(EXO, 50)
-mediumSmallText = pygame.font.Font(EXO, 30)
-smallText = pygame.font.Font(EXO, 20)
-mediumMenu = pygame.font.Font(EXO, 28)
-hudFont = pygame.font.Font(UNISPACE, 30)
+largeBoldMenu = getFont(QUALY, 100)
+slightlylargeBold = getFont(EXO, 75)
+mediumText = getFont(EXO, 50)
+mediumSmallText = getFont(EXO, 30)
+smallText = getFont(EXO, 20)
+mediumMenu = getFont(EXO, 28)
+hudFont = getFont(UNISPACE, 30)
 
 def getCameraTrack(player, lpos, lwidth, lheight):
     """
-    :param pos: The position of the player
-    :type pos: Vec2
-    :param lpos: The position of the level background
-    :type lpos: Vec2
+    :param player: The player, whose position is in world coordinates
+    :param lpos: The camera offset: where the level's top left corner is on the screen
+    :type lpos: list
     :param lwidth: The width of the level
     :type lwidth: int
     :param lheight: The height of the level
@@ -23,7 +26,7 @@ def getCameraTrack(player, lpos, lwidth, lheight):
     :return: The new level position required to move the "camera" accordingly with the player.
     """
     x, y = player.GetPos()
-    playerRect = player.GetRect()
+    playerRect = player.GetRect().move(lpos) # Where the player is on the screen
     swidth, sheight = WINDOW_SIZE # Screen width and height
     halfw, halfh = swidth / 2, sheight / 2
     maxWidthOffset = lwidth - swidth # The maximum width and height the level can move before the image ends
@@ -39,6 +42,7 @@ def getCameraTrack(player, lpos, lwidth, lheight):
         ideal = ideal - diff
         return [int(a) for a in ideal.Inverse()]
 
+    x, y = x + lpos[0], y + lpos[1] # Everything below works in screen coordinates
     if x + halfw > swidth and lpos[0] > -maxWidthOffset:
         difference = x + halfw - swidth
         newlpos[0] = lpos[0] - difference
@@ -54,108 +58,28 @@ def getCameraTrack(player, lpos, lwidth, lheight):
         newlpos[1] = lpos[1] - difference
     return [int(a) for a in newlpos]
 
-def level_load(level):
-    ## All level info stored as a dictionary
-    level = str(level)
-    info = {
-        "background": os.path.join("levels", level, "background.png"),
-        "world": [],
-        "objects": [],
-        "objectives": [],
-        "obstacles": [],
-        "hazards": [],
-        "constants": {"gravity": None, "airdensity": None},
-        "player": None
-    }
-    ## LOADING WORLD COLLIDERS ##
-    with open(os.path.join("levels", level, "world.csv"), "r") as file:
-        reader = csv.reader(file)
-        for row in reader:
-            objInfo = list(map(int, row[0:4])) # Convert all coordinate values for the rect into integers
-            if len(row) == 5:
-                info["world"] = info["world"] + [
-                    WorldCollider(pygame.Rect(objInfo[0], objInfo[1], objInfo[2], objInfo[3]), objInfo[4])]
-            else:
-                info["world"] = info["world"] + [WorldCollider(pygame.Rect(objInfo[0], objInfo[1], objInfo[2], objInfo[3]))]
-
-    ## LOADING PHYSICS OBJECTS (Regular) ##
-    with open(os.path.join("levels", level, "objects.csv"), "r") as file:
-        reader = csv.reader(file)
-        for i, row in enumerate(reader):
-            pos = tuple(map(int, row[0:2]))
-            physInfo = list(map(float, row[3:5])) + [float(row[5])]  # Convert all physInfo to floats and bool types
-            info["objects"] = info["objects"] + [PhysObject(pos, pygame.image.load(row[2]).convert_alpha(),
-                                                                physInfo[0], physInfo[1], physInfo[2])]
-
-    ## LOADING THE PLAYER ##
-    with open(os.path.join("levels", level, "player.csv"), "r") as file:
-        reader = csv.reader(file)
-        for row in reader:
-            pos = tuple(map(int, row[0:2]))
-            info["player"] = Player(pos, player_image, float(row[2]), float(row[3]), float(row[4]),bool(row[5]))
-
-    ## LOADING LEVEL OBJECTIVES ##
-    with open(os.path.join("levels", level, "objectives.csv"), "r") as file:
-        reader = csv.reader(file)
-        for row in reader:
-            if row[0] == "PLAYER":
-                objInfo = list(map(int, row[1:]))
-                info["objectives"] = info["objectives"] + [PlayerObjective(Vec2(objInfo[0], objInfo[1]), objInfo[2], objInfo[3])]
-            elif row[0] == "PHYS":
-                objInfo = list(map(int, row[1:]))
-                info["objectives"] = info["objectives"] + [PhysObjective(Vec2(objInfo[0], objInfo[1]), objInfo[2], objInfo[3])]
-            elif row[0] == "OBJECT":
-                pos = tuple(map(int, row[1:3]))
-                conv = list(map(float, row[4:]))
-                colour = tuple(conv[1:4])
-                info["objects"] = info["objects"] + [KeyObject(pos, pygame.image.load(row[3]).convert_alpha(), conv[0],
-                                                               colour, conv[-2], conv[-1])]
-
-    ## LOADING OBSTACLES ##
-    with open(os.path.join("levels", level, "obstacles.csv"), "r") as file:
-        reader = csv.reader(file)
-        for row in reader:
-            objInfo = list(map(int, row))  # Convert all coordinate values for the rect into integers
-            pos = Vec2(objInfo[0], objInfo[1])
-            info["obstacles"] = info["obstacles"] + [Obstacle(pos, objInfo[2], objInfo[3], info["player"])]
-
-    ## LOADING HAZARDS (AIRSTREAMS) ##
-    with open(os.path.join("levels", level, "hazards.csv"), "r") as file:
-        reader = csv.reader(file)
-        for row in reader:
-            objInfo = list(map(int, row))  # Convert all coordinate values for the rect into integers
-            pos = Vec2(objInfo[0], objInfo[1])
-            force = Vec2(objInfo[-2], objInfo[-1])
-            info["hazards"] = info["hazards"] + [AirStream(pos, objInfo[2], objInfo[3], objInfo[4], objInfo[5], force)]
-
-    with open(os.path.join("levels", level, "constants.csv"), "r") as file:
-        reader = csv.reader(file)
-        temp = []
-        for row in reader:  # Convert all coordinate values for the rect into integers
-            temp.append(float(row[0]))
-        info["constants"]["gravity"] = temp[0]
-        info["constants"]["airdensity"] = temp[1]
-    return info
-
 def gameInit(levelnum, stateobj):
-    gameData = level_load(levelnum)
-    background, world, objects, objectives, obstacles, hazards, player, constants = gameData["background"], gameData[
-        "world"], gameData["objects"], gameData["objectives"], gameData["obstacles"], gameData["hazards"], \
-        gameData["player"], gameData["constants"]
-    return Game(stateobj, background, world, objects, player, objectives, obstacles, hazards, constants, levelnum)
+    return Game(stateobj, Simulation(levelnum, loadSprite), levelnum)
+
+def preloadLevel(*levelnums):
+    """
+    Gets levels ready to start without a pause while the current screen keeps running: their data is compiled if the
+    CSVs have changed and their images are decoded, both in the background. Replaces any earlier preloading.
+    """
+    levels = [x for x in levelnums if os.path.isdir(os.path.join("levels", str(x)))]
+    assets.PreloadFrom(lambda: [path for level in levels for path in level_images(level)])
 
 
 
 class Timer:
     def __init__(self, pos, active=True):
         self.pos = pos
-        self.epoch = time.time()
         self.formattedTime = ""
         self.elapsed = 0
         self.active = active
-    def Update(self):
+    def Update(self, dt):
         if self.active:
-            self.elapsed = time.time() - self.epoch
+            self.elapsed += dt # Counts simulated time, so the result doesn't depend on how fast frames are drawn
             minutes = int(self.elapsed // 60)
             secondsRemaining = int(self.elapsed - minutes * 60)
             self.formattedTime = f"{'0' if minutes < 10 else ''}{str(minutes)}:{'0' if secondsRemaining < 10 else ''}{str(secondsRemaining)}"
@@ -165,18 +89,37 @@ class Timer:
         secondsRemaining = int(sec - minutes * 60)
         return f"{'0' if minutes < 10 else ''}{str(minutes)}:{'0' if secondsRemaining < 10 else ''}{str(secondsRemaining)}"
     def Draw(self):
-        render_time = hudFont.render(self.formattedTime, True, WHITE)
-        screen.blit(render_time, self.pos)
+        render_time = textCache.Render(hudFont, self.formattedTime, WHITE)
+        return screen.blit(render_time, self.pos)
     def GetTime(self):
         return self.elapsed
 
+def waitEvents(idle):
+    """
+    :param bool idle: Whether nothing on screen changes until the user does something. If so, this sleeps until an
+                      event arrives (or IDLE_TIMEOUT passes) instead of letting the loop spin at the frame rate.
+    :return: The pending events
+    """
+    events = []
+    if idle:
+        event = pygame.event.wait(IDLE_TIMEOUT)
+        if event.type != pygame.NOEVENT:
+            events.append(event)
+        clock.tick() # The time spent waiting isn't frame time, so don't let the next dt include it
+    events += pygame.event.get()
+    for event in events:
+        if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+            pygame.display.update() # The window was covered; the screen surface still holds the whole frame
+    return events
+
 class State:
     def __init__(self, newstate):
         self.state = newstate
     def newstate(self, newstate):
         self.state = newstate
     def RunFrame(self, dt):
-        self.state.RunFrame(dt)
+        """:return: The parts of the screen that changed this frame"""
+        return self.state.RunFrame(dt)
 
 class MenuButton:
     def __init__(self, text, pos, width=swidth/2, height=50):
@@ -186,14 +129,26 @@ class MenuButton:
         self.buttonTextRect = self.buttonText.get_rect()
         self.buttonTextRect.center = self.buttonRect.center
         self.enabled = True
+        self.hovered = None # Whether the mouse was over the button when it was last drawn
     def Draw(self):
         if self.enabled:
-            if self.buttonRect.collidepoint(pygame.mouse.get_pos()):
+            self.hovered = self.buttonRect.collidepoint(pygame.mouse.get_pos())
+            if self.hovered:
                 pygame.draw.rect(screen, GREY, self.buttonRect, 0, 7)
             else:
                 pygame.draw.rect(screen, NEARLYBLACK, self.buttonRect, 0, 7)
             pygame.draw.rect(screen, BLACK, self.buttonRect, 3, 7)
             screen.blit(self.buttonText, self.buttonTextRect)
+    def Refresh(self):
+        """
+        Redraws the button if the mouse has moved on or off it since it was last drawn.
+
+        :return: The button's rect if it was redrawn, otherwise None
+        """
+        if self.enabled and self.buttonRect.collidepoint(pygame.mouse.get_pos()) != self.hovered:
+            self.Draw()
+            return self.buttonRect
+        return None
     def collide(self, mousePos):
         return self.buttonRect.collidepoint(mousePos)
     def setEnabled(self, val):
@@ -201,6 +156,10 @@ class MenuButton:
     def GetRect(self):
         return self.buttonRect
 
+def refreshButtons(buttons):
+    """:return: The rects of the buttons that had to be redrawn"""
+    return [rect for rect in (button.Refresh() for button in buttons) if rect is not None]
+
 
 class Menu:
     def __init__(self, stateobj):
@@ -211,7 +170,7 @@ class Menu:
         self.DrawButton("Leaderboards")
         self.DrawButton("Quit")
         self.world = [WorldCollider(x.GetRect(), "Steel") for x in self.buttonList]
-        titleRect = largeBoldMenu.render("PhysX", True, ORANGE).get_rect()
+        titleRect = textCache.Render(largeBoldMenu, "PhysX", ORANGE).get_rect()
         titleRect.center = ((swidth / 2), 100)
         self.world.append(WorldCollider(titleRect, "Steel"))
         self.world.append(WorldCollider(pygame.Rect(-1, 0, 1, sheight)))
@@ -219,34 +178,17 @@ class Menu:
         self.world.append(WorldCollider(pygame.Rect(swidth, 0, 1, sheight)))
         self.world.append(WorldCollider(pygame.Rect(0, sheight, swidth, 1)))
         self.objects = []
+        self.bodies = BodyArrays() # The balls thrown into the menu
         self.colhandler = CollisionHandler((swidth, sheight))
+        self.drawn = False # Whether the screen shows this menu with nothing moving on it
 
     def DrawButton(self, text):
         newpos = ((swidth / 4), (2 / 5 * sheight) + 60 * len(self.buttonList))
         self.buttonList.append(MenuButton(text, newpos))
     def RunFrame(self, dt):
-        screen.fill(BACKGROUNDCOLOUR)
-
-        textRender(largeBoldMenu, ((swidth / 2), 100), "PhysX", ORANGE)
-        for button in self.buttonList:
-            button.Draw()
-
-        if DEBUG:
-            for wc in self.world:
-                wc.DrawDebug()
-
-        for i, obj in enumerate(self.objects):
-            colliders = [x for x in self.objects if x != obj] + self.world
-            obj.Update({"gravity": 15, "airdensity": 1.2041}, colliders, dt)
-            obj.Draw(screen)
-            if not Rect(0, 0, swidth, sheight).contains(obj.GetRect()):
-                self.objects.pop(i)
-
-        self.colhandler.Update(self.objects)
-
         mousePos = pygame.mouse.get_pos()
 
-        for event in pygame.event.get():
+        for event in waitEvents(self.drawn):
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:
                     if self.buttonList[0].collide(mousePos):
@@ -266,16 +208,44 @@ class Menu:
                                 inside = True
                         if not inside:
                             balls = [ball_image_orange, ball_image_white]
-                            ball = PhysObject(mousePos, random.choice(balls), 30, COR=0.4)
+                            ball = PhysObject(mousePos, random.choice(balls), 30, COR=0.4, store=self.bodies)
                             ball.SetVelocity(random.randint(-20, 20), random.randint(-10, 0))
                             self.objects.append(ball)
             if event.type == QUIT:
                 pygame.quit()
                 sys.exit()
+        if self.state.state is not self:
+            return []
+
+        if self.drawn and not self.objects: # Only the button under the mouse can have changed
+            return refreshButtons(self.buttonList)
+
+        moving = len(self.objects) > 0
+        screen.fill(BACKGROUNDCOLOUR)
+
+        textRender(largeBoldMenu, ((swidth / 2), 100), "PhysX", ORANGE)
+        for button in self.buttonList:
+            button.Draw()
+
+        if DEBUG:
+            for wc in self.world:
+                wc.DrawDebug()
+
+        for i, obj in enumerate(self.objects):
+            colliders = [x for x in self.objects if x != obj] + self.world
+            obj.Update({"gravity": 15, "airdensity": 1.2041}, colliders, dt)
+            obj.Draw(screen)
+            if not Rect(0, 0, swidth, sheight).contains(obj.GetRect()):
+                self.bodies.Remove(self.objects.pop(i))
+
+        self.colhandler.Update(self.objects)
+        self.drawn = not moving # A ball that left this frame was still drawn, so the next frame has to clear it
+        return [screen.get_rect()]
 
 class ScoringScreen:
-    def __init__(self, stateobj, objectives, timer, collisions, fuelperc, levelnum):
+    def __init__(self, stateobj, objectives, timer, collisions, fuelperc, levelnum, recording=None):
         self.state = stateobj
+        self.recording = recording
         self.totalobj = len(objectives)
         self.objmet = len([x for x in objectives if x.complete])
         self.optimal = OPTIMALS[str(levelnum)]
@@ -283,17 +253,9 @@ class ScoringScreen:
         self.collisions = collisions
         self.fuelperc = fuelperc
         self.levelnum = int(levelnum)
-        self.background_image = pygame.image.load("assets/background/background.png").convert()
-
-        if self.objmet == self.totalobj: # if the player succeeded
-            timeDiff = self.optimal - timer # This will be negative if the player took longer than the optimal
-            timeMult = min(abs(timeDiff) / self.optimal, 1) # Only penalise/bonus for up to double the time and down to 0 seconds
-            timeMult *= -1 if timeDiff < 0 else 1 # Bonus or penalty
-            self.fuelbonus = int(min(self.fuelperc / 0.5, 1) * 1000)
-            self.score = int(SCOREBASE + (SCOREBASE*timeMult) + self.fuelbonus - (HITPENALTY * collisions))
-            self.score = 1 if self.score <= 0 else self.score # If the player succeeded, they should never score 0 points
-        else:
-            self.score = 0
+        self.background_image = assets.Load("assets/background/background.png", alpha=False)
+
+        self.score, self.fuelbonus = level_score(levelnum, self.objmet, self.totalobj, timer, collisions, fuelperc)
 
         self.buttonList = [MenuButton("Replay", (swidth/5, sheight * (3/5)), swidth/4),
                            MenuButton("Next Level", (swidth/5, sheight * (3/5) + 60), swidth/4),
@@ -303,10 +265,38 @@ class ScoringScreen:
             self.buttonList[1].setEnabled(False)
         if self.score <= 0:
             self.buttonList[3].setEnabled(False)
+        self.drawn = False
+
+        # Whichever of Replay and Next Level is clicked, it starts straight away
+        preloadLevel(*([self.levelnum, self.levelnum + 1] if len(OPTIMALS) >= self.levelnum + 1 else [self.levelnum]))
     def detailRender(self, detail, value, colour):
         textRender(mediumText, ((swidth / 2), 220 + (self.detailnum * 60)), f"{detail}: {str(value)}", colour)
         self.detailnum += 1
     def RunFrame(self, dt):
+        for event in waitEvents(self.drawn):
+            if event.type == QUIT:
+                pygame.quit()
+                sys.exit()
+
+        click, _, _ = pygame.mouse.get_pressed()
+        mousePos = pygame.mouse.get_pos()
+
+        if click:
+            if self.buttonList[0].collide(mousePos):
+                self.state.newstate(gameInit(self.levelnum, self.state))
+            elif self.buttonList[1].collide(mousePos) and len(OPTIMALS) >= self.levelnum + 1:
+                self.state.newstate(gameInit(self.levelnum + 1, self.state))
+            elif self.buttonList[2].collide(mousePos):
+                self.state.newstate(Menu(self.state))
+            elif self.buttonList[3].collide(mousePos) and self.score > 0:
+                self.drawn = False # Drawn again in full if the player comes back from SaveScore
+                self.state.newstate(SaveScore(self.state, self.score, self.levelnum, self))
+        if self.state.state is not self:
+            return []
+
+        if self.drawn:
+            return refreshButtons(self.buttonList)
+
         screen.fill(BACKGROUNDCOLOUR)
         textRender(slightlylargeBold, ((swidth / 2), 100), f"Score: {str(self.score)}", WHITE)
 
@@ -342,23 +332,8 @@ class ScoringScreen:
         for button in self.buttonList:
             button.Draw()
 
-        click, _, _ = pygame.mouse.get_pressed()
-        mousePos = pygame.mouse.get_pos()
-
-        if click:
-            if self.buttonList[0].collide(mousePos):
-                self.state.newstate(gameInit(self.levelnum, self.state))
-            elif self.buttonList[1].collide(mousePos) and len(OPTIMALS) >= self.levelnum + 1:
-                self.state.newstate(gameInit(self.levelnum + 1, self.state))
-            elif self.buttonList[2].collide(mousePos):
-                self.state.newstate(Menu(self.state))
-            elif self.buttonList[3].collide(mousePos) and self.score > 0:
-                self.state.newstate(SaveScore(self.state, self.score, self.levelnum, self))
-
-        for event in pygame.event.get():
-            if event.type == QUIT:
-                pygame.quit()
-                sys.exit()
+        self.drawn = True
+        return [screen.get_rect()]
 
 class SaveScore:
     def __init__(self, stateobj, score, levelnum, scoringScreen):
@@ -369,6 +344,7 @@ class SaveScore:
         self.backButton = MenuButton("<", (20, 20), swidth / 8, 50)
         self.text = ''
         self.error = ''
+        self.drawn = False
     def filterName(self):
         if len(self.text) >= MAXUSERNAMECHARS:
             self.error = f"This username is too long. It must be less than {MAXUSERNAMECHARS} characters."
@@ -392,6 +368,8 @@ class SaveScore:
                 board.append(row)
 
         newScore = [self.text, self.score]
+        if self.scoringScreen.recording is not None:
+            newScore.append(self.scoringScreen.recording.ToText()) # So the score can be checked by replaying it
         if len(board) == 0:
             board.append(newScore)
         else:
@@ -421,28 +399,12 @@ class SaveScore:
             writer = csv.writer(file)
             writer.writerows(board)
     def RunFrame(self, dt):
-        screen.fill(BACKGROUNDCOLOUR)
-        self.backButton.Draw()
-
-        textRender(slightlylargeBold, ((swidth / 2), 100), f"Score: {str(self.score)}", WHITE)
-
-        inputBoxWidth = swidth * (4/5)
-        inputBoxHeight = 80
-        inputBox = pygame.Rect((swidth/2) - (inputBoxWidth/2), (sheight/2) - (inputBoxHeight/2), inputBoxWidth, inputBoxHeight)
-        pygame.draw.rect(screen, WHITE, inputBox)
-
-        textRender(mediumText, tuple(Vec2(inputBox.center) - Vec2(0, 100)), "Enter a username:", WHITE)
-
-        textRender(mediumSmallText, inputBox.center, self.text, BLACK)
-
-        if len(self.error) > 0:
-            textRender(smallText, tuple(Vec2(inputBox.center) + Vec2(0, 100)), self.error, RED)
-
-        for event in pygame.event.get():
+        for event in waitEvents(self.drawn):
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if self.backButton.collide(pygame.mouse.get_pos()):
                     self.state.newstate(self.scoringScreen)
             if event.type == pygame.KEYDOWN:
+                self.drawn = False # The name or the error message may have changed
                 if event.key == pygame.K_RETURN:
                     if self.filterName():
                         self.recordScore()
@@ -457,6 +419,31 @@ class SaveScore:
             if event.type == QUIT:
                 pygame.quit()
                 sys.exit()
+        if self.state.state is not self:
+            return []
+
+        if self.drawn:
+            return refreshButtons([self.backButton])
+
+        screen.fill(BACKGROUNDCOLOUR)
+        self.backButton.Draw()
+
+        textRender(slightlylargeBold, ((swidth / 2), 100), f"Score: {str(self.score)}", WHITE)
+
+        inputBoxWidth = swidth * (4/5)
+        inputBoxHeight = 80
+        inputBox = pygame.Rect((swidth/2) - (inputBoxWidth/2), (sheight/2) - (inputBoxHeight/2), inputBoxWidth, inputBoxHeight)
+        pygame.draw.rect(screen, WHITE, inputBox)
+
+        textRender(mediumText, tuple(Vec2(inputBox.center) - Vec2(0, 100)), "Enter a username:", WHITE)
+
+        textRender(mediumSmallText, inputBox.center, self.text, BLACK)
+
+        if len(self.error) > 0:
+            textRender(smallText, tuple(Vec2(inputBox.center) + Vec2(0, 100)), self.error, RED)
+
+        self.drawn = True
+        return [screen.get_rect()]
 
 class Leaderboard:
     def __init__(self, stateobj, levelnum):
@@ -471,7 +458,31 @@ class Leaderboard:
                 self.scores.append(row)
         self.scroll = 0
         self.backButton = MenuButton("<", (20, 20), swidth / 8, 50)
+        self.drawn = False
     def RunFrame(self, dt):
+        maxPages = len(self.scores) // 10
+
+        for event in waitEvents(self.drawn):
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                mousePos = pygame.mouse.get_pos()
+                if self.backButton.collide(mousePos):
+                    self.state.newstate(LevelSelect(self.state, False))
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_DOWN:
+                    self.scroll += 1 if self.scroll != maxPages else 0
+                    self.drawn = False
+                elif event.key == pygame.K_UP:
+                    self.scroll += -1 if self.scroll != 0 else 0
+                    self.drawn = False
+            if event.type == QUIT:
+                pygame.quit()
+                sys.exit()
+        if self.state.state is not self:
+            return []
+
+        if self.drawn:
+            return refreshButtons([self.backButton])
+
         screen.fill(BACKGROUNDCOLOUR)
 
         x = swidth / 2
@@ -479,8 +490,6 @@ class Leaderboard:
         heightget = hudFont.size("c")[1]
         sliceHeight = sheight / 10
 
-        maxPages = len(self.scores) // 10
-
 
         itemNum = 0
         for i in range(0 + (10 * self.scroll), min(len(self.scores), 0 + (10 * self.scroll) + 10)):
@@ -499,19 +508,8 @@ class Leaderboard:
 
         self.backButton.Draw()
 
-        for event in pygame.event.get():
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                mousePos = pygame.mouse.get_pos()
-                if self.backButton.collide(mousePos):
-                    self.state.newstate(LevelSelect(self.state, False))
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_DOWN:
-                    self.scroll += 1 if self.scroll != maxPages else 0
-                elif event.key == pygame.K_UP:
-                    self.scroll += -1 if self.scroll != 0 else 0
-            if event.type == QUIT:
-                pygame.quit()
-                sys.exit()
+        self.drawn = True
+        return [screen.get_rect()]
 
 class LevelSelect:
     def __init__(self, stateobj, game):
@@ -540,15 +538,11 @@ class LevelSelect:
             for i, level in enumerate(row):
                 x = (2 * i + 1) * sliceWidth
                 self.buttonList.append(MenuButton(level, (x, y), sliceWidth, sliceHeight))
+        self.drawn = False
+        self.preloaded = None # The level preloaded for the button last under the mouse
 
     def RunFrame(self, dt):
-        screen.fill(BACKGROUNDCOLOUR)
-
-        for button in self.buttonList:
-            button.Draw()
-        self.backButton.Draw()
-
-        for event in pygame.event.get():
+        for event in waitEvents(self.drawn):
             if event.type == pygame.MOUSEBUTTONDOWN:
                 mousePos = pygame.mouse.get_pos()
                 for button in self.buttonList:
@@ -562,156 +556,194 @@ class LevelSelect:
             if event.type == QUIT:
                 pygame.quit()
                 sys.exit()
+        if self.state.state is not self:
+            return []
+
+        if self.drawn:
+            dirty = refreshButtons(self.buttonList + [self.backButton])
+        else:
+            screen.fill(BACKGROUNDCOLOUR)
+
+            for button in self.buttonList:
+                button.Draw()
+            self.backButton.Draw()
+
+            self.drawn = True
+            dirty = [screen.get_rect()]
+
+        if self.game: # Start loading the level under the mouse, since it is likely to be the one clicked
+            for button in self.buttonList:
+                if button.hovered and button.text != self.preloaded:
+                    self.preloaded = button.text
+                    preloadLevel(button.text) # Drops whatever was preloaded for the level hovered before
+        return dirty
 
 
 class Game:
-    def __init__(self, stateobj, background, world, objects, player, objectives, obstacles, hazards, constants, levelnum):
-        self.constants = constants
+    def __init__(self, stateobj, sim, levelnum):
+        """
+        :param stateobj: The State this game runs in
+        :param Simulation sim: The loaded level; the game draws it and feeds it the keyboard
+        :param levelnum: The level number
+        """
+        self.sim = sim
+        self.constants = sim.constants
         self.state = stateobj
-        self.background_image = pygame.image.load(background).convert_alpha()
-        self.level_size = self.background_image.get_size()
+        self.background_image = sim.background
+        self.level_size = sim.level_size
         self.lwidth, self.lheight = self.level_size
 
-        self.world = world
-        self.world.append(WorldCollider(pygame.Rect(-1, 0, 1, self.lheight)))
-        self.world.append(WorldCollider(pygame.Rect(0, -1, self.lwidth, 1)))
-        self.world.append(WorldCollider(pygame.Rect(self.lwidth, 0, 1, self.lheight)))
+        self.world = sim.world
         self.lPos = [0, 0]
 
-        self.objects = objects
-        self.player = player
-        self.objectives = objectives
-        self.obstacles = obstacles
-        self.hazards = hazards
+        self.objects = sim.objects
+        self.player = sim.player
+        self.objectives = sim.objectives
+        self.obstacles = sim.obstacles
+        self.hazards = sim.hazards
 
-        self.colHandler = CollisionHandler(self.level_size)
+        self.grid = sim.grid
+        self.colHandler = sim.colHandler
         self.particleHandler = ParticleHandler()
+        self.particleHandler.SetStatic(self.world + self.objectives + self.obstacles + self.hazards)
+        sim.particleHandler = self.particleHandler
+        assets.worker.submit(rotations.Prebuild, self.player.image_clean) # So the first turn doesn't rotate anything
         self.timer = Timer((0,0))
+        self.scheduler = FixedStep()
         self.levelnum = levelnum
+        self.recording = Recording(levelnum, self.constants, self.scheduler.dt) # Enough to simulate this run again
+        self.preview = Trajectory(sim, dt=self.scheduler.dt) # Where the player goes if the controls stay as they are
+        self.showPreview = True
+        self.staticLayer, self.objectiveColours = None, None
+        self.lastDrawn, self.lastOffset = [], None # What the previous frame drew over the static layer, and where from
+
+    def BuildStaticLayer(self):
+        """
+        Draws the background and the geometry that never moves onto one surface, so a frame only has to blit the
+        visible part of it. It's built once per level; objectives that change colour are repainted onto it by
+        RepaintObjectives().
+        """
+        layer = self.background_image.convert()
+        for collider in self.objectives + self.obstacles:
+            collider.Draw(layer)
+        self.staticLayer = layer
+        self.objectiveColours = [tuple(x.colour) for x in self.objectives]
+
+    def RepaintObjectives(self):
+        """
+        Redraws the objectives whose colour has changed since they were drawn onto the static layer. An objective is
+        an opaque rect, so only it and any obstacle drawn over it need painting again.
+
+        :return: The objectives that were repainted
+        """
+        changed = [x for x, colour in zip(self.objectives, self.objectiveColours) if tuple(x.colour) != colour]
+        for objective in changed:
+            objective.Draw(self.staticLayer)
+            for obstacle in self.obstacles:
+                if obstacle.rect.colliderect(objective.rect):
+                    obstacle.Draw(self.staticLayer)
+        self.objectiveColours = [tuple(x.colour) for x in self.objectives]
+        return changed
 
     def DrawHUD(self):
-        self.timer.Draw()
+        """:return: The areas the HUD was drawn over"""
+        drawn = [self.timer.Draw()]
 
-        font = pygame.font.Font(None, 30)
+        font = getFont(None, 30)
         #render_fps = font.render(str(int(clock.get_fps())), True, WHITE)
         #screen.blit(render_fps, (0, 0))
         if DEBUG:
-            render_mousepos = font.render(str(pygame.mouse.get_pos()), True, WHITE)
-            screen.blit(render_mousepos, (500, 0))
+            render_mousepos = textCache.Render(font, str(pygame.mouse.get_pos()), WHITE)
+            drawn.append(screen.blit(render_mousepos, (500, 0)))
         fuelBackgroundRect = pygame.Rect(0, 0, int(0.75 * swidth), int(0.01 * sheight))
         fuelRect = pygame.Rect(0, 0, int(0.75 * swidth * self.player.fuel / self.player.tank), int(0.015 * sheight))
 
         fuelBackgroundRect.center, fuelRect.center = (swidth // 2, int(0.95 * sheight)), (swidth // 2, int(0.95 * sheight))
         pygame.draw.rect(screen, NEARLYBLACK, fuelBackgroundRect)
         pygame.draw.rect(screen, (255, lINTerp(0, 200, self.player.fuel / self.player.tank), 0), fuelRect)
+        drawn.append(fuelBackgroundRect.union(fuelRect))
+        return drawn
 
-    def RunFrame(self, dt):
+    def Step(self, dt):
+        """Advances the simulation by one fixed timestep"""
         # Make it easier to reference everything
-        background_image, world, objects, player, colHandler, particleHandler, objectives, obstacles, hazards = \
+        background_image, world, objects, player, particleHandler, objectives, obstacles, hazards = \
             self.background_image, \
-            self.world, self.objects, self.player, self.colHandler, self.particleHandler, self.objectives, \
+            self.world, self.objects, self.player, self.particleHandler, self.objectives, \
             self.obstacles, self.hazards
 
-        self.timer.Update()
+        self.timer.Update(dt)
+        for body in objects + [player]:
+            body.StoreLastPos() # Drawing interpolates from here to wherever the body ends up after this step
 
         world = world + objectives + obstacles + hazards
         colliders = world + objects  # Everything the player can collide with
 
-        oldLPos = self.lPos
+        # Everything stays in world coordinates; the camera offset is only applied when drawing
         self.lPos = getCameraTrack(player, self.lPos, background_image.get_size()[0], background_image.get_size()[1])
 
-        # move game objects accordingly with the level
-        diff = Vec2(list(numpy.subtract(self.lPos, oldLPos)))  # convert the numpy array to a regular list and then to a Vec2
-
-        if not Rect(0, 0, swidth, sheight).contains(player.GetRect()):
-            player.SetPos(player.GetPos() + diff)
-            for object in objects:
-                object.SetPos(object.GetPos() + diff)
-            for particle in particleHandler.particles:
-                particle.SetPos(particle.GetPos() + diff)
-            for wc in world:
-                wc.Move(diff)
-        else:
-            CollisionHandler.SafeMove(player, world, diff)
-            for wc in world:
-                wc.Move(diff)
-
-            for object in objects:
-                CollisionHandler.SafeMove(object, world, diff)
-
-            for particle in particleHandler.particles:
-                #CollisionHandler.SafeMove(particle, world, diff)
-                particle.SetPos(particle.GetPos() + diff)
-
-
-        ##############################################
-
-        screen.blit(background_image, tuple(self.lPos))
-
-
-        particleHandler.Update(screen, colliders + [player], self.constants["gravity"], dt)
-
-        for hazard in hazards:
-            hazard.Update(objects + [player])
-            #hazard.Draw(screen)
-
-        ## UPDATING OBJECTIVES ##
-        completed = True
-        for objective in objectives:
-            objective.Update([player] if isinstance(objective, PlayerObjective)
-                             else [x for x in objects if isinstance(x, KeyObject)])
-            if not objective.complete:
-                completed = False
-            objective.Draw(screen)
-        if completed:
-            self.state.newstate(ScoringScreen(self.state, objectives, self.timer.GetTime(), player.collisions, self.player.fuel / self.player.tank, self.levelnum))
-
-
-        for obstacle in obstacles:
-            if obstacle.Update(player):
-                self.state.newstate(ScoringScreen(self.state, objectives, self.timer.GetTime(), player.collisions, self.player.fuel / self.player.tank, self.levelnum))
-            obstacle.Draw(screen)
-
-        ## UPDATING PLAYER ##
-        player.Update(self.constants, colliders, dt)
-        player.Draw(screen)
-
-        ## UPDATING PHYSOBJECTS ##
-        newcolliders = [x for x in world]
-        newcolliders.append(player)
-        for object in objects:
-            object.Update(self.constants, newcolliders + [x for x in objects if x != object], dt)
-            object.Draw(screen)
-
-        if DEBUG:
-            for collider in world:
-                collider.DrawDebug()
-        self.DrawHUD()
-        ###############################
-        newcol = [x for x in objects]
-        newcol.append(player)
-        ## HANDLE COLLISIONS ##
-        colHandler.Update(newcol)
-        ## UPDATE PARTICLES ##
-
+        particleHandler.Update(colliders + [player], self.constants["gravity"], dt)
 
         keys = pygame.key.get_pressed()
-        # Player Controls
-        if keys[pygame.K_RIGHT]:
-            player.Rotate(1, colliders, dt)
-        if keys[pygame.K_LEFT]:
-            player.Rotate(-1, colliders, dt)
-        if keys[pygame.K_SPACE]:
-            player.Thrust(particleHandler)
-
-        elif keys[pygame.K_LSHIFT]:
-            player.Thrust(particleHandler, True)
+        inputs = Inputs.FromKeys(keys)
+        self.recording.Record(inputs)
+        self.sim.Step(inputs, dt)
+        if self.sim.Finished():
+            self.state.newstate(ScoringScreen(self.state, objectives, self.timer.GetTime(), player.collisions, self.player.fuel / self.player.tank, self.levelnum, self.recording))
 
         if keys[pygame.K_MINUS]:
             self.lPos[0] = self.lPos[0] - 1
         elif keys[pygame.K_EQUALS]:
             self.lPos[0] = self.lPos[0] + 1
 
+    def Draw(self, alpha):
+        """
+        :param float alpha: How far between the last two simulation steps to draw the bodies, from 0 to 1
+        :return: The parts of the screen that differ from the last frame
+        """
+        rebuilt = self.staticLayer is None
+        if rebuilt:
+            self.BuildStaticLayer()
+        repainted = self.RepaintObjectives()
+        offset = tuple(self.lPos) # The camera: world coordinates plus this are screen coordinates
+        blitVisible(screen, self.staticLayer, offset)
+
+        drawn = [x.rect.move(offset) for x in repainted] + [self.particleHandler.Draw(screen, offset)]
+
+        if self.showPreview and len(self.preview.points) > 1:
+            points = [(x + offset[0], y + offset[1]) for x, y in self.preview.points]
+            drawn.append(pygame.draw.lines(screen, GREY, False, points))
+            if self.preview.hit:
+                drawn.append(pygame.draw.circle(screen, RED, points[-1], 4))
+
+        drawn.append(self.player.Draw(screen, alpha, offset))
+        for object in self.objects:
+            drawn.append(object.Draw(screen, alpha, offset))
+
+        if DEBUG:
+            for collider in self.world + self.objectives + self.obstacles + self.hazards:
+                collider.DrawDebug(offset)
+        drawn += self.DrawHUD()
+
+        # While the camera and the static layer stay put, only what was drawn over the layer last frame and this frame
+        # has changed. Details and debug drawing go outside those rects, so they always update the whole screen.
+        drawn = [rect for rect in drawn if rect is not None]
+        lastDrawn, lastOffset = self.lastDrawn, self.lastOffset
+        self.lastDrawn, self.lastOffset = drawn, offset
+        if rebuilt or offset != lastOffset or DEBUG or any(x.detailsMode for x in self.objects + [self.player]):
+            return [screen.get_rect()]
+        return lastDrawn + drawn
+
+    def RunFrame(self, dt):
+        for _ in range(self.scheduler.Advance(dt)):
+            self.Step(self.scheduler.dt)
+            if self.state.state is not self: # The level ended during this step
+                break
+        if self.showPreview:
+            self.preview.Update(Inputs.FromKeys(pygame.key.get_pressed()))
+        dirty = self.Draw(self.scheduler.alpha)
+
+        objects, player = self.objects, self.player
         for event in pygame.event.get():
             if event.type == QUIT:
                 pygame.quit()
@@ -722,28 +754,20 @@ class Game:
                 if event.key == pygame.K_TAB:
                     for obj in objects + [player]:
                         obj.ToggleDetails()
+                if event.key == pygame.K_p:
+                    self.showPreview = not self.showPreview
                 if event.key == pygame.K_g and DEBUG:
                     for object in [player] + objects:
                         object.SetWeightless(False if object.weightless else True)
-            if event.type == pygame.KEYUP:  # Cleaning up drive forces
-                if event.key == pygame.K_SPACE:
-                    player.RemoveForce(player, "Drive")
-                if event.key == pygame.K_LSHIFT:
-                    player.RemoveForce(player, "Drive")
-
+        return dirty
 
-state = State(None)
-menu = Menu(state)
-state.newstate(menu)
 
-prev_time = time.time()
-while True:
-    clock.tick()
-    now = time.time()
-    dt = now - prev_time
-    prev_time = now
+if __name__ == "__main__":
+    state = State(None)
+    menu = Menu(state)
+    state.newstate(menu)
 
-    state.RunFrame(dt)
+    while True:
+        dt = clock.tick(FPS) / 1000 # Real time since the last frame; the game turns this into fixed physics steps
 
-    pygame.display.update()
-    clock.tick(FPS)
+        pygame.display.update(state.RunFrame(dt)) # Only present the parts of the screen the state changed
@@ -1,13 +1,19 @@
-import pygame, time, numpy, math, sys, copy, random
+import pygame, time, numpy, math, sys, copy, random, threading
+from enum import Enum
+from collections import OrderedDict
 
 clock = pygame.time.Clock()
 
 from pygame.locals import *
 from constants import *
+from raycast import raycast, sweep, rectArray, MISS
+from spatial import SpatialHash, SweepAndPrune, CollisionMask
+from text import getFont, textCache
 pygame.init()
 
-pygame.display.set_caption("Physics")
-tinyFont = pygame.font.Font(UNISPACE, 9)
+def getTinyFont():
+    """The font for the details panels, loaded the first time it's needed so that nothing headless opens a font"""
+    return getFont(UNISPACE, 9)
 
 class Material:
     def __init__(self, static, kinetic):
@@ -30,39 +36,18 @@ def trace(source, dir, target, LEVEL_SIZE, detailed=False):
     :param LEVEL_SIZE: The size of the level in pixels/coordinates
     :type LEVEL_SIZE: tuple
     :param detailed: Detailed info about the hit
-    :return: Whether a hit was registered
+    :return: Whether a hit was registered, or the RayHit if detailed is True
     """
     if not isinstance(source, Vec2):
         source = source.GetPos()
-    if not isinstance(target, pygame.Rect) and target is not None:
-        target = target.GetRect()
-    width, height = WINDOW_SIZE
-    xDir = int(identity(dir).x)
-    end_pos = (0, 0)
-    if xDir != 0: # If the line is not completely vertical; has a gradient
-        gradient = dir.y / dir.x # dy/dx
-        bounds = [int(source.x), LEVEL_SIZE[0] if xDir == 1 else -LEVEL_SIZE[0]] # How far we should draw the line along the x-axis; always an overestimate
-        for x in range(bounds[0], bounds[1], xDir): # Increment along the axis axis by an amount equal to the gradient
-            y = x * gradient + source.y # y = mx + c ; c == source.y because the line is transformed an amount up the y axis by source.y
-
-            if DEBUG and x == bounds[1] - xDir:
-                end_pos = (x, int(y))
-                pygame.draw.aaline(screen, RED, (source.x, source.y), end_pos)
-            if target is not None:
-                if target.collidepoint(x, y):
-                    return True
-    else: # If the line is completely vertical; has no gradient
-        yDir = int(identity(dir).y)
-        bounds = [int(source.y), LEVEL_SIZE[1] if yDir == 1 else -LEVEL_SIZE[1]]
-        for y in range(bounds[0], bounds[1], yDir):
-            # vertical line given by x=k, where k is source.x
-            if DEBUG and y == bounds[1] - yDir:
-                end_pos = (source.x, y)
-                pygame.draw.aaline(screen, RED, (source.x, source.y), end_pos)
-            if target is not None:
-                if target.collidepoint(source.x, y):
-                    return True
-    return False
+    reach = math.hypot(*LEVEL_SIZE) # The ray never needs to be longer than the level's diagonal
+    if DEBUG:
+        end_pos = tuple(source + dir.GetNormalized() * reach)
+        pygame.draw.aaline(pygame.display.get_surface(), RED, (source.x, source.y), end_pos)
+    if target is None:
+        return MISS if detailed else False
+    hit = raycast(source, dir, target, reach)
+    return hit if detailed else hit.hit
 
 
 def coltest(rect, colliders):
@@ -70,9 +55,11 @@ def coltest(rect, colliders):
     Test collisions between a single object and a list of others
 
     :param rect: Rect/Object
-    :param colliders: List of rects/objects
+    :param colliders: List of rects/objects, or a SpatialHash to only test the ones nearby
     :return: A list of all the objects/rects from colliders that 'rect' collided with
     """
+    if isinstance(colliders, SpatialHash):
+        colliders = colliders.Query(rect)
     hit_list = []
     for collider in colliders:
         if rect.colliderect(collider.GetRect()):
@@ -108,10 +95,12 @@ def touchingany(ent, colliders):
     Same as touching, but for several objects.
 
     :param ent: Any object
-    :param colliders: List of other objects
+    :param colliders: List of other objects, or a SpatialHash to only test the ones nearby
     :return: A list of tuple pairs with objects and the side which the ent is touching
     """
     entRect = ent.GetRect()
+    if isinstance(colliders, SpatialHash):
+        colliders = colliders.Query(entRect, ent)
     entsides = [entRect.left, entRect.top, entRect.right, entRect.bottom]
     collisions = []
     for obj in colliders:
@@ -131,22 +120,73 @@ def touchingany(ent, colliders):
 def identity(n):
     """Returns the normalised version of the vector or number that is input. E.g: (-500, 0) becomes (-1,0)"""
     if isinstance(n, Vec2):
-        return n.noErrorDiv(abs(n))
+        return Vec2(identity(n.x), identity(n.y))
     if n != 0:
         return n / abs(n)
     else:
         return n
 
+class RotationCache:
+    """
+    Rotated copies of images, keyed by the image and its angle rounded to the nearest 'step' degrees, so turning only
+    rotates an image the first time it reaches each angle. The least recently used copies are dropped once there are
+    more than 'maxsize' of them. Surfaces are keyed by identity; the headless Sprites compare by size, so every
+    Simulation's copy of a sprite shares the same entries.
+    """
+    def __init__(self, step=ROTATION_STEP, maxsize=ROTATION_CACHE_SIZE):
+        """
+        :param float step: Angle resolution in degrees; 0 turns the cache off and rotates to the exact angle
+        :param int maxsize: Most rotated images kept
+        """
+        self.step = step
+        self.maxsize = maxsize
+        self.images = OrderedDict() # (image, angle) -> rotated image, oldest first
+        self.lock = threading.Lock() # Prebuild() runs on the asset worker while the game rotates sprites
+    def Quantize(self, angle):
+        return round(angle / self.step) * self.step % 360
+    def Get(self, image, angle):
+        if not self.step:
+            return rotate(image, angle)
+        key = (image, self.Quantize(angle))
+        with self.lock:
+            rotated = self.images.get(key)
+            if rotated is None:
+                rotated = self.images[key] = rotate(image, key[1])
+                if len(self.images) > self.maxsize:
+                    self.images.popitem(last=False)
+            else:
+                self.images.move_to_end(key)
+        return rotated
+    def Prebuild(self, image):
+        """Fills the cache with every angle of 'image' up front, e.g. on a worker thread while a level loads"""
+        if self.step:
+            for i in range(int(round(360 / self.step))):
+                self.Get(image, i * self.step)
+
+def rotate(image, angle):
+    """pygame.transform.rotate, but also accepts the size-only sprites used by the headless simulation"""
+    if isinstance(image, pygame.Surface):
+        return pygame.transform.rotate(image, angle)
+    return image.Rotate(angle)
+
+rotations = RotationCache()
+
+def rotateImage(image, angle):
+    """Rotates an image through the shared rotation cache"""
+    return rotations.Get(image, angle)
+
 def textRender(font, pos, text, colour, center=True):
-    rendered = font.render(text, True, colour)
+    rendered = textCache.Render(font, text, colour)
     rect = rendered.get_rect()
     if center:
         rect.center = pos
     else:
         rect.topleft = pos
-    screen.blit(rendered, rect)
+    pygame.display.get_surface().blit(rendered, rect)
 
 class Vec2:
+    __slots__ = ("x", "y") # Vectors are created constantly in the physics loop, so skip the per-instance dict
+
     def __init__(self, *args):
         if len(args) == 1 and (isinstance(args[0], tuple) or isinstance(args[0], list)):
             self.x, self.y = args[0]
@@ -184,6 +224,35 @@ class Vec2:
         return Vec2(self.x ** pow, self.y ** pow)
     def __str__(self):
         return f"{str(self.x)}, {str(self.y)}"
+    def __iadd__(self, n):
+        if isinstance(n, Vec2):
+            self.x += n.x
+            self.y += n.y
+        else:
+            self.x += n
+            self.y += n
+        return self
+    def __isub__(self, n):
+        if isinstance(n, Vec2):
+            self.x -= n.x
+            self.y -= n.y
+        else:
+            self.x -= n
+            self.y -= n
+        return self
+    def __imul__(self, n):
+        if isinstance(n, Vec2):
+            self.x *= n.x
+            self.y *= n.y
+        else:
+            self.x *= n
+            self.y *= n
+        return self
+    def AddScaled(self, v2, scale):
+        """In-place self += v2 * scale, without creating the intermediate vector"""
+        self.x += v2.x * scale
+        self.y += v2.y * scale
+        return self
     def __round__(self, n):
         return Vec2(round(self.x, n), round(self.y, n))
     def __iter__(self):
@@ -213,14 +282,11 @@ class Vec2:
     def Inverse(self):
         return self * -1
     def noErrorDiv(self, n):
-        new = Vec2(0, 0)
         if isinstance(n, Vec2):
-            new.x = self.x / n.x if n.x != 0 else 0
-            new.y = self.y / n.y if n.y != 0 else 0
-            return new
-        else:
-            new = self / n if n != 0 else 0
-            return new
+            return Vec2(self.x / n.x if n.x != 0 else 0, self.y / n.y if n.y != 0 else 0)
+        if n != 0:
+            return Vec2(self.x / n, self.y / n)
+        return Vec2(0, 0)
 
 
 dir = {"left" : Vec2(-1, 0),
@@ -229,67 +295,376 @@ dir = {"left" : Vec2(-1, 0),
        "bottom" : Vec2(0, 1)}
 
 
+class ForceKind(Enum):
+    """The kinds of force a body can have acting on it. The values are the names shown in the details overlay."""
+    WEIGHT = "Weight"
+    AIR_RESISTANCE = "Air Resistance"
+    REACTION_X = "ReactionX"
+    REACTION_Y = "ReactionY"
+    FRICTION_X = "FrictionX"
+    FRICTION_Y = "FrictionY"
+    REACTION = "Reaction"
+    PUSH = "Push"
+    WIND = "Wind"
+    DRIVE = "Drive"
+
+FRICTION_KINDS = (ForceKind.FRICTION_X, ForceKind.FRICTION_Y)
+
 class Force(Vec2):
+    __slots__ = ("source", "kind", "name")
+
     def __init__(self, source, name, *args):
+        """
+        :param source: The object the force comes from
+        :param name: What kind of force it is
+        :type name: ForceKind or str
+        """
         self.source = source
-        self.name = name
+        self.kind = ForceKind(name)
+        self.name = self.kind.value
         if len(args) == 1: # in case the components are passed as a tuple/list
             self.x, self.y = args[0].x, args[0].y
         if len(args) == 2: # if the components are passed seperately
             self.x, self.y = args[0], args[1]
 
+class RowVec(Vec2):
+    """
+    A Vec2 that reads and writes one body's row of a BodyArrays field, so changing x or y changes the array. It finds
+    the row through the body, so each body keeps one per field for good, whichever row or arrays it moves to.
+    """
+    __slots__ = ("body", "field")
+
+    def __init__(self, body, field):
+        self.body = body
+        self.field = field
+    @property
+    def x(self):
+        return float(getattr(self.body.store, self.field)[self.body.row, 0])
+    @x.setter
+    def x(self, value):
+        getattr(self.body.store, self.field)[self.body.row, 0] = value
+    @property
+    def y(self):
+        return float(getattr(self.body.store, self.field)[self.body.row, 1])
+    @y.setter
+    def y(self, value):
+        getattr(self.body.store, self.field)[self.body.row, 1] = value
+
+def rowVector(field):
+    """Property for a PhysObject attribute that is stored as a vector row of its BodyArrays"""
+    def get(self):
+        return self.vectors[field] # Made once per body rather than on every access
+    def set(self, value):
+        getattr(self.store, field)[self.row] = (value.x, value.y)
+    return property(get, set)
+
+def rowScalar(field, type=float):
+    """Property for a PhysObject attribute that is stored as a single value in its BodyArrays"""
+    def get(self):
+        return type(getattr(self.store, field)[self.row])
+    def set(self, value):
+        getattr(self.store, field)[self.row] = value
+    return property(get, set)
+
+class BodyArrays:
+    """
+    Structure-of-arrays storage for PhysObjects. Each body owns one row of every array, and its attributes (pos,
+    velocity, mass...) read and write that row. Step() works out weight and air resistance, sums the forces and
+    integrates velocity for every body in a handful of vectorised operations.
+
+    Bodies that have been at rest for SLEEP_TIME are put to sleep by UpdateSleep(). Awake bodies are kept in the first
+    rows and sleeping ones after them, so Step() only has to work on rows[:awake] and costs nothing for sleepers.
+    """
+    VECTORS = ("pos", "velocity", "acceleration", "rForce", "momentum", "size", "weight", "drag", "contact", "friction")
+    SCALARS = ("mass", "Cd", "COR", "restTime")
+
+    def __init__(self, capacity=8):
+        self.bodies = [] # Bodies by row
+        self.awake = 0 # Number of awake bodies, which have the rows before any sleeping ones
+        self.capacity = capacity
+        for field in BodyArrays.VECTORS:
+            setattr(self, field, numpy.zeros((capacity, 2)))
+        for field in BodyArrays.SCALARS:
+            setattr(self, field, numpy.zeros(capacity))
+        self.weightless = numpy.zeros(capacity, dtype=bool)
+
+    def Fields(self):
+        return BodyArrays.VECTORS + BodyArrays.SCALARS + ("weightless",)
+
+    def Add(self, body):
+        """Gives a body a row in these arrays, bringing its values over from the arrays it was in before"""
+        if len(self.bodies) == self.capacity:
+            self.capacity *= 2
+            for field in self.Fields():
+                old = getattr(self, field)
+                new = numpy.zeros((self.capacity,) + old.shape[1:], dtype=old.dtype)
+                new[:len(old)] = old
+                setattr(self, field, new)
+        row = len(self.bodies)
+        if body.store is not None:
+            for field in self.Fields():
+                getattr(self, field)[row] = getattr(body.store, field)[body.row]
+            body.store.Remove(body)
+        self.bodies.append(body)
+        body.store, body.row = self, row
+        self.Wake(body) # Bodies start off awake, so it goes before any sleeping ones
+
+    def Remove(self, body):
+        """Removes a body's row by moving the last row into its place"""
+        self.Wake(body)
+        self.awake -= 1
+        self.Swap(body.row, self.awake) # The last awake row, so the awake rows stay together
+        row, last = body.row, len(self.bodies) - 1
+        if row != last:
+            moved = self.bodies[last]
+            for field in self.Fields():
+                array = getattr(self, field)
+                array[row] = array[last]
+            self.bodies[row] = moved
+            moved.row = row
+        self.bodies.pop()
+
+    def Swap(self, row, other):
+        """Exchanges two bodies' rows"""
+        if row == other:
+            return
+        for field in self.Fields():
+            array = getattr(self, field)
+            array[[row, other]] = array[[other, row]]
+        bodies = self.bodies
+        bodies[row], bodies[other] = bodies[other], bodies[row]
+        bodies[row].row, bodies[other].row = row, other
+
+    def Asleep(self, body):
+        return body.row >= self.awake
+
+    def Sleep(self, body):
+        """Stops stepping a body until something wakes it"""
+        if not self.Asleep(body):
+            self.awake -= 1
+            self.Swap(body.row, self.awake)
+            row = body.row # It was barely moving, and will stay exactly where it is until something wakes it
+            self.velocity[row] = self.momentum[row] = self.acceleration[row] = 0
+
+    def Wake(self, body):
+        if self.Asleep(body):
+            self.Swap(body.row, self.awake)
+            self.awake += 1
+            self.restTime[body.row] = 0
+
+    def UpdateSleep(self, contacts, dt):
+        """
+        Puts bodies that have been at rest long enough to sleep, and wakes sleeping ones that a moving body is touching.
+        Bodies touching each other form an island, which only sleeps once all of it has been at rest for SLEEP_TIME,
+        and is woken as a whole when any of it moves.
+
+        :param contacts: Pairs of bodies that are touching or overlapping, e.g. the CollisionHandler's collisions
+        :param float dt: Length of the step in seconds
+        """
+        if SLEEP_TIME <= 0:
+            return
+        n = self.awake
+        v, force = self.velocity[:n], self.rForce[:n]
+        resting = ((v[:, 0] ** 2 + v[:, 1] ** 2) < SLEEP_VELOCITY ** 2) & \
+                  ((force[:, 0] ** 2 + force[:, 1] ** 2) < SLEEP_FORCE ** 2)
+        self.restTime[:n] = numpy.where(resting, self.restTime[:n] + dt, 0)
+
+        islands = {body: {body} for body in self.bodies[:n]} # Body -> the island it is in
+        for a, b in contacts:
+            if a.store is not self or b.store is not self:
+                continue
+            islandA, islandB = islands.get(a, {a}), islands.get(b, {b})
+            if islandA is not islandB:
+                islandA |= islandB
+                for body in islandB:
+                    islands[body] = islandA
+                islands[a] = islandA
+
+        seen = set()
+        for island in islands.values():
+            if id(island) in seen:
+                continue
+            seen.add(id(island))
+            if all(body.canSleep and (self.Asleep(body) or self.restTime[body.row] >= SLEEP_TIME) for body in island):
+                for body in island:
+                    self.Sleep(body)
+            elif any(not self.Asleep(body) and self.restTime[body.row] == 0 for body in island): # Something is moving
+                for body in island:
+                    self.Wake(body)
+
+    def Step(self, constants, colliders, dt):
+        """
+        Advances every awake body by one step: contact forces, then vectorised force summing and integration, then
+        movement.
+
+        :param dict constants: The level's gravity and air density
+        :param colliders: Everything the bodies can collide with (a list or SpatialHash)
+        :param float dt: Length of the step in seconds
+        """
+        rows = slice(0, self.awake) # Sleeping bodies stay exactly as they are
+        bodies = self.bodies[rows]
+        for body in bodies:
+            body.PrepareStep()
+        for body in bodies:
+            body.forces.UpdateContacts(colliders)
+        self.Integrate(rows, constants, dt)
+        self.Move(rows, colliders, dt)
+        for body in bodies:
+            body.FinishStep()
+
+    def Integrate(self, rows, constants, dt):
+        """
+        Works out weight and air resistance, sums them with the contact forces and integrates velocity.
+
+        :param slice rows: The rows to integrate
+        """
+        gravity, airdensity = constants["gravity"], constants["airdensity"]
+        mass = self.mass[rows]
+        m = mass[:, None]
+        v = self.velocity[rows]
+
+        ## WEIGHT ##
+        weight = self.weight[rows]
+        weight[:, 0] = 0
+        weight[:, 1] = numpy.where(self.weightless[rows] | (not GRAVITYON), 0, mass * gravity)
+
+        ## AIR RESISTANCE ##
+        sqrMag = v[:, 0] ** 2 + v[:, 1] ** 2
+        moving = sqrMag > 0 # A body that has stopped keeps whatever drag it had last
+        if moving.any():
+            size = self.size[rows]
+            A = numpy.where(v[:, 0] > v[:, 1], size[:, 1], size[:, 0]) / METRE # Simplified cross-sectional area
+            dragmag = sqrMag * 0.5 * airdensity * self.Cd[rows] * A
+            with numpy.errstate(divide="ignore", invalid="ignore"):
+                drag = -(v / numpy.sqrt(sqrMag)[:, None]) * dragmag[:, None]
+            drag[(numpy.round(drag, 1) == 0).all(axis=1)] = 0 # Negligible forces are dropped, as in AddForce
+            self.drag[rows] = numpy.where(moving[:, None], drag, self.drag[rows])
+
+        ## RESULTANT FORCE ##
+        force = self.contact[rows] + weight + self.drag[rows]
+        resultantv = v + force / m * dt
+
+        #### PREVENT FRICTION CAUSING OPPOSING MOTION ####
+        friction = self.friction[rows]
+        opposing = (resultantv != 0) & (friction != 0) & (numpy.sign(resultantv) == numpy.sign(friction))
+        if opposing.any():
+            force -= numpy.where(opposing, friction, 0) # Remove and ignore the frictional force
+            bodies = self.bodies[rows]
+            for i, axis in zip(*numpy.nonzero(opposing)):
+                bodies[i].forces.RemoveFriction(ForceKind.FRICTION_X if axis == 0 else ForceKind.FRICTION_Y)
+
+        acceleration = force / m # a = F/m
+        v = v + acceleration * dt
+        # If velocity is basically 0, and velocity is opposing the direction of resultant force, set it to exactly 0
+        v[(numpy.round(v, 1) == 0) & (numpy.sign(v) != numpy.sign(force))] = 0
+
+        self.rForce[rows] = force
+        self.acceleration[rows] = acceleration
+        self.velocity[rows] = v
+        self.momentum[rows] = v * m
+
+    def Move(self, rows, colliders, dt):
+        """Moves each body by its velocity with respect to collisions, then bounces or stops the ones that hit"""
+        bodies = self.bodies[rows]
+        delta = self.velocity[rows] * dt * METRE
+        hits = numpy.zeros((len(bodies), 2), dtype=bool)
+        for i, body in enumerate(bodies):
+            hits[i] = body.Move(colliders, Vec2(delta[i, 0], delta[i, 1]))
+
+        if hits.any():
+            v = self.velocity[rows]
+            COR = self.COR[rows][:, None]
+            bounce = (COR > 0) & (numpy.abs(v) * COR > 1)
+            self.velocity[rows] = numpy.where(hits, numpy.where(bounce, v * (-1 * COR), 0), v)
+
 class ForceManager:
+    """
+    Keeps the forces acting on a body that come from contacts and interactions, keyed by (source, ForceKind). Running
+    totals of all the forces and of the friction among them are kept up to date as forces are added and removed.
+    Weight and air resistance are worked out for every body at once by BodyArrays.Integrate() and live in the body's
+    rows rather than in this table.
+    """
     def __init__(self, parent):
-        self.forces = []
+        self.table = {} # (source, ForceKind) -> Force
+        self.total = Vec2(0, 0) # Sum of every force in the table
+        self.frictionTotal = Vec2(0, 0) # Sum of the friction forces in the table
         self.parent = parent
-        self.rForce = Vec2(0, 0)
+    @property
+    def forces(self):
+        return list(self.table.values())
     def GetForce(self, source, name):
-        t = [x for x in self.forces if x.name == name and x.source == source] # Quick method of searching the list
-        if len(t) > 1:
-            return t
-        elif len(t) == 1:
-            return t[0]
-        else:
-            return None
+        return self.table.get((source, ForceKind(name)))
     def GetAnyForce(self, name):
-        t = [x for x in self.forces if x.name == name]
+        kind = ForceKind(name)
+        t = [x for x in self.table.values() if x.kind is kind]
         if len(t) > 0:
             return t
         else:
             return None
+    def _total(self, force, sign):
+        self.total.x += sign * force.x
+        self.total.y += sign * force.y
+        if force.kind in FRICTION_KINDS:
+            self.frictionTotal.x += sign * force.x
+            self.frictionTotal.y += sign * force.y
     def AddForce(self, source, name, *args):
-        vec = Vec2(0, 0)
         if len(args) == 2:
-            vec.Set(args[0], args[1])
+            x, y = args
         else:
-            vec = args[0]
-        if round(vec, 1) != Vec2(0, 0):
-            if self.GetForce(source, name) is None:
-                self.forces.append(Force(source, name, vec))
-            else:
-                self.RemoveForce(source, name)
-                self.forces.append(Force(source, name, vec))
+            x, y = args[0].x, args[0].y
+        kind = ForceKind(name)
+        if round(x, 1) == 0 and round(y, 1) == 0: # Negligible forces are dropped
+            self.RemoveForce(source, kind)
+            return
+        force = self.table.get((source, kind))
+        if force is None:
+            force = self.table[(source, kind)] = Force(source, kind, x, y)
         else:
-            self.RemoveForce(source, name)
+            self._total(force, -1)
+            force.x, force.y = x, y # Reuse the existing entry rather than allocating a new one
+        self._total(force, 1)
     def RemoveForce(self, *args):
         if len(args) == 2:
-            source, name = args
-            for i, force in enumerate(self.forces):
-                if force.source == source and force.name == name:
-                    self.forces.pop(i)
+            key = (args[0], ForceKind(args[1]))
         else:
-            self.forces.pop(self.forces.index(args[0]))
+            key = (args[0].source, args[0].kind)
+        force = self.table.pop(key, None)
+        if force is not None:
+            self._total(force, -1)
+            if not self.table: # Stop rounding errors building up in the totals
+                self.total.Set(0, 0)
+                self.frictionTotal.Set(0, 0)
+    def AllForces(self):
+        """Every force on the body, including the weight and air resistance kept in its rows"""
+        parent = self.parent
+        forces = self.forces
+        if parent.weight != Vec2(0, 0):
+            forces.append(Force(parent, ForceKind.WEIGHT, parent.weight))
+        if parent.drag != Vec2(0, 0):
+            forces.append(Force(parent, ForceKind.AIR_RESISTANCE, parent.drag))
+        return forces
     def GetResultantNOF(self):
-        rForce = Vec2(0, 0)
-        for force in self.forces:
-            if "Friction" not in force.name and force.name != "Air Resistance":
-                rForce += force
-        return rForce
-    def Update(self, constants, colliders, dt):
+        """:return: The resultant of the weight and every force except friction and air resistance"""
+        weight = self.parent.weight
+        return Vec2(weight.x + self.total.x - self.frictionTotal.x, weight.y + self.total.y - self.frictionTotal.y)
+    def StoreTotals(self):
+        """Writes the running totals into the parent's rows for BodyArrays.Integrate()"""
         parent = self.parent
-        v = parent.velocity
+        parent.contact = self.total
+        parent.friction = self.frictionTotal
+    def RemoveFriction(self, name):
+        """Removes every force of the given kind (FrictionX or FrictionY)"""
+        kind = ForceKind(name)
+        for key in [x for x in self.table if x[1] is kind]:
+            self.RemoveForce(*key)
+    def UpdateContacts(self, colliders):
+        """
+        Adds, updates and removes the contact forces (reaction and friction) for the parent's current surroundings.
 
-        gravity, airdensity = constants["gravity"], constants["airdensity"]
+        :param colliders: Everything the parent could be touching
+        """
+        parent = self.parent
+        v = parent.velocity
 
         touching = touchingany(parent, colliders)
         touchingEnts = [x[0] for x in touching]
@@ -297,62 +672,44 @@ class ForceManager:
         rForce = self.GetResultantNOF()  # Alternative rForce where we ignore drag forces
 
         ## REMOVE REDUNDANT FORCES FROM ENTITIES NOT IN CONTACT/NOT OURSELF OR NOT APPLICABLE ##
-        for i, force in enumerate(self.forces):
+        for force in self.forces:
             # Contact Check (applies to any force)
-            if force.source not in touchingEnts and force.source != self.parent and force.name != "Wind":
-                self.forces.pop(i)
+            if force.source not in touchingEnts and force.source != self.parent and force.kind is not ForceKind.WIND:
+                self.RemoveForce(force)
                 continue
 
             # Friction Check
-            if force.name == "FrictionX":
+            if force.kind is ForceKind.FRICTION_X:
                 if v.x == 0 and rForce.x == 0:
-                    self.forces.pop(i)
+                    self.RemoveForce(force)
                     continue
-            if force.name == "FrictionY":
+            if force.kind is ForceKind.FRICTION_Y:
                 if v.y == 0 and rForce.y == 0:
-                    self.forces.pop(i)
+                    self.RemoveForce(force)
                     continue
 
 
-        ## ADD WEIGHT FORCE IF IT DOESN'T EXIST ##
-        if not parent.weightless and GRAVITYON:
-            self.AddForce(parent, "Weight", 0, parent.mass * gravity)
-        if not GRAVITYON or parent.weightless:
-            self.RemoveForce(parent, "Weight")
-
-
         ## ADD NORMAL FORCE IF THERE IS AN OPPOSING FORCE ##
         for result in touching:
             ent, side = result
             if isinstance(ent, WorldCollider):
                 if side == "left" or side == "right" and identity(rForce.x) == dir[side].x:
-                    self.AddForce(ent, "ReactionX", -rForce.x, 0)
+                    self.AddForce(ent, ForceKind.REACTION_X, -rForce.x, 0)
                 elif side == "top" or side == "bottom" and identity(rForce.y) == dir[side].y:
-                    self.AddForce(ent, "ReactionY", 0, -rForce.y)
-
-        ## ADD AIR RESISTANCE ##
-        if v.GetSqrMag() > 0:  # If moving
-            A = 0
-            if v.x > v.y:  # Simplify cross-sectional area calculation - If horizontal > vertical v, take height as A
-                A = parent.rect.height / METRE
-            else:
-                A = parent.rect.width / METRE
-            dragmag = v.GetSqrMag() * 0.5 * airdensity * parent.Cd * A
-            drag = v.GetNormalized().Inverse() * dragmag  # Turn drag magnitude into an opposite-facing vector to velocity
-            parent.AddForce(parent, "Air Resistance", drag)
+                    self.AddForce(ent, ForceKind.REACTION_Y, 0, -rForce.y)
 
         ## ADD FRICTION ##
         for result in touching:
             ent, side = result
             if isinstance(ent, WorldCollider):
-                if self.GetForce(ent, "ReactionY") or self.GetForce(ent, "ReactionX"):
+                if self.GetForce(ent, ForceKind.REACTION_Y) or self.GetForce(ent, ForceKind.REACTION_X):
                     N = 0
                     if side == "top" or side == "bottom":
-                        force = self.GetForce(ent, "ReactionY")
+                        force = self.GetForce(ent, ForceKind.REACTION_Y)
                         if force is not None:
                             N = abs(force.y)
                     else:
-                        force = self.GetForce(ent, "ReactionX")
+                        force = self.GetForce(ent, ForceKind.REACTION_X)
                         if force is not None:
                             N = abs(force.x)
 
@@ -362,70 +719,36 @@ class ForceManager:
                     if side == "top" or side == "bottom":
                         # X friction
                         if v.x != 0 or rForce.x != 0:  # Ensure the object is moving or trying to move
-                            scale = -(identity(rForce.GetNormalized().x)) if v.x == 0 else -(identity(v.x))  # Determine the direction for friction to act, first from the force, otherwise from velocity.
+                            scale = -(identity(rForce.x)) if v.x == 0 else -(identity(v.x))  # Determine the direction for friction to act, first from the force, otherwise from velocity.
                             if v.x == 0 and rForce.x != 0:  # If the object is not moving but is trying to move
                                 if abs(rForce.x) < threshold:
-                                    self.AddForce(ent, "FrictionX", Vec2(-rForce.x, 0))  # Apply static friction
+                                    self.AddForce(ent, ForceKind.FRICTION_X, -rForce.x, 0)  # Apply static friction
                                 else:
-                                    self.AddForce(ent, "FrictionX", Vec2(scale * N * kinetic, 0))  # Apply kinetic friction
+                                    self.AddForce(ent, ForceKind.FRICTION_X, scale * N * kinetic, 0)  # Apply kinetic friction
                             elif v.x != 0:  # If the object is moving
-                                self.AddForce(ent, "FrictionX", Vec2(scale * N * kinetic, 0))
+                                self.AddForce(ent, ForceKind.FRICTION_X, scale * N * kinetic, 0)
 
                     elif side == "left" or side == "right":
                         # Y friction
                         if v.y != 0 or rForce.y != 0:  # Ensure the object is moving or trying to move
-                            scale = -(identity(rForce.GetNormalized().y)) if v.y == 0 else -(identity(v.y))  # Determine the direction for friction to act, first from the force, otherwise from velocity.
+                            scale = -(identity(rForce.y)) if v.y == 0 else -(identity(v.y))  # Determine the direction for friction to act, first from the force, otherwise from velocity.
                             if v.y == 0 and rForce.y != 0:  # If the object is not moving but is trying to move
                                 if rForce.y < threshold:
-                                    self.AddForce(ent, "FrictionY", Vec2(0, -rForce.y))  # Apply static friction
+                                    self.AddForce(ent, ForceKind.FRICTION_Y, 0, -rForce.y)  # Apply static friction
                                 else:
-                                    self.AddForce(ent, "FrictionY", Vec2(0, scale * N * kinetic))  # Apply kinetic friction
+                                    self.AddForce(ent, ForceKind.FRICTION_Y, 0, scale * N * kinetic)  # Apply kinetic friction
                             elif v.y != 0:  # If the object is moving
-                                self.AddForce(ent, "FrictionY", Vec2(0, scale * N * kinetic))
+                                self.AddForce(ent, ForceKind.FRICTION_Y, 0, scale * N * kinetic)
 
-        ## RECALCULATING RESULTANT FORCE ##
-        self.rForce.Set(0, 0)
-        for force in self.forces:
-            self.rForce += force  # Sum all the forces acting on the body
-
-        parent.acceleration = self.rForce / parent.mass # a = F/m
-        resultantv = parent.velocity + parent.acceleration * dt
-
-        #### PREVENT FRICTION CAUSING OPPOSING MOTION ####
-        frictionX = self.GetAnyForce("FrictionX")
-        frictionY = self.GetAnyForce("FrictionY")
-
-        if resultantv.x != 0 and frictionX:
-            friction = sum(frictionX)
-            if (identity(resultantv.x)) == (identity(friction.x)):  # If the resultant velocity is in the same direction as the friction
-                for force in frictionX:
-                    self.RemoveForce(force)
-                    self.rForce -= friction  # Remove and ignore the frictional force - recalulate resultant force and acceleration before moving on
-
-        if resultantv.y != 0 and frictionY:
-            friction = sum(frictionY)
-            if (identity(resultantv.y)) == (identity(friction.y)):  # If the resultant velocity is in the same direction as the friction
-                for force in frictionY:
-                    self.RemoveForce(force)
-                    self.rForce -= friction  # Remove and ignore the frictional force - recalulate resultant force and acceleration before moving on
-
-        parent.rForce = self.rForce
-        parent.acceleration = parent.rForce / parent.mass
-
-        #########################################
-        if DEBUG and isinstance(self.parent, Player):
-            for force in self.forces:
-                print(f"    {force.name}: {force} -- SOURCE: {force.source}")
-
-        #########################################
+        self.StoreTotals()
 
 class WorldCollider:
     def __init__(self, rect, material="Asphalt"):
         self.rect = rect
         self.pos = Vec2(rect.topleft)
         self.material = MATERIALS[material]
-    def DrawDebug(self):
-        pygame.draw.rect(screen, RED, self.rect, 1)
+    def DrawDebug(self, offset=(0, 0)):
+        pygame.draw.rect(pygame.display.get_surface(), RED, self.rect.move(offset), 1)
     def GetRect(self):
         return self.rect
     def GetPos(self):
@@ -441,14 +764,34 @@ class WorldCollider:
         return self.material.kinetic
 
 class PhysObject:
-    def __init__(self, pos, image, mass, Cd=0.5, COR=0):
+    # Physical state lives in the body's row of a BodyArrays (self.store) so it can be stepped along with the others
+    pos = rowVector("pos")
+    velocity = rowVector("velocity")
+    acceleration = rowVector("acceleration")
+    rForce = rowVector("rForce")
+    momentum = rowVector("momentum")
+    weight = rowVector("weight")
+    drag = rowVector("drag")
+    contact = rowVector("contact")
+    friction = rowVector("friction")
+    mass = rowScalar("mass")
+    Cd = rowScalar("Cd")
+    COR = rowScalar("COR")
+    weightless = rowScalar("weightless", bool)
+    canSleep = True # Whether BodyArrays.UpdateSleep() may stop stepping the body while it is at rest
+
+    def __init__(self, pos, image, mass, Cd=0.5, COR=0, store=None):
         """
         :param Vec2 pos:
         :param string image:
         :param float mass:
         :param float Cd:
         :param float COR:
+        :param BodyArrays store: The arrays of the world the body is in; without one it gets arrays of its own
         """
+        self.store, self.row = None, None
+        self.vectors = {field: RowVec(self, field) for field in BodyArrays.VECTORS}
+        (store if store is not None else BodyArrays(1)).Add(self)
         self.pos = Vec2(pos[0], pos[1])
         self.angle = 0
         self.angleDir = Vec2(math.cos((90 + self.angle) * RAD), -math.sin((90 - self.angle) * RAD)).GetNormalized()
@@ -456,17 +799,15 @@ class PhysObject:
         self.halfheight = self.image_clean.get_height() / 2
         self.halfwidth = self.image_clean.get_width() / 2
         self.rect = self.image.get_rect(center=(pos[0], pos[1]))
+        self.store.size[self.row] = self.rect.size
         self.mass = mass
         self.Cd = Cd
         self.COR = COR
         self.weightless = False
         self.forces = ForceManager(self)
-        self.rForce = Vec2(0, 0)
-        self.acceleration = Vec2(0, 0)
-        self.velocity = Vec2(0, 0)
-        self.momentum = Vec2(0, 0)
+        self.lastPos = Vec2(pos[0], pos[1]) # Position before the most recent step, for drawing between steps
         self.detailsMode = False
-    def DrawDetails(self, surface):
+    def DrawDetails(self, surface, offset=(0, 0)):
         details = [
             f"Mass: {self.mass} kg",
             f"Velocity: ({str(round(self.velocity, 1))}) m/s",
@@ -474,33 +815,54 @@ class PhysObject:
             f"Resultant Force: ({str(round(self.rForce, 1))}) N",
             "Forces:"
         ]
-        for force in self.forces.forces:
+        for force in self.forces.AllForces():
             details.append(f"   {force.name}: ({str(round(force, 1))}) N")
         if isinstance(self, Player):
             details = [f"Engine Drive: {self.thrust} N"] + details
+        tinyFont = getTinyFont()
         fontSize = tinyFont.size("a")
         rectHeight = (len(details) * fontSize[1]) + 10
         rectWidth = 230
         detailsRect = pygame.Rect(0, 0, rectWidth, rectHeight)
-        detailsRect.left = self.rect.right
-        detailsRect.centery = self.rect.centery
+        rect = self.rect.move(offset)
+        detailsRect.left = rect.right
+        detailsRect.centery = rect.centery
         pygame.draw.rect(surface, NEARLYBLACK, detailsRect, 0, 7)
         pygame.draw.rect(surface, BLACK, detailsRect, 3, 7)
         for i, detail in enumerate(details):
             textRender(tinyFont, (detailsRect.topleft[0] + 8, detailsRect.topleft[1] + 4 + (fontSize[1] * i)), detail,
                        WHITE, False)
-    def Draw(self, surface):
-        surface.blit(self.image, self.rect)
+    def StoreLastPos(self):
+        self.lastPos = Vec2(self.pos.x, self.pos.y)
+    def GetDrawRect(self, alpha=1):
+        """
+        :param float alpha: How far between the last stored position and the current one to place the rect
+        :return: The rect to draw the body at
+        """
+        if alpha >= 1:
+            return self.rect
+        x = self.lastPos.x + (self.pos.x - self.lastPos.x) * alpha
+        y = self.lastPos.y + (self.pos.y - self.lastPos.y) * alpha
+        return self.rect.move(round(x - self.pos.x), round(y - self.pos.y))
+    def Draw(self, surface, alpha=1, offset=(0, 0)):
+        """
+        :param float alpha: How far between the last two simulation steps to draw the body
+        :param offset: The camera offset; the body is drawn at its world position plus this
+        :return: The area the sprite was drawn over
+        """
+        drawn = surface.blit(self.image, self.GetDrawRect(alpha).move(offset))
         if self.detailsMode:
-            self.DrawDetails(surface)
+            self.DrawDetails(surface, offset)
         if DEBUG:
-            pygame.draw.rect(surface, RED, self.rect, 1)
+            rect = self.rect.move(offset)
+            pygame.draw.rect(surface, RED, rect, 1)
             image_rect = self.image.get_rect()
-            image_rect.center = self.rect.center
+            image_rect.center = rect.center
             pygame.draw.rect(surface, YELLOW, image_rect, 1)
-            pygame.draw.circle(surface, RED, self.rect.center, 1)
+            pygame.draw.circle(surface, RED, rect.center, 1)
             if isinstance(self, Player):
-                pygame.draw.circle(surface, RED, tuple(self.engine), 1)
+                pygame.draw.circle(surface, RED, (self.engine.x + offset[0], self.engine.y + offset[1]), 1)
+        return drawn
     def GetPos(self):
         return self.pos
     def GetCentre(self):
@@ -511,31 +873,27 @@ class PhysObject:
         return self.rect
     def Rotate(self, scale, colliders, dt):
         if len(touchingany(self, colliders)) == 0:
-            old_rect = copy.deepcopy(self.rect)
+            centre = self.rect.center
             scale *= -1 # We want to interpret + rotation as clockwise
             self.angle += PLAYER_ROTATION_SPEED * scale * dt
-            rotated_image = pygame.transform.rotate(self.image_clean, self.angle)
-            self.image = rotated_image
-            self.rect = self.image.get_rect(center=old_rect.center)
+            self.image = rotateImage(self.image_clean, self.angle) # Drawn at the nearest cached angle
+            self.rect = self.image.get_rect(center=centre)
+            self.store.size[self.row] = self.rect.size
+            if isinstance(colliders, SpatialHash) and self in colliders:
+                colliders.Update(self) # The rotated rect may cover different cells
             self.angleDir = Vec2(math.cos((90 + self.angle) * RAD), -math.sin((90 - self.angle) * RAD)).GetNormalized()
-    def Update(self, constants, colliders, dt):
+    def PrepareStep(self):
+        """Called before the forces on the body are worked out each step"""
         if DEBUG and isinstance(self, Player):
             print(type(self))
 
         self.engine = self.GetPos() + Vec2(self.halfheight * math.sin(self.angle * RAD), self.halfheight * math.cos(self.angle * RAD))
-
-        self.forces.Update(constants, colliders, dt)
-        self.velocity += self.acceleration * dt
-
-        if round(self.velocity.x, 1) == 0 and identity(self.velocity.x) != identity(self.rForce.x): # If velocity is basically 0, and velocity is opposing the direction of
-            self.velocity.x = 0                                                                        # resultant force, set this velocity to exactly 0.
-        if round(self.velocity.y, 1) == 0 and identity(self.velocity.y) != identity(self.rForce.y):
-            self.velocity.y = 0
-
-        self.momentum = self.velocity * self.mass
-
+    def FinishStep(self):
+        """Called once the body has moved each step"""
         ##################################################
         if DEBUG and isinstance(self, Player):
+            for force in self.forces.AllForces():
+                print(f"    {force.name}: {force} -- SOURCE: {force.source}")
             print(f"Pos: {str(self.pos)}")
             print(f"Resultant Force: {str(self.rForce)}")
             print(f"Acceleration: {str(self.acceleration)}")
@@ -545,39 +903,38 @@ class PhysObject:
             print(f"Angle Vector: {str(self.angleDir)}")
 
         ##################################################
+    def Update(self, constants, colliders, dt):
+        """Steps this body on its own; bodies in a shared BodyArrays are normally stepped together by its Step()"""
+        rows = slice(self.row, self.row + 1)
+        self.PrepareStep()
+        self.forces.UpdateContacts(colliders)
+        self.store.Integrate(rows, constants, dt)
+        self.store.Move(rows, colliders, dt)
+        self.FinishStep()
+    def Move(self, colliders, delta):
+        """
+        Moves the body with respect to the world colliders, counting damaging hits for the player.
 
-        tempcolliders = [x for x in colliders if isinstance(x, WorldCollider)]
-        delta = self.velocity * dt * METRE
+        :param colliders: Everything the body can collide with (a list or SpatialHash)
+        :param Vec2 delta: How far to move
+        :return: Whether the body hit something on the x and y axis
+        """
+        if isinstance(colliders, SpatialHash):
+            sweep = self.rect.union(self.rect.move(int(delta.x), int(delta.y))).inflate(4, 4) # Everything we could reach this frame
+            tempcolliders = colliders.Query(sweep, self, WorldCollider)
+        else:
+            tempcolliders = [x for x in colliders if isinstance(x, WorldCollider)]
 
         colData = CollisionHandler.SafeMove(self, tempcolliders, delta)
+        if isinstance(colliders, SpatialHash) and self in colliders:
+            colliders.Update(self)
 
-        if colData["x"]:
-            if isinstance(self, Player) and not (isinstance(colData["objectX"], PhysObject) or
-                                                 isinstance(colData["objectX"], Objective)):
-                if abs(self.velocity.x) >= 10:
-                    self.collisions += 1
-            if self.COR > 0:
-                bounce = abs(self.velocity.x) * self.COR
-                if bounce > 1:
-                    self.velocity.x *= -1 * self.COR
-                else:
-                    self.velocity.x = 0
-            else:
-                self.velocity.x = 0
-
-        if colData["y"]:
-            if isinstance(self, Player) and not (isinstance(colData["objectY"], PhysObject) or
-                                                 isinstance(colData["objectY"], Objective)):
-                if abs(self.velocity.y) >= 10:
-                    self.collisions += 1
-            if self.COR > 0:
-                bounce = abs(self.velocity.y) * self.COR
-                if bounce > 1:
-                    self.velocity.y *= -1 * self.COR
-                else:
-                    self.velocity.y = 0
-            else:
-                self.velocity.y = 0
+        if isinstance(self, Player):
+            if colData["x"] and not isinstance(colData["objectX"], (PhysObject, Objective)) and abs(self.velocity.x) >= 10:
+                self.collisions += 1
+            if colData["y"] and not isinstance(colData["objectY"], (PhysObject, Objective)) and abs(self.velocity.y) >= 10:
+                self.collisions += 1
+        return colData["x"], colData["y"]
     def SetVelocity(self, vx, vy):
         self.velocity = Vec2(vx, vy)
     def SetVelocityVec2(self, v2):
@@ -591,10 +948,17 @@ class PhysObject:
         :param force:
         :return:
         """
-        if type(name) != str:
-            raise TypeError("Name must be of type String")
+        if not isinstance(name, (str, ForceKind)):
+            raise TypeError("Name must be a ForceKind or its name")
+        old = self.forces.GetForce(source, name)
+        before = (old.x, old.y) if old is not None else None
         self.forces.AddForce(source, name, force)
+        new = self.forces.GetForce(source, name)
+        if ((new.x, new.y) if new is not None else None) != before:
+            self.store.Wake(self) # A push or an airstream has started acting on it, or changed
     def RemoveForce(self, source, name):
+        if self.forces.GetForce(source, name) is not None:
+            self.store.Wake(self)
         self.forces.RemoveForce(source, name)
     def GetResultantForce(self):
         return self.rForce
@@ -605,32 +969,35 @@ class PhysObject:
     def GetAngleVec(self):
         return self.angleDir
     def PrintForces(self):
-        for force in self.forces:
-            print(f"{force}: {str(self.forces[force])}")
+        for force in self.forces.AllForces():
+            print(f"{force.name}: {str(force)}")
         print(f"Resultant force: {self.rForce}")
     def ToggleDetails(self):
         self.detailsMode = True if not self.detailsMode else False
 
 class Player(PhysObject):
-    def __init__(self, pos, image, mass, fuel, thrust, weightlessfuel=False):
+    canSleep = False
+    def __init__(self, pos, image, mass, fuel, thrust, weightlessfuel=False, store=None):
         """
         :param float fuel:
         :param float thrust:
         :param bool weightlessfuel:
         """
-        super().__init__(pos, image, mass, PLAYER_DRAG_COEFFICIENT, 0.2)
+        super().__init__(pos, image, mass, PLAYER_DRAG_COEFFICIENT, 0.2, store)
         self.fuel, self.tank = fuel, fuel
         self.weightlessfuel = weightlessfuel
         self.bodymass = mass
         self.mass = self.bodymass + self.fuel if not weightlessfuel else self.bodymass
         self.thrust = thrust
         self.collisions = 0
-    def Update(self, constants, colliders, dt):
+    def PrepareStep(self):
         if not self.weightlessfuel:
             self.mass = self.bodymass + self.fuel
-        super().Update(constants, colliders, dt)
+        super().PrepareStep()
+    def FinishStep(self):
+        super().FinishStep()
         if self.fuel <= 1:
-            self.RemoveForce(self, "Drive")
+            self.RemoveForce(self, ForceKind.DRIVE)
     def Thrust(self, particleHandler, reverse=False):
         if self.fuel >= 1:
             base = Vec2(0, self.thrust)
@@ -639,13 +1006,14 @@ class Player(PhysObject):
                              -((base.x * math.sin(rads)) + (base.y * math.cos(rads)))
             if reverse:
                 base *= -1
-            self.AddForce(self, "Drive", base)
-            particleHandler.CreateEngineParticles(self, base)
+            self.AddForce(self, ForceKind.DRIVE, base)
+            if particleHandler is not None:
+                particleHandler.CreateEngineParticles(self, base)
             self.fuel -= 1
 
 class KeyObject(PhysObject):
-    def __init__(self, pos, image, mass, colour, Cd=0.5, COR=0):
-        super().__init__(pos, image, mass, Cd, COR)
+    def __init__(self, pos, image, mass, colour, Cd=0.5, COR=0, store=None):
+        super().__init__(pos, image, mass, Cd, COR, store)
         self.colour = colour
         self.lastEmission = time.time()
 
@@ -668,9 +1036,10 @@ class Collision:
         :return: Whether object 1's resultant force and velocity direction is into object 2
         """
         if obj1.GetResultantForce() != Vec2(0, 0) and obj1.GetVelocity() != Vec2(0, 0):
-            source = Vec2(obj1.GetCentre())
-            return trace(source, obj1.GetResultantForce().GetNormalized(), obj2, level_size) and \
-            trace(source, obj1.GetVelocity().GetNormalized(), obj2, level_size)
+            source = obj1.GetCentre()
+            reach = math.hypot(*level_size)
+            return raycast(source, obj1.GetResultantForce(), obj2, reach).hit and \
+                   raycast(source, obj1.GetVelocity(), obj2, reach).hit
         else:
             return False
 
@@ -692,41 +1061,51 @@ class Collision:
         obj1, obj2 = self.object, self.collider
 
         if Collision.pushing(obj1, obj2, level_size):
-            obj2.AddForce(obj1, "Push", obj1.GetResultantNOF())
-            obj1.AddForce(obj2, "Reaction", obj1.GetResultantNOF())
+            obj2.AddForce(obj1, ForceKind.PUSH, obj1.GetResultantNOF())
+            obj1.AddForce(obj2, ForceKind.REACTION, obj1.GetResultantNOF())
         else:
-            obj2.RemoveForce(obj1, "Push")
-            obj1.RemoveForce(obj2, "Reaction")
+            obj2.RemoveForce(obj1, ForceKind.PUSH)
+            obj1.RemoveForce(obj2, ForceKind.REACTION)
 
         if Collision.pushing(obj2, obj1, level_size):
-            obj1.AddForce(obj2, "Push", obj2.GetResultantNOF())
-            obj2.AddForce(obj1, "Reaction", obj2.GetResultantNOF())
+            obj1.AddForce(obj2, ForceKind.PUSH, obj2.GetResultantNOF())
+            obj2.AddForce(obj1, ForceKind.REACTION, obj2.GetResultantNOF())
         else:
-            obj1.RemoveForce(obj2, "Push")
-            obj2.RemoveForce(obj1, "Reaction")
+            obj1.RemoveForce(obj2, ForceKind.PUSH)
+            obj2.RemoveForce(obj1, ForceKind.REACTION)
     def PreRemoval(self):
         obj1, obj2 = self.object, self.collider
-        obj1.RemoveForce(obj2, "Push")
-        obj2.RemoveForce(obj1, "Reaction")
-        obj2.RemoveForce(obj1, "Push")
-        obj1.RemoveForce(obj2, "Reaction")
+        obj1.RemoveForce(obj2, ForceKind.PUSH)
+        obj2.RemoveForce(obj1, ForceKind.REACTION)
+        obj2.RemoveForce(obj1, ForceKind.PUSH)
+        obj1.RemoveForce(obj2, ForceKind.REACTION)
 
 class CollisionHandler:
     def __init__(self, level_size):
-        self.collisions = []
+        self.collisions = {} # Active collisions keyed by PairKey(), in the order they started
         self.level_size = level_size
+        self.broadphase = SweepAndPrune()
+    @staticmethod
+    def PairKey(obj1, obj2):
+        """Key for a pair of objects that is the same whichever way round they are given"""
+        a, b = id(obj1), id(obj2)
+        return (a, b) if a < b else (b, a)
     def ColScan(self, world):
-        for object in world:
-            otherObjects = [x for x in world if x != object]  # All the other objects in the world
-            collisionIndex = object.GetRect().collidelistall(otherObjects)  # Get the indexes for every object we are colliding with
-            colliders = [otherObjects[x] for x in collisionIndex]  # Create a list of objects by their indexes
-            for collider in colliders:
-                collision = Collision(object, collider)
-                if collision not in self.collisions:
-                    self.collisions.append(collision)
+        self.broadphase.Sync(world)
+        order = {obj: i for i, obj in enumerate(world)}
+        new = []
+        for obj1, obj2 in self.broadphase.Pairs():
+            key = CollisionHandler.PairKey(obj1, obj2)
+            if key not in self.collisions:
+                if order[obj1] > order[obj2]: # The object earlier in the world list is always the collision's subject
+                    obj1, obj2 = obj2, obj1
+                new.append((order[obj1], order[obj2], key, obj1, obj2))
+        new.sort(key=lambda x: x[:2]) # Start new collisions in world order, so results don't depend on the sort
+        for _, _, key, obj1, obj2 in new:
+            self.collisions[key] = Collision(obj1, obj2)
     def Update(self, world):
         self.ColScan(world)
-        for i, collision in enumerate(self.collisions):
+        for key, collision in list(self.collisions.items()):
             if not collision.resolved:
                 collision.Resolve()
             else:
@@ -734,20 +1113,32 @@ class CollisionHandler:
                    collision.ResolveOverlap(self.level_size)
                 if not collision.CheckOverlap():
                     collision.PreRemoval()
-                    self.collisions.pop(i)
+                    del self.collisions[key]
 
     @staticmethod
-    def SafeMove(object, colliders, delta):
+    def SafeMove(object, colliders, delta, ccd=None):
         """
         Conducts movement with respect to collisions that occur with any objects in the 'colliders' list.
 
         :param object: Subject of movement
         :param colliders: All other collidable objects
-        :type colliders: list
+        :type colliders: list or SpatialHash
         :param delta: How much the subject is desired to be moved by
         :type delta: Vec2
+        :param ccd: Use continuous collision detection (SweptMove); defaults to the CCD constant
         :return: Dictionary containing which sides were hit and the objects involved in them
         """
+        grid = None
+        if isinstance(colliders, SpatialHash):
+            grid = colliders
+            rect = object.GetRect()
+            colliders = grid.Query(rect.union(rect.move(int(delta.x), int(delta.y))).inflate(4, 4), object)
+
+        if (CCD if ccd is None else ccd) and not isinstance(object, WorldCollider):
+            returnVals = CollisionHandler.SweptMove(object, colliders, delta)
+            if grid is not None and object in grid:
+                grid.Update(object)
+            return returnVals
 
         returnVals = {"x": False,
                       "y": False,
@@ -799,6 +1190,66 @@ class CollisionHandler:
                 returnVals["y"] = True
                 returnVals["objectY"] = entity
 
+        if grid is not None and object in grid:
+            grid.Update(object)
+        return returnVals
+
+    @staticmethod
+    def SweptMove(object, colliders, delta, iterations=CCD_ITERATIONS):
+        """
+        Continuous version of SafeMove. Finds the earliest time of impact against any of the colliders, moves the
+        subject up to that point and leaves it flush with the surface, then slides along the surface with whatever
+        movement is left. Repeats for up to 'iterations' contacts, so fast movers can't tunnel through thin colliders.
+
+        :param object: Subject of movement; its pos is the centre of its rect
+        :param colliders: All other collidable objects
+        :type colliders: list
+        :param delta: How much the subject is desired to be moved by
+        :type delta: Vec2
+        :return: Same dictionary as SafeMove
+        """
+        returnVals = {"x": False,
+                      "y": False,
+                      "objectX": None,
+                      "objectY": None}
+        colliders = [x for x in colliders if object != x]
+        rect = object.GetRect()
+        rx, ry = delta.x, delta.y # Movement still left to do this frame
+
+        for _ in range(iterations):
+            if rx == 0 and ry == 0:
+                break
+            first, toi, normal = None, 1, None
+            for entity in colliders:
+                contact = sweep(rect, (rx, ry), entity)
+                if contact is not None and (first is None or contact[0] < toi):
+                    first, (toi, normal) = entity, contact
+
+            object.pos = Vec2(object.pos.x + rx * toi, object.pos.y + ry * toi)
+            rect.center = (object.pos.x, object.pos.y)
+            if first is None:
+                break
+
+            entityRect = first.GetRect()
+            if normal[0] != 0: # Hit a vertical face; stop horizontal movement and keep sliding vertically
+                if normal[0] < 0:
+                    rect.right = entityRect.left
+                else:
+                    rect.left = entityRect.right
+                object.pos.x = rect.centerx
+                rx, ry = 0, ry * (1 - toi)
+                returnVals["x"] = True
+                returnVals["objectX"] = first
+            else:
+                if normal[1] < 0:
+                    rect.bottom = entityRect.top
+                else:
+                    rect.top = entityRect.bottom
+                object.pos.y = rect.centery
+                rx, ry = rx * (1 - toi), 0
+                returnVals["y"] = True
+                returnVals["objectY"] = first
+
         return returnVals
 
 
@@ -809,79 +1260,203 @@ def lINTerp(lb, ub, fraction):
     else:
         return int(lb - interval)
 
-class Particle:
-    def __init__(self, pos, velocity, timer, weightless=False, colour=WHITE, radius=1, colSim=False, parent=None):
-        self.pos = pos
-        self.velocity = velocity
-        self.elapsed = 0
-        self.timer = timer
-        self.rect = pygame.Rect(self.pos.x - radius, self.pos.y - radius, radius*2, radius*2)
-        self.weightless = weightless
-        self.colour = colour
-        self.radius = radius
-        self.acceleration = Vec2(0, 0)
-        self.colSim = colSim
-        self.parent = parent
-    def Update(self, dt, gravity, colliders=None):
-        world = [x for x in colliders]
-        self.elapsed += dt
-        self.acceleration = Vec2(0, gravity if GRAVITYON and not self.weightless else 0)
-        self.velocity += self.acceleration * dt
-        if self.colSim:
-            if self.parent is not None and self.parent in world:
-                world.remove(self.parent)
-            touch = CollisionHandler.SafeMove(self, world, self.velocity * dt * METRE) # returns dictionary with sides that were touched
-            if touch["x"]:
-                if isinstance(self, EngineParticle):
-                    self.velocity.x *= -0.8
-                else:
-                    self.velocity.x *= -0.01
-            if touch["y"]:
-                if isinstance(self, EngineParticle):
-                    self.velocity.y *= -0.8
-                else:
-                    self.velocity.y *= -0.01
-        else:
-            self.pos += self.velocity * dt * METRE
-        self.rect.center = tuple(self.pos)
-    def SetPos(self, pos):
-        self.pos = pos
-    def GetPos(self):
-        return self.pos
-    def Draw(self, screen):
-        pygame.draw.circle(screen, self.colour, tuple(self.pos), self.radius)
-        if DEBUG:
-            pygame.draw.rect(screen, RED, self.rect, 1)
-    def GetRect(self):
-        return self.rect
+class ParticleHandler:
+    """
+    Every particle lives in one row of a set of preallocated arrays (position, velocity, age, lifetime, colour and
+    radius at birth and at death...). Live particles are packed into the first 'count' rows; when particles die the
+    gaps are filled by moving live particles down from the end, so updating and drawing never touch dead rows.
+    """
+    def __init__(self, capacity=PARTICLE_CAPACITY):
+        self.capacity = capacity
+        self.count = 0
+        self.pos = numpy.zeros((capacity, 2))
+        self.velocity = numpy.zeros((capacity, 2))
+        self.age = numpy.zeros(capacity)
+        self.life = numpy.zeros(capacity) # 0 means the particle never expires
+        self.startColour = numpy.zeros((capacity, 4))
+        self.endColour = numpy.zeros((capacity, 4))
+        self.startRadius = numpy.zeros(capacity)
+        self.endRadius = numpy.zeros(capacity)
+        self.extent = numpy.zeros(capacity) # Half the width of the particle's collision box
+        self.weightless = numpy.zeros(capacity, dtype=bool)
+        self.colSim = numpy.zeros(capacity, dtype=bool)
+        self.bounce = numpy.zeros(capacity) # Velocity multiplier when a colliding particle hits something
+        self.parent = numpy.zeros(capacity, dtype=numpy.int64) # id() of the object the particle ignores collisions with
+        self.mask = None # CollisionMask of the static geometry, see SetStatic()
+    def Fields(self):
+        return (self.pos, self.velocity, self.age, self.life, self.startColour, self.endColour, self.startRadius,
+                self.endRadius, self.extent, self.weightless, self.colSim, self.bounce, self.parent)
+
+    def Add(self, pos, velocity, life, colour, weightless=False, colSim=False, parent=None, radius=2, extent=2,
+            endColour=None, endRadius=None, bounce=-0.01):
+        """
+        Adds a batch of particles that share everything except their position, velocity and lifetime. Particles that
+        don't fit in the pool are dropped.
+
+        :param pos: (n, 2) array-like of positions
+        :param velocity: (n, 2) array-like of velocities
+        :param life: Lifetime in seconds, one for all or one per particle
+        :param colour: Colour at birth, RGB or RGBA
+        :param endColour: Colour the particle fades to by the end of its life; defaults to colour
+        :param endRadius: Radius the particle grows to by the end of its life; defaults to radius
+        """
+        pos = numpy.asarray(pos, dtype=float).reshape(-1, 2)
+        n = min(len(pos), self.capacity - self.count)
+        if n <= 0:
+            return
+        rows = slice(self.count, self.count + n)
+        colour = tuple(colour) + (255,) * (4 - len(colour))
+        endColour = colour if endColour is None else tuple(endColour) + (255,) * (4 - len(endColour))
+        self.pos[rows] = pos[:n]
+        self.velocity[rows] = numpy.asarray(velocity, dtype=float).reshape(-1, 2)[:n]
+        self.age[rows] = 0
+        self.life[rows] = numpy.broadcast_to(life, len(pos))[:n]
+        self.startColour[rows] = colour
+        self.endColour[rows] = endColour
+        self.startRadius[rows] = radius
+        self.endRadius[rows] = radius if endRadius is None else endRadius
+        self.extent[rows] = extent
+        self.weightless[rows] = weightless
+        self.colSim[rows] = colSim
+        self.bounce[rows] = bounce
+        self.parent[rows] = 0 if parent is None else id(parent)
+        self.count += n
+
+    def Compact(self, alive):
+        """
+        Removes the dead particles by moving live ones from the end of the pool into their rows.
 
+        :param alive: Boolean array with one entry per live row
+        """
+        n = int(alive.sum())
+        holes = numpy.flatnonzero(~alive[:n]) # Dead rows that will stay inside the pool
+        movers = numpy.flatnonzero(alive[n:]) + n # Live rows beyond the new end of the pool
+        if len(holes):
+            for field in self.Fields():
+                field[holes] = field[movers]
+        self.count = n
+
+    def SetStatic(self, colliders):
+        """
+        Rasterises the colliders that never move into a CollisionMask, so particles collide with them through array
+        lookups instead of being tested against each one.
+        """
+        self.mask = CollisionMask(colliders)
 
-class EngineParticle(Particle):
-    def __init__(self, pos, velocity, timer, player):
-        super().__init__(pos, velocity, timer, colSim=True, parent=player)
-        self.colour = [255, 174, 0, 255]
-        self.radius = 2
-    def Update(self, dt, gravity, colliders):
-        super().Update(dt, gravity, colliders)
-        if self.elapsed < self.timer:
-            frac = self.elapsed / self.timer # How white the particle should be
-            self.colour[1] = lINTerp(174, 255, frac)
-            self.colour[2] = lINTerp(0, 255, frac)
-            self.colour[3] = lINTerp(0, 255, frac)
-            self.radius = lINTerp(2, 5, frac)
+    def Collide(self, rows, axis, delta, bounds, ids):
+        """
+        Moves the colliding particles along one axis, stopping them against whatever they run into, like
+        CollisionHandler.SafeMove() does for a single object. Static geometry comes from the collision mask; anything
+        else is tested directly.
 
+        :param bounds: (m, 4) array of the rects of the colliders that are not in the mask
+        :param ids: (m,) array of the id() of those colliders
+        :return: Boolean array of which particles hit something
+        """
+        pos, e, parent = self.pos[rows], self.extent[rows][:, None], self.parent[rows]
+        oldLow, oldHigh = pos[:, axis:axis + 1] - e, pos[:, axis:axis + 1] + e
+        pos[:, axis] += delta
 
-class ParticleHandler:
-    def __init__(self):
-        self.particles = []
-    def Update(self, screen, world, gravity, dt):
-        for i, particle in enumerate(self.particles):
-            particle.Update(dt, gravity, world)
-            if particle.elapsed >= particle.timer != 0: # if particle.timer == 0 it is an infinite particle; will not expire
-                self.particles.pop(i)
+        hit = numpy.zeros(len(pos), dtype=bool)
+        if self.mask is None:
+            near = numpy.zeros(len(pos), dtype=bool)
+        else:
+            near = self.mask.Occupied(pos - e, pos + e) # Only these need their candidates from the mask
+        if len(ids):
+            far = ~near
+            n = int(far.sum())
+            hit[far] = self.Stop(pos, far, axis, delta, oldLow, oldHigh, e, numpy.broadcast_to(bounds, (n,) + bounds.shape),
+                                 numpy.broadcast_to(ids, (n,) + ids.shape), parent)
+        if near.any():
+            maskBounds, maskIds = self.mask.Candidates(pos[near] - e[near], pos[near] + e[near])
+            n = len(maskIds)
+            bounds = numpy.concatenate([maskBounds, numpy.broadcast_to(bounds, (n,) + bounds.shape)], axis=1)
+            ids = numpy.concatenate([maskIds, numpy.broadcast_to(ids, (n,) + ids.shape)], axis=1)
+            hit[near] = self.Stop(pos, near, axis, delta, oldLow, oldHigh, e, bounds, ids, parent)
+        self.pos[rows] = pos
+        return hit
 
-        for particle in self.particles:
-            particle.Draw(screen)
+    @staticmethod
+    def Stop(pos, which, axis, delta, oldLow, oldHigh, e, bounds, ids, parent):
+        """
+        Tests the chosen particles against their own candidate rects, and stops any that ran into one at its surface.
+
+        :param which: Boolean array choosing the particles (rows of pos) to test
+        :param bounds: (n, k, 4) array of candidate rects for each chosen particle
+        :param ids: (n, k) array of the id() of each candidate, so particles can ignore their parent
+        :return: Boolean array of which chosen particles hit something
+        """
+        p, e = pos[which], e[which]
+        delta, oldLow, oldHigh = delta[which], oldLow[which], oldHigh[which]
+        bounds = bounds.transpose(2, 0, 1) # Lets bounds[side] give an (n, k) array
+        other = 1 - axis
+        low, high = p[:, axis:axis + 1] - e, p[:, axis:axis + 1] + e
+        otherLow, otherHigh = p[:, other:other + 1] - e, p[:, other:other + 1] + e
+        overlap = (low < bounds[axis + 2]) & (high > bounds[axis]) & \
+                  (otherLow < bounds[other + 2]) & (otherHigh > bounds[other]) & \
+                  (parent[which][:, None] != ids)
+
+        # Only snap against surfaces the particle was not already past, as SafeMove does
+        forward = overlap & (delta[:, None] > 0) & (oldHigh <= bounds[axis])
+        backward = overlap & (delta[:, None] < 0) & (oldLow >= bounds[axis + 2])
+        stop = numpy.where(forward, bounds[axis], numpy.inf).min(axis=1) - e[:, 0]
+        p[:, axis] = numpy.where(forward.any(axis=1), stop, p[:, axis])
+        stop = numpy.where(backward, bounds[axis + 2], -numpy.inf).max(axis=1) + e[:, 0]
+        p[:, axis] = numpy.where(backward.any(axis=1), stop, p[:, axis])
+        pos[which] = p
+        return overlap.any(axis=1)
+
+    def Draw(self, screen, offset=(0, 0)):
+        """
+        :param offset: The camera offset; particles are drawn at their world position plus this
+        :return: A rect around every particle drawn, or None if there were none
+        """
+        count = self.count
+        if count == 0:
+            return None
+        life = self.life[:count]
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            frac = numpy.where(life > 0, numpy.minimum(self.age[:count] / life, 1), 0)
+        # Fade the colour and radius over each particle's lifetime, truncating like lINTerp does
+        colours = (self.startColour[:count] + (self.endColour[:count] - self.startColour[:count]) * frac[:, None]).astype(int)
+        radii = (self.startRadius[:count] + (self.endRadius[:count] - self.startRadius[:count]) * frac).astype(int)
+        positions = (self.pos[:count] + offset).tolist()
+        for pos, colour, radius in zip(positions, colours.tolist(), radii.tolist()):
+            pygame.draw.circle(screen, colour, pos, radius)
+        if DEBUG:
+            for (x, y), e in zip(positions, self.extent[:count].tolist()):
+                pygame.draw.rect(screen, RED, pygame.Rect(x - e, y - e, e * 2, e * 2), 1)
+        reach = numpy.maximum(radii, self.extent[:count]) + 1 # Circles are drawn around a float centre, so round outwards
+        screenPos = self.pos[:count] + offset
+        left, top = (screenPos - reach[:, None]).min(axis=0)
+        right, bottom = (screenPos + reach[:, None]).max(axis=0)
+        return pygame.Rect(int(left), int(top), int(right - left) + 1, int(bottom - top) + 1)
+
+    def Update(self, world, gravity, dt):
+        count = self.count
+        if count:
+            rows = slice(0, count)
+            self.age[rows] += dt
+            if GRAVITYON:
+                self.velocity[rows, 1] += numpy.where(self.weightless[rows], 0, gravity * dt)
+            delta = self.velocity[rows] * dt * METRE
+
+            colSim = self.colSim[rows]
+            self.pos[rows][~colSim] += delta[~colSim] # Particles that don't collide just drift
+            if colSim.any():
+                colRows = numpy.flatnonzero(colSim)
+                others = world if self.mask is None else [x for x in world if x not in self.mask]
+                bounds = rectArray(others)
+                ids = numpy.array([id(x) for x in others], dtype=numpy.int64)
+                for axis in (0, 1):
+                    hit = self.Collide(colRows, axis, delta[colRows, axis], bounds, ids)
+                    hitRows = colRows[hit]
+                    self.velocity[hitRows, axis] *= self.bounce[hitRows]
+
+            life = self.life[rows]
+            alive = (life == 0) | (self.age[rows] < life) # A lifetime of 0 is an infinite particle; it does not expire
+            if not alive.all():
+                self.Compact(alive)
 
         for obj in world:
             now = time.time()
@@ -901,15 +1476,16 @@ class ParticleHandler:
         x = random.randint(int(pos[0] - (rect.width / 2)), int(pos[0] + (rect.width / 2)))
         y = random.randint(int(pos[1] - (rect.height / 2)), int(pos[1] + (rect.height / 2)))
 
-        self.Add(Particle(Vec2(x, y), velocity, life, weightless, colour, 2, colSim, parent))
+        self.Add([(x, y)], [tuple(velocity)], life, colour, weightless, colSim, parent)
 
-    def Add(self, particle):
-        self.particles.append(particle)
-    def CreateEngineParticles(self, ship, drive):
-        for i in range(0, 10):
-            x, y = tuple(ship.engine) # Starting pos is the engine
-            uv = drive.Inverse().GetNormalized() + Vec2(random.uniform(-1, 1), 0)
-            self.Add(EngineParticle(ship.engine, uv, random.uniform(0.5, 0.8), ship))
+    def CreateEngineParticles(self, ship, drive, n=10):
+        uv = drive.Inverse().GetNormalized() # Starting pos is the engine, heading out of it with some random spread
+        velocity = numpy.empty((n, 2))
+        velocity[:, 0] = uv.x + numpy.random.uniform(-1, 1, n)
+        velocity[:, 1] = uv.y
+        self.Add(numpy.tile(tuple(ship.engine), (n, 1)), velocity, numpy.random.uniform(0.5, 0.8, n),
+                 (255, 174, 0, 0), colSim=True, parent=ship, extent=1, endColour=(255, 255, 255, 255), endRadius=5,
+                 bounce=-0.8)
 
 class Objective(WorldCollider):
     def __init__(self, pos, width, height, material="Asphalt"):
@@ -926,8 +1502,11 @@ class Objective(WorldCollider):
         self.colour = self.original
         self.complete = False
         return False
-    def Draw(self, screen):
-        pygame.draw.rect(screen, self.colour, self.rect)
+    def Draw(self, screen, offset=(0, 0)):
+        """
+        :param offset: Moves where the rect is drawn, for drawing onto a surface that isn't in screen coordinates
+        """
+        pygame.draw.rect(screen, self.colour, self.rect.move(offset))
     def GetRect(self):
         return self.rect
 
@@ -951,8 +1530,11 @@ class Obstacle(WorldCollider):
             print("GAME OVER!!!!!")
             return True
         return False
-    def Draw(self, screen):
-        pygame.draw.rect(screen, self.colour, self.rect)
+    def Draw(self, screen, offset=(0, 0)):
+        """
+        :param offset: Moves where the rect is drawn, for drawing onto a surface that isn't in screen coordinates
+        """
+        pygame.draw.rect(screen, self.colour, self.rect.move(offset))
     def GetRect(self):
         return self.rect
 
@@ -978,17 +1560,17 @@ class AirStream(WorldCollider):
     def Update(self, objects):
         for obj in objects:
             if self.streamRect.contains(obj.GetRect()) or self.streamRect.colliderect(obj.GetRect()): # If the object is within the airstream's zone
-                obj.AddForce(self, "Wind", self.force)
+                obj.AddForce(self, ForceKind.WIND, self.force)
             else:
-                obj.RemoveForce(self, "Wind")
+                obj.RemoveForce(self, ForceKind.WIND)
 
         if self.pos - self.oldPos != Vec2(0, 0): # check if the source was moved and move the airstream accordingly
             self.streamRect.topleft = tuple(Vec2(self.streamRect.topleft) + (self.pos - self.oldPos))
             self.oldPos = copy.deepcopy(self.pos)
-    def Draw(self, screen):
-        pygame.draw.rect(screen, self.colour, self.rect)
+    def Draw(self, screen, offset=(0, 0)):
+        pygame.draw.rect(screen, self.colour, self.rect.move(offset))
         if DEBUG:
-            pygame.draw.rect(screen, RED, self.streamRect, 1)
+            pygame.draw.rect(screen, RED, self.streamRect.move(offset), 1)
     def GetForce(self):
         return self.force
 
@@ -0,0 +1,248 @@
+"""
+Closed-form ray casting against axis-aligned rectangles, using the slab method.
+
+A ray is given by an origin and a direction; the direction does not need to be normalised, all distances
+returned are measured in pixels along the normalised direction. Rays that start inside a rect count as a hit at
+distance 0 with a zero normal.
+
+Rects are half-open like pygame's: a rect covers left <= x < right and top <= y < bottom, so a ray that only runs
+along or reaches a rect's right or bottom edge misses it, just as colliderect() and collidepoint() would.
+"""
+import math, numpy
+from collections import namedtuple
+
+class RayHit(namedtuple("RayHit", ("hit", "distance", "point", "normal"), defaults=(math.inf, None, (0, 0)))):
+    """
+    The result of a cast. It's a tuple, so one can be shared (like MISS) without a caller being able to change it.
+
+    hit: Whether the ray hit the target
+    distance: Distance from the origin to the hit point
+    point: The point where the ray first entered the target
+    normal: The outward normal of the surface that was hit
+    """
+    __slots__ = ()
+    def __bool__(self):
+        return self.hit
+    def __str__(self):
+        return f"RayHit({self.hit}, {self.distance}, {self.point}, {self.normal})"
+
+MISS = RayHit(False)
+
+def rectBounds(target):
+    """Returns (left, top, right, bottom) for a pygame Rect or any object with a GetRect() method"""
+    if not hasattr(target, "left"):
+        target = target.GetRect()
+    return target.left, target.top, target.right, target.bottom
+
+def rectArray(targets):
+    """
+    Packs a list of rects/objects into an (n, 4) array of left, top, right, bottom for the batched casts
+
+    :param targets: List of pygame Rects or objects with a GetRect() method
+    :return: numpy array of shape (n, 4)
+    """
+    return numpy.array([rectBounds(x) for x in targets], dtype=float).reshape(-1, 4)
+
+def raycast(origin, direction, target, maxDistance=math.inf):
+    """
+    Casts a single ray against a single rect.
+
+    :param origin: Start point of the ray
+    :type origin: Vec2 or tuple
+    :param direction: Direction of the ray
+    :type direction: Vec2 or tuple
+    :param target: A pygame Rect or an object with a GetRect() method
+    :param float maxDistance: Hits further than this are ignored
+    :return: RayHit
+    """
+    ox, oy = origin
+    dx, dy = direction
+    length = math.hypot(dx, dy)
+    if length == 0:
+        return MISS
+    dx, dy = dx / length, dy / length
+    left, top, right, bottom = rectBounds(target)
+
+    # Entry and exit distance along each axis, and whether the ray is in the slab exactly at them: the left/top edge
+    # belongs to the rect and the right/bottom one doesn't. A ray parallel to an axis either always or never lies in
+    # that slab.
+    x = _slab(ox, dx, left, right)
+    y = _slab(oy, dy, top, bottom)
+    if x is None or y is None:
+        return MISS
+    txEnter, txExit, xEnterShut, xExitShut = x
+    tyEnter, tyExit, yEnterShut, yExitShut = y
+
+    tEnter = max(txEnter, tyEnter)
+    enterShut = xEnterShut if txEnter > tyEnter else yEnterShut if tyEnter > txEnter else xEnterShut and yEnterShut
+    tExit = min(txExit, tyExit)
+    exitShut = xExitShut if txExit < tyExit else yExitShut if tyExit < txExit else xExitShut and yExitShut
+    if tEnter < 0: # Only the part of the ray ahead of the origin counts, starting with the origin itself
+        tEnter, enterShut = 0, True
+    if not (tEnter < tExit or tEnter == tExit and enterShut and exitShut) or tEnter > maxDistance:
+        return MISS
+
+    if tEnter == 0 and enterShut: # The origin is already inside the rect
+        return RayHit(True, 0, (ox, oy), (0, 0))
+    if txEnter >= tyEnter:
+        normal = (-1 if dx > 0 else 1, 0)
+    else:
+        normal = (0, -1 if dy > 0 else 1)
+    return RayHit(True, tEnter, (ox + dx * tEnter, oy + dy * tEnter), normal)
+
+def _slab(o, d, low, high):
+    """
+    :return: (enter, exit, enterShut, exitShut) distances along a ray through the slab low <= x < high, and whether
+             the ray is in the slab at exactly those distances, or None if a ray parallel to the slab is outside it
+    """
+    if d > 0:
+        return (low - o) / d, (high - o) / d, True, False
+    if d < 0:
+        return (high - o) / d, (low - o) / d, False, True
+    if low <= o < high:
+        return -math.inf, math.inf, True, True
+    return None
+
+def _slabs(ox, oy, dx, dy, bounds, maxDistance):
+    """
+    Vectorised slab test. All ray arguments broadcast against the rows of bounds.
+
+    :return: hit mask, distances, hit points and normals as numpy arrays
+    """
+    left, top, right, bottom = bounds[:, 0], bounds[:, 1], bounds[:, 2], bounds[:, 3]
+    length = numpy.hypot(dx, dy)
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        dx, dy = dx / length, dy / length
+        tx1, tx2 = (left - ox) / dx, (right - ox) / dx
+        ty1, ty2 = (top - oy) / dy, (bottom - oy) / dy
+
+    # Parallel rays produce inf/nan above; replace them with an open or empty slab. As in _slab(), the left/top edge
+    # is in the rect and the right/bottom one isn't, so which end of a slab is shut depends on the ray's direction.
+    insideX = (left <= ox) & (ox < right)
+    insideY = (top <= oy) & (oy < bottom)
+    txEnter = numpy.where(dx == 0, numpy.where(insideX, -numpy.inf, numpy.inf), numpy.fmin(tx1, tx2))
+    txExit = numpy.where(dx == 0, numpy.where(insideX, numpy.inf, -numpy.inf), numpy.fmax(tx1, tx2))
+    tyEnter = numpy.where(dy == 0, numpy.where(insideY, -numpy.inf, numpy.inf), numpy.fmin(ty1, ty2))
+    tyExit = numpy.where(dy == 0, numpy.where(insideY, numpy.inf, -numpy.inf), numpy.fmax(ty1, ty2))
+    xEnterShut, xExitShut = dx >= 0, dx <= 0
+    yEnterShut, yExitShut = dy >= 0, dy <= 0
+
+    tEnter, tExit = numpy.maximum(txEnter, tyEnter), numpy.minimum(txExit, tyExit)
+    enterShut = numpy.where(txEnter > tyEnter, xEnterShut, numpy.where(tyEnter > txEnter, yEnterShut, xEnterShut & yEnterShut))
+    exitShut = numpy.where(txExit < tyExit, xExitShut, numpy.where(tyExit < txExit, yExitShut, xExitShut & yExitShut))
+    behind = tEnter < 0
+    enterShut = enterShut | behind
+    start = numpy.maximum(tEnter, 0)
+    hit = ((start < tExit) | ((start == tExit) & enterShut & exitShut)) & (start <= maxDistance) & (length != 0)
+    distance = numpy.where(hit, start, numpy.inf)
+
+    inside = behind | ((tEnter == 0) & enterShut)
+    xFace = (txEnter >= tyEnter) & ~inside
+    yFace = (txEnter < tyEnter) & ~inside
+    normals = numpy.zeros(distance.shape + (2,))
+    normals[..., 0] = numpy.where(hit & xFace, -numpy.sign(dx), 0)
+    normals[..., 1] = numpy.where(hit & yFace, -numpy.sign(dy), 0)
+
+    safe = numpy.where(hit, distance, 0)
+    points = numpy.stack([ox + numpy.nan_to_num(dx) * safe, oy + numpy.nan_to_num(dy) * safe], axis=-1)
+    return hit, distance, points, normals
+
+def raycastMany(origin, direction, targets, maxDistance=math.inf):
+    """
+    Casts one ray against many rects in a single pass.
+
+    :param origin: Start point of the ray
+    :param direction: Direction of the ray
+    :param targets: List of rects/objects, or an (n, 4) array from rectArray()
+    :param float maxDistance: Hits further than this are ignored
+    :return: (hit, distance, points, normals) arrays, one row per target
+    """
+    bounds = targets if isinstance(targets, numpy.ndarray) else rectArray(targets)
+    ox, oy = origin
+    dx, dy = direction
+    return _slabs(float(ox), float(oy), float(dx), float(dy), bounds, maxDistance)
+
+def raycastRays(origins, directions, target, maxDistance=math.inf):
+    """
+    Casts many rays against one rect in a single pass.
+
+    :param origins: (n, 2) array-like of ray start points
+    :param directions: (n, 2) array-like of ray directions
+    :param target: A pygame Rect or an object with a GetRect() method
+    :param float maxDistance: Hits further than this are ignored
+    :return: (hit, distance, points, normals) arrays, one row per ray
+    """
+    origins = numpy.asarray(origins, dtype=float).reshape(-1, 2)
+    directions = numpy.asarray(directions, dtype=float).reshape(-1, 2)
+    bounds = numpy.array([rectBounds(target)], dtype=float)
+    return _slabs(origins[:, 0], origins[:, 1], directions[:, 0], directions[:, 1], bounds, maxDistance)
+
+def raycastPairs(origins, directions, targets, maxDistance=math.inf):
+    """
+    Casts many rays, each against its own rect, in a single pass.
+
+    :param origins: (n, 2) array-like of ray start points
+    :param directions: (n, 2) array-like of ray directions
+    :param targets: (n, 4) array of left, top, right, bottom, one row per ray
+    :param float maxDistance: Hits further than this are ignored
+    :return: (hit, distance, points, normals) arrays, one row per ray
+    """
+    origins = numpy.asarray(origins, dtype=float).reshape(-1, 2)
+    directions = numpy.asarray(directions, dtype=float).reshape(-1, 2)
+    bounds = numpy.asarray(targets, dtype=float).reshape(-1, 4)
+    return _slabs(origins[:, 0], origins[:, 1], directions[:, 0], directions[:, 1], bounds, maxDistance)
+
+def closestHit(origin, direction, targets, maxDistance=math.inf):
+    """
+    Line-of-sight query: the nearest of several targets along a ray.
+
+    :return: (target, RayHit) for the closest target hit, or (None, MISS)
+    """
+    if len(targets) == 0:
+        return None, MISS
+    hit, distance, points, normals = raycastMany(origin, direction, targets, maxDistance)
+    if not hit.any():
+        return None, MISS
+    i = int(numpy.argmin(distance))
+    return targets[i], RayHit(True, float(distance[i]), tuple(points[i]), tuple(normals[i]))
+
+def sweep(rect, delta, target):
+    """
+    Swept-AABB test: when a moving rect first makes contact with a static one. This is a ray cast from the moving
+    rect's centre against the target grown by the moving rect's half extents, except that the slabs are open, so
+    rects that only share an edge can slide along each other without a hit being registered.
+
+    :param rect: The moving rect, at its starting position
+    :param delta: How far the rect is moving
+    :type delta: Vec2 or tuple
+    :param target: A pygame Rect or an object with a GetRect() method
+    :return: (time of impact as a fraction of delta, normal), or None if there is no contact within delta. Rects
+             that already overlap are not reported.
+    """
+    dx, dy = delta
+    halfw, halfh = rect.width / 2, rect.height / 2
+    ox, oy = rect.left + halfw, rect.top + halfh
+    left, top, right, bottom = rectBounds(target)
+    left, top, right, bottom = left - halfw, top - halfh, right + halfw, bottom + halfh
+
+    if dx != 0:
+        tx1, tx2 = (left - ox) / dx, (right - ox) / dx
+        txEnter, txExit = min(tx1, tx2), max(tx1, tx2)
+    elif left < ox < right:
+        txEnter, txExit = -math.inf, math.inf
+    else:
+        return None
+    if dy != 0:
+        ty1, ty2 = (top - oy) / dy, (bottom - oy) / dy
+        tyEnter, tyExit = min(ty1, ty2), max(ty1, ty2)
+    elif top < oy < bottom:
+        tyEnter, tyExit = -math.inf, math.inf
+    else:
+        return None
+
+    tEnter, tExit = max(txEnter, tyEnter), min(txExit, tyExit)
+    if tEnter >= tExit or tEnter < 0 or tEnter > 1:
+        return None
+    if txEnter >= tyEnter:
+        return tEnter, (-1 if dx > 0 else 1, 0)
+    return tEnter, (0, -1 if dy > 0 else 1)
@@ -0,0 +1,31 @@
+"""
+Fixed-timestep scheduling. Real frame times are added to an accumulator and paid out as whole simulation steps of a
+constant size, so the simulation gives the same results however fast or unevenly frames are drawn.
+"""
+from constants import PHYSICS_RATE, MAX_CATCHUP_STEPS
+
+class FixedStep:
+    def __init__(self, rate=PHYSICS_RATE, maxSteps=MAX_CATCHUP_STEPS):
+        """
+        :param float rate: Simulation steps per second
+        :param int maxSteps: The most steps to run for a single frame. After a long stall (e.g. loading a level) the
+                             rest of the time is dropped instead of freezing while the simulation catches up.
+        """
+        self.dt = 1 / rate
+        self.maxSteps = maxSteps
+        self.accumulator = 0
+        self.alpha = 0 # How far the current time is between the last step and the next one
+    def Advance(self, frameTime):
+        """
+        :param float frameTime: Real seconds since the last frame
+        :return: The number of fixed steps to run this frame
+        """
+        self.accumulator += frameTime
+        steps = int(self.accumulator // self.dt)
+        if steps > self.maxSteps:
+            steps = self.maxSteps
+            self.accumulator = self.accumulator % self.dt
+        else:
+            self.accumulator -= steps * self.dt
+        self.alpha = self.accumulator / self.dt
+        return steps
@@ -0,0 +1,15 @@
+"""
+Headless simulation core. Runs a level loaded by level_load() with the same physics as the game, driven by injected
+Inputs instead of the keyboard, and needs no window, fonts or event pump; sprites are replaced by size-only Sprites.
+
+    from sim import Simulation, Inputs
+    simulation = Simulation(1)
+    simulation.Run(Inputs(thrust=True), 2000)
+"""
+from .level import level_load, level_images, Sprite
+from .simulation import Simulation, Inputs
+from .scoring import level_score
+from .recording import Recording, replay
+from .snapshot import SnapshotRing
+from .preview import Trajectory
+from .vector import VectorEnv
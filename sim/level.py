@@ -0,0 +1,243 @@
+"""
+Loading levels from the CSV files in levels/<n>/, with or without a display.
+
+The CSVs are the source a level is edited in. The first load compiles them into one binary file, levels/<n>/level.bin,
+holding a NumPy array per kind of row and a table of the sprite paths they use; later loads map that file into memory
+instead of parsing text. It is compiled again whenever one of the CSVs has been modified since.
+"""
+import os, csv, math, struct, tempfile
+import numpy, pygame
+from constants import *
+from physics import *
+
+class Sprite:
+    """
+    Size-only stand-in for a pygame Surface. The simulation only ever asks an image for its size, its rect and a
+    rotated copy, so headless runs use these instead of decoding and converting pixel data.
+    """
+    def __init__(self, width, height):
+        self.width, self.height = width, height
+    @staticmethod
+    def Load(path):
+        """Reads just the dimensions of an image file; PNG headers are parsed directly, anything else is decoded"""
+        return Sprite(*imageSize(path))
+    def __eq__(self, other):
+        if not isinstance(other, Sprite):
+            return NotImplemented
+        return (self.width, self.height) == (other.width, other.height)
+    def __hash__(self):
+        return hash((self.width, self.height)) # Same sized sprites share their entries in the rotation cache
+    def get_width(self):
+        return self.width
+    def get_height(self):
+        return self.height
+    def get_size(self):
+        return self.width, self.height
+    def get_rect(self, **kwargs):
+        rect = pygame.Rect(0, 0, self.width, self.height)
+        for attribute, value in kwargs.items():
+            setattr(rect, attribute, value)
+        return rect
+    def Rotate(self, angle):
+        """The size pygame.transform.rotate would give the rotated surface (mirrors pygame's own calculation)"""
+        if angle % 90 == 0:
+            turns = int(angle / 90) % 4
+            return Sprite(self.height, self.width) if turns % 2 else Sprite(self.width, self.height)
+        rads = angle * 0.01745329251994329
+        sangle, cangle = math.sin(rads), math.cos(rads)
+        cx, cy = cangle * self.width, cangle * self.height
+        sx, sy = sangle * self.width, sangle * self.height
+        width = int(max(abs(cx + sy), abs(cx - sy), abs(-cx + sy), abs(-cx - sy)))
+        height = int(max(abs(sx + cy), abs(sx - cy), abs(-sx + cy), abs(-sx - cy)))
+        return Sprite(width, height)
+
+LEVEL_SOURCES = ("world.csv", "objects.csv", "player.csv", "objectives.csv", "obstacles.csv", "hazards.csv",
+                 "constants.csv")
+LEVEL_BINARY = "level.bin"
+LEVEL_MAGIC = b"PHXL"
+LEVEL_VERSION = 1
+HEADER = struct.Struct("<4sII") # Magic, format version, number of arrays
+ENTRY = struct.Struct("<16s4sIIQ") # Array name, dtype, rows, columns, byte offset into the file
+OBJECTIVE_KINDS = ("PLAYER", "PHYS")
+
+def sourceTimes(level):
+    """:return: The modification time of each of a level's CSVs, in nanoseconds"""
+    return numpy.array([os.stat(os.path.join("levels", level, name)).st_mtime_ns for name in LEVEL_SOURCES], numpy.int64)
+
+def table(strings):
+    """Packs a list of strings into one array of bytes"""
+    return numpy.frombuffer("\0".join(strings).encode(), numpy.uint8).reshape(1, -1)
+
+def untable(array):
+    return bytes(array).decode().split("\0") if array.size else []
+
+def level_compile(level):
+    """
+    Parses a level's CSVs into arrays.
+
+    :param level: The level number/directory name
+    :return: Dictionary of arrays, ready to be written by level_write()
+    """
+    level = str(level)
+    # Taken before reading, so a CSV saved while compiling looks newer than what was compiled and gets compiled again
+    sources = sourceTimes(level)
+    rows = {}
+    for name in LEVEL_SOURCES:
+        with open(os.path.join("levels", level, name), "r") as file:
+            rows[name] = [row for row in csv.reader(file) if row]
+
+    assets, materials = [], []
+    def index(strings, value):
+        if value not in strings:
+            strings.append(value)
+        return strings.index(value)
+
+    world = [list(map(int, row[0:4])) + [index(materials, row[4]) if len(row) == 5 else -1] for row in rows["world.csv"]]
+    objects = [list(map(int, row[0:2])) + [index(assets, row[2])] + list(map(float, row[3:6])) for row in rows["objects.csv"]]
+    player = [list(map(int, row[0:2])) + list(map(float, row[2:5])) + [bool(row[5])] for row in rows["player.csv"][-1:]]
+    objectives, keyObjects = [], []
+    for row in rows["objectives.csv"]:
+        if row[0] in OBJECTIVE_KINDS:
+            objectives.append([OBJECTIVE_KINDS.index(row[0])] + list(map(int, row[1:5])))
+        elif row[0] == "OBJECT":
+            conv = list(map(float, row[4:]))
+            keyObjects.append(list(map(int, row[1:3])) + [index(assets, row[3])] + conv[0:4] + conv[-2:])
+    obstacles = [list(map(int, row[0:4])) for row in rows["obstacles.csv"]]
+    hazards = [list(map(int, row[0:6])) + list(map(int, row[-2:])) for row in rows["hazards.csv"]]
+
+    def array(values, dtype, columns):
+        return numpy.array(values, dtype).reshape(-1, columns)
+    return {
+        "sources": sources.reshape(1, -1),
+        "world": array(world, numpy.int32, 5),
+        "objects": array(objects, numpy.float64, 6),
+        "player": array(player, numpy.float64, 6),
+        "objectives": array(objectives, numpy.int32, 5),
+        "keyobjects": array(keyObjects, numpy.float64, 9),
+        "obstacles": array(obstacles, numpy.int32, 4),
+        "hazards": array(hazards, numpy.int32, 8),
+        "constants": array([float(row[0]) for row in rows["constants.csv"]], numpy.float64, 1),
+        "assets": table(assets),
+        "materials": table(materials)
+    }
+
+def level_write(arrays, path):
+    """Writes compiled arrays to a file: a header, a table of where each array is, then the arrays themselves"""
+    offset = HEADER.size + ENTRY.size * len(arrays)
+    entries, blobs = [], []
+    for name, array in arrays.items():
+        offset += -offset % 8 # Keep every array aligned
+        rows, columns = array.shape
+        entries.append(ENTRY.pack(name.encode(), array.dtype.str.encode(), rows, columns, offset))
+        blobs.append((offset, array.tobytes()))
+        offset += array.nbytes
+    # A temp file of its own, since the asset worker and the main thread can compile the same level at once
+    handle, temp = tempfile.mkstemp(".tmp", LEVEL_BINARY + ".", os.path.dirname(path))
+    try:
+        with os.fdopen(handle, "wb") as file:
+            file.write(HEADER.pack(LEVEL_MAGIC, LEVEL_VERSION, len(arrays)))
+            file.write(b"".join(entries))
+            for start, blob in blobs:
+                file.write(b"\0" * (start - file.tell()))
+                file.write(blob)
+        os.replace(temp, path) # Never leave a half written file where a later load would find it
+    except BaseException:
+        os.remove(temp)
+        raise
+
+def level_read(path):
+    """
+    :return: Dictionary of arrays backed by the memory mapped file, or None if it isn't a compiled level this version
+             can read
+    """
+    if not os.path.isfile(path) or os.path.getsize(path) < HEADER.size:
+        return None
+    data = numpy.memmap(path, numpy.uint8, "r")
+    magic, version, count = HEADER.unpack_from(data)
+    if magic != LEVEL_MAGIC or version != LEVEL_VERSION:
+        return None
+    arrays = {}
+    for i in range(count):
+        name, dtype, rows, columns, offset = ENTRY.unpack_from(data, HEADER.size + ENTRY.size * i)
+        arrays[name.rstrip(b"\0").decode()] = numpy.ndarray((rows, columns), dtype.rstrip(b"\0").decode(), data, offset)
+    return arrays
+
+def level_cached(level):
+    """
+    :param level: The level number/directory name
+    :return: The level's compiled arrays, compiling them first if the CSVs have changed since they were last compiled
+    """
+    level = str(level)
+    path = os.path.join("levels", level, LEVEL_BINARY)
+    arrays = level_read(path)
+    if arrays is not None and numpy.array_equal(arrays["sources"][0], sourceTimes(level)):
+        return arrays
+    arrays = level_compile(level)
+    try:
+        level_write(arrays, path)
+    except OSError:
+        pass # Somewhere read-only; the level still loads, it just gets compiled every time
+    return arrays
+
+def level_images(level):
+    """:return: Every image file the level loads: its background, the player's sprite and the sprites its rows use"""
+    level = str(level)
+    return [os.path.join("levels", level, "background.png"), PLAYER_SPRITE] + untable(level_cached(level)["assets"])
+
+def level_load(level, loadImage=Sprite.Load, store=None):
+    """
+    :param level: The level number/directory name
+    :param loadImage: Function that turns a sprite path into an image; the default gives size-only Sprites, the game
+                      passes one that returns surfaces to draw
+    :param BodyArrays store: Arrays to create the player and objects in, the player first
+    :return: Dictionary of everything in the level
+    """
+    ## All level info stored as a dictionary
+    level = str(level)
+    arrays = level_cached(level)
+    images = [loadImage(path) for path in untable(arrays["assets"])] # Each sprite is loaded once, however many rows use it
+    materials = untable(arrays["materials"])
+    info = {
+        "background": os.path.join("levels", level, "background.png"),
+        "world": [],
+        "objects": [],
+        "objectives": [],
+        "obstacles": [],
+        "hazards": [],
+        "constants": {"gravity": None, "airdensity": None},
+        "player": None
+    }
+    ## LOADING WORLD COLLIDERS ##
+    for x, y, w, h, material in arrays["world"].tolist():
+        if material >= 0:
+            info["world"].append(WorldCollider(pygame.Rect(x, y, w, h), materials[material]))
+        else:
+            info["world"].append(WorldCollider(pygame.Rect(x, y, w, h)))
+
+    ## LOADING THE PLAYER ##
+    for x, y, mass, fuel, thrust, weightlessfuel in arrays["player"].tolist():
+        info["player"] = Player((int(x), int(y)), loadImage(PLAYER_SPRITE), mass, fuel, thrust, bool(weightlessfuel), store)
+
+    ## LOADING PHYSICS OBJECTS (Regular) ##
+    for x, y, asset, mass, Cd, COR in arrays["objects"].tolist():
+        info["objects"].append(PhysObject((int(x), int(y)), images[int(asset)], mass, Cd, COR, store))
+
+    ## LOADING LEVEL OBJECTIVES ##
+    for kind, x, y, w, h in arrays["objectives"].tolist():
+        objective = PlayerObjective if OBJECTIVE_KINDS[kind] == "PLAYER" else PhysObjective
+        info["objectives"].append(objective(Vec2(x, y), w, h))
+    for x, y, asset, mass, r, g, b, Cd, COR in arrays["keyobjects"].tolist():
+        info["objects"].append(KeyObject((int(x), int(y)), images[int(asset)], mass, (r, g, b), Cd, COR, store))
+
+    ## LOADING OBSTACLES ##
+    for x, y, w, h in arrays["obstacles"].tolist():
+        info["obstacles"].append(Obstacle(Vec2(x, y), w, h, info["player"]))
+
+    ## LOADING HAZARDS (AIRSTREAMS) ##
+    for x, y, w, h, streamWidth, streamHeight, fx, fy in arrays["hazards"].tolist():
+        info["hazards"].append(AirStream(Vec2(x, y), w, h, streamWidth, streamHeight, Vec2(fx, fy)))
+
+    constants = arrays["constants"][:, 0].tolist()
+    info["constants"]["gravity"] = constants[0]
+    info["constants"]["airdensity"] = constants[1]
+    return info
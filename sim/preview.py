@@ -0,0 +1,117 @@
+"""
+Predicting where the player will go if the controls stay as they are, for drawing as a line ahead of the ship.
+
+Rather than copying the player and stepping a whole Simulation, only what acts on a body in flight is worked out:
+weight and air resistance as BodyArrays.Integrate() does them, airstream Wind, and the engine's Drive with the fuel it
+burns. That is done with plain floats for the one body, since NumPy's per call overhead would dominate for a single
+row. The line ends where it first runs into a collider, since contacts aren't modelled. While the controls don't change
+and the player keeps to the line, the same prediction is kept and only extended each frame.
+"""
+import time, math
+from constants import PHYSICS_RATE, PLAYER_ROTATION_SPEED, RAD, METRE, GRAVITYON, PREVIEW_SECONDS, PREVIEW_BUDGET, \
+    PREVIEW_TOLERANCE
+from physics import ForceKind, WorldCollider, coltest, rotateImage
+
+def sign(x):
+    return (x > 0) - (x < 0)
+
+class Trajectory:
+    def __init__(self, simulation, seconds=PREVIEW_SECONDS, budget=PREVIEW_BUDGET, dt=1 / PHYSICS_RATE):
+        """
+        :param Simulation simulation: The level whose player to follow
+        :param float seconds: How far ahead to predict
+        :param float budget: Most seconds Update() spends predicting per call
+        :param float dt: Length of each simulation step
+        """
+        self.simulation = simulation
+        self.length = int(seconds / dt)
+        self.budget = budget
+        self.dt = dt
+        self.points = [] # Predicted positions of the player's centre after each of the coming steps
+        self.start = None # The simulation step the first point follows
+        self.inputs = None
+        self.hit = False # The prediction ended against a collider
+    def Reset(self, inputs):
+        """Starts predicting again from where the player is now"""
+        player = self.simulation.player
+        drive = player.forces.GetForce(player, ForceKind.DRIVE)
+        self.drive = (drive.x, drive.y) if drive is not None else (0, 0)
+        self.pos, self.velocity, self.drag = tuple(player.pos), tuple(player.velocity), tuple(player.drag)
+        self.angle, self.fuel, self.rect = player.angle, player.fuel, player.rect.copy()
+        self.points, self.start, self.inputs, self.hit = [], self.simulation.steps, inputs, False
+    def Step(self):
+        """Advances the prediction by one step, in the same order Simulation.Step() works on the player"""
+        simulation, player, dt = self.simulation, self.simulation.player, self.dt
+        gravity, airdensity = simulation.constants["gravity"], simulation.constants["airdensity"]
+        windX = windY = 0
+        for hazard in simulation.hazards:
+            if hazard.streamRect.colliderect(self.rect):
+                windX, windY = windX + hazard.force.x, windY + hazard.force.y
+        mass = player.bodymass + self.fuel if not player.weightlessfuel else player.mass
+
+        ## BodyArrays.Integrate() for this one body ##
+        vx, vy = self.velocity
+        weight = 0 if player.weightless or not GRAVITYON else mass * gravity
+        sqrMag = vx * vx + vy * vy
+        if sqrMag > 0: # A body that has stopped keeps whatever drag it had last
+            A = (self.rect.height if vx > vy else self.rect.width) / METRE
+            dragmag = sqrMag * 0.5 * airdensity * player.Cd * A
+            mag = math.sqrt(sqrMag)
+            dragX, dragY = -(vx / mag) * dragmag, -(vy / mag) * dragmag
+            self.drag = (0, 0) if round(dragX, 1) == 0 and round(dragY, 1) == 0 else (dragX, dragY)
+        forceX = windX + self.drive[0] + self.drag[0]
+        forceY = windY + self.drive[1] + weight + self.drag[1]
+        vx, vy = vx + forceX / mass * dt, vy + forceY / mass * dt
+        if round(vx, 1) == 0 and sign(vx) != sign(forceX):
+            vx = 0
+        if round(vy, 1) == 0 and sign(vy) != sign(forceY):
+            vy = 0
+        self.velocity = (vx, vy)
+
+        x, y = self.pos
+        self.pos = (x + vx * dt * METRE, y + vy * dt * METRE)
+        self.rect.center = self.pos
+        if coltest(self.rect, simulation.grid.Query(self.rect, player, WorldCollider)):
+            self.hit = True
+            return
+
+        ## The controls, as Simulation.Step() and Player apply them after moving ##
+        if self.fuel <= 1:
+            self.drive = (0, 0)
+        inputs = self.inputs
+        for held, scale in ((inputs.right, 1), (inputs.left, -1)):
+            if held:
+                self.angle -= PLAYER_ROTATION_SPEED * scale * dt
+                self.rect = rotateImage(player.image_clean, self.angle).get_rect(center=self.rect.center)
+        if inputs.thrust or inputs.reverse:
+            if self.fuel >= 1:
+                rads = self.angle * RAD
+                x, y = -player.thrust * math.sin(rads), -player.thrust * math.cos(rads)
+                self.drive = (x, y) if inputs.thrust else (-x, -y)
+                self.fuel -= 1
+        else:
+            self.drive = (0, 0)
+        self.points.append(self.pos)
+    def Update(self, inputs):
+        """
+        Brings the prediction up to date with the simulation, then extends it for at most the time budget.
+
+        :param Inputs inputs: The controls being held
+        :return: The predicted positions from now on
+        """
+        player = self.simulation.player
+        done = self.simulation.steps - self.start if self.start is not None else -1
+        if done < 0 or inputs != self.inputs or done > len(self.points):
+            self.Reset(inputs)
+        elif done > 0:
+            x, y = self.points[done - 1]
+            if abs(x - player.pos.x) > PREVIEW_TOLERANCE or abs(y - player.pos.y) > PREVIEW_TOLERANCE:
+                self.Reset(inputs) # Something the prediction leaves out, like a contact, has moved the player
+            else:
+                del self.points[:done]
+                self.start += done
+
+        deadline = time.perf_counter() + self.budget
+        while not self.hit and len(self.points) < self.length and time.perf_counter() < deadline:
+            self.Step()
+        return self.points
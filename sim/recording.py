@@ -0,0 +1,99 @@
+"""
+Recording the inputs of a run so it can be simulated again without a window, e.g. to check a leaderboard score or to
+reproduce a bug. Since the simulation is deterministic, the level, its constants and the inputs held on each step are
+all that is needed to get the same result.
+
+The inputs are stored as runs of identical steps, each packed into 16 bits: the four input bits and a 12 bit length.
+A level flown in a minute with a few hundred key presses takes about a kilobyte.
+
+    python -m sim.recording 2 bob      replays bob's entry on the level 2 leaderboard and checks the score
+"""
+import os, sys, csv, base64, struct
+import numpy
+from constants import PHYSICS_RATE
+from .simulation import Simulation, Inputs
+
+MAGIC = b"PHXR"
+VERSION = 1
+HEADER = struct.Struct("<4sH16sdddI") # Magic, version, level, step length, gravity, air density, number of runs
+MAX_RUN = (1 << 12) - 1 # Longest run one entry can hold; longer ones are split
+
+class Recording:
+    def __init__(self, level, constants, dt=1 / PHYSICS_RATE):
+        """
+        :param level: The level number/directory name
+        :param dict constants: The level's constants ("gravity" and "airdensity") the run used
+        :param float dt: Length of each step in seconds
+        """
+        self.level = str(level)
+        self.constants = dict(constants)
+        self.dt = dt
+        self.runs = [] # [input bits, number of steps], in order
+    def Record(self, inputs):
+        """:param Inputs inputs: The controls held for the next step"""
+        bits = inputs.Pack()
+        if self.runs and self.runs[-1][0] == bits and self.runs[-1][1] < MAX_RUN:
+            self.runs[-1][1] += 1
+        else:
+            self.runs.append([bits, 1])
+    def Steps(self):
+        """:return: Number of steps recorded"""
+        return sum(count for _, count in self.runs)
+    def StepInputs(self):
+        """:return: A generator of the Inputs for each recorded step"""
+        for bits, count in self.runs:
+            inputs = Inputs.Unpack(bits)
+            for _ in range(count):
+                yield inputs
+    def ToBytes(self):
+        runs = numpy.array([bits | count << 4 for bits, count in self.runs], numpy.uint16)
+        return HEADER.pack(MAGIC, VERSION, self.level.encode(), self.dt, self.constants["gravity"],
+                           self.constants["airdensity"], len(runs)) + runs.astype("<u2").tobytes()
+    @staticmethod
+    def FromBytes(data):
+        magic, version, level, dt, gravity, airdensity, count = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a recording this version can read")
+        recording = Recording(level.rstrip(b"\0").decode(), {"gravity": gravity, "airdensity": airdensity}, dt)
+        runs = numpy.frombuffer(data, "<u2", count, HEADER.size).tolist()
+        recording.runs = [[entry & 15, entry >> 4] for entry in runs]
+        return recording
+    def ToText(self):
+        """:return: The recording as base64, to fit in a CSV field"""
+        return base64.b64encode(self.ToBytes()).decode()
+    @staticmethod
+    def FromText(text):
+        return Recording.FromBytes(base64.b64decode(text))
+
+def replay(recording):
+    """
+    Simulates a recorded run again, as fast as it can be computed.
+
+    :param Recording recording: What to replay
+    :return: The Simulation as it was when the recording ended
+    """
+    simulation = Simulation(recording.level)
+    simulation.constants.update(recording.constants)
+    for inputs in recording.StepInputs():
+        simulation.Step(inputs, recording.dt)
+        if simulation.Finished():
+            break
+    return simulation
+
+def main(argv):
+    level, name = argv
+    with open(os.path.join("scores", f"{level}.csv"), "r", newline="") as file:
+        entries = [row for row in csv.reader(file) if row and row[0] == name]
+    if not entries:
+        sys.exit(f"{name} has no score on level {level}")
+    if len(entries[0]) < 3:
+        sys.exit(f"{name}'s score on level {level} was saved without a recording")
+    recording = Recording.FromText(entries[0][2])
+    simulation = replay(recording)
+    score, _ = simulation.Score()
+    print(f"Saved score {entries[0][1]}, replayed score {score} after {simulation.time:.2f}s with "
+          f"{simulation.player.collisions} collisions")
+    sys.exit(0 if score == int(entries[0][1]) else 1)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
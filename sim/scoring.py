@@ -0,0 +1,24 @@
+"""
+The score a finished level is worth. Shared by the scoring screen and anything that runs levels without one.
+"""
+from constants import OPTIMALS, SCOREBASE, HITPENALTY
+
+def level_score(levelnum, objectivesMet, totalObjectives, time, collisions, fuelperc):
+    """
+    :param levelnum: The level played
+    :param int objectivesMet: How many of the level's objectives were complete at the end
+    :param int totalObjectives: How many objectives the level has
+    :param float time: Seconds taken
+    :param int collisions: Damaging collisions the player had
+    :param float fuelperc: Fraction of the player's fuel left, from 0 to 1
+    :return: The score and the part of it that was the bonus for conserving fuel; both are 0 if an objective was missed
+    """
+    if objectivesMet != totalObjectives:
+        return 0, 0
+    optimal = OPTIMALS[str(levelnum)]
+    timeDiff = optimal - time # This will be negative if the player took longer than the optimal
+    timeMult = min(abs(timeDiff) / optimal, 1) # Only penalise/bonus for up to double the time and down to 0 seconds
+    timeMult *= -1 if timeDiff < 0 else 1 # Bonus or penalty
+    fuelbonus = int(min(fuelperc / 0.5, 1) * 1000)
+    score = int(SCOREBASE + (SCOREBASE*timeMult) + fuelbonus - (HITPENALTY * collisions))
+    return (1 if score <= 0 else score), fuelbonus # If the player succeeded, they should never score 0 points
@@ -0,0 +1,151 @@
+import pygame
+from constants import *
+from physics import *
+from spatial import SpatialHash
+from .level import level_load, Sprite
+from .scoring import level_score
+from .snapshot import entities, snapshot, restore
+
+class Inputs:
+    """The controls held down for a simulation step"""
+    def __init__(self, thrust=False, reverse=False, left=False, right=False):
+        self.thrust = thrust
+        self.reverse = reverse
+        self.left = left
+        self.right = right
+    @staticmethod
+    def FromKeys(keys):
+        """:param keys: The result of pygame.key.get_pressed()"""
+        return Inputs(bool(keys[pygame.K_SPACE]), bool(keys[pygame.K_LSHIFT]), bool(keys[pygame.K_LEFT]),
+                      bool(keys[pygame.K_RIGHT]))
+    def __eq__(self, other):
+        return self.thrust == other.thrust and self.reverse == other.reverse and \
+               self.left == other.left and self.right == other.right
+    def __str__(self):
+        return f"Inputs(thrust={self.thrust}, reverse={self.reverse}, left={self.left}, right={self.right})"
+    def Pack(self):
+        """:return: The inputs as four bits: thrust, reverse, left, right from the lowest bit up"""
+        return self.thrust | self.reverse << 1 | self.left << 2 | self.right << 3
+    @staticmethod
+    def Unpack(bits):
+        return Inputs(bool(bits & 1), bool(bits & 2), bool(bits & 4), bool(bits & 8))
+
+class Simulation:
+    def __init__(self, levelnum, loadImage=Sprite.Load):
+        """
+        :param levelnum: The level to load
+        :param loadImage: Image loader passed on to level_load(); the default only reads sprite sizes
+        """
+        self.bodies = BodyArrays() # The player and objects are made straight into these
+        info = level_load(levelnum, loadImage, self.bodies)
+        self.levelnum = levelnum
+        self.background = loadImage(info["background"])
+        self.level_size = self.background.get_size()
+        lwidth, lheight = self.level_size
+        self.constants = info["constants"]
+
+        self.world = info["world"]
+        self.world.append(WorldCollider(pygame.Rect(-1, 0, 1, lheight)))
+        self.world.append(WorldCollider(pygame.Rect(0, -1, lwidth, 1)))
+        self.world.append(WorldCollider(pygame.Rect(lwidth, 0, 1, lheight)))
+
+        self.objects = info["objects"]
+        self.player = info["player"]
+        self.objectives = info["objectives"]
+        self.obstacles = info["obstacles"]
+        self.hazards = info["hazards"]
+
+        # Broadphase over everything that can be collided with; the static level geometry is only binned once, here
+        self.grid = SpatialHash(self.world + self.objectives + self.obstacles + self.hazards + self.objects + [self.player])
+        self.colHandler = CollisionHandler(self.level_size)
+        self.particleHandler = None # Engine particles are only created when something is going to draw them
+        self.entities = entities(self) # What snapshots refer to forces' sources and collisions' objects by
+        self.entityIndex = {id(x): i for i, x in enumerate(self.entities)}
+
+        self.time = 0
+        self.steps = 0
+        self.completed = False # Every objective is met
+        self.failed = False # The player hit an obstacle
+
+    def Finished(self):
+        return self.completed or self.failed
+
+    def Step(self, inputs, dt):
+        """
+        Advances the level by one step.
+
+        :param Inputs inputs: Controls held down during this step
+        :param float dt: Length of the step in seconds
+        """
+        objects, player = self.objects, self.player
+        self.time += dt
+        self.steps += 1
+
+        for hazard in self.hazards:
+            hazard.Update(objects + [player])
+
+        ## UPDATING OBJECTIVES ##
+        completed = True
+        for objective in self.objectives:
+            objective.Update([player] if isinstance(objective, PlayerObjective)
+                             else [x for x in objects if isinstance(x, KeyObject)])
+            if not objective.complete:
+                completed = False
+        self.completed = completed
+
+        for obstacle in self.obstacles:
+            if obstacle.Update(player):
+                self.failed = True
+
+        ## UPDATING PLAYER AND PHYSOBJECTS ##
+        self.bodies.Step(self.constants, self.grid, dt)
+
+        ## HANDLE COLLISIONS ##
+        self.colHandler.Update(objects + [player])
+        self.bodies.UpdateSleep([(x.object, x.collider) for x in self.colHandler.collisions.values()], dt)
+
+        # Player Controls
+        if inputs.right:
+            player.Rotate(1, self.grid, dt)
+        if inputs.left:
+            player.Rotate(-1, self.grid, dt)
+        if inputs.thrust:
+            player.Thrust(self.particleHandler)
+        elif inputs.reverse:
+            player.Thrust(self.particleHandler, True)
+        else:
+            player.RemoveForce(player, ForceKind.DRIVE) # Neither engine key is held
+
+    def Run(self, inputs, steps, dt=1 / PHYSICS_RATE):
+        """
+        Steps the level until it finishes or the step limit is reached.
+
+        :param inputs: The Inputs to hold for every step, or a function taking the step number and returning Inputs
+        :param int steps: The most steps to run
+        :param float dt: Length of each step in seconds
+        :return: The number of steps run
+        """
+        for i in range(steps):
+            self.Step(inputs(i) if callable(inputs) else inputs, dt)
+            if self.Finished():
+                return i + 1
+        return steps
+
+    def ObjectivesMet(self):
+        return len([x for x in self.objectives if x.complete])
+
+    def FuelFraction(self):
+        return self.player.fuel / self.player.tank
+
+    def Snapshot(self):
+        """:return: The whole state of the level as a flat array, for Restore()"""
+        return snapshot(self)
+
+    def Restore(self, state):
+        """Puts the level back to a Snapshot() of this Simulation or of another one of the same level"""
+        restore(self, state)
+
+    def Score(self):
+        """:return: What the scoring screen would award for the level as it stands, and the fuel bonus part of it"""
+        return level_score(self.levelnum, self.ObjectivesMet(), len(self.objectives), self.time, self.player.collisions,
+                           self.FuelFraction())
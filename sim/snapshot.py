@@ -0,0 +1,160 @@
+"""
+Capturing a Simulation's whole state in one flat float64 array and putting it back, so a run can be restarted from a
+checkpoint, rewound or forked into a second Simulation of the same level for looking ahead, without loading the level
+again. The body rows are copied straight out of BodyArrays; the few things kept on objects (angles, rects, force
+tables, active collisions, objectives) are written after them.
+
+Layout:
+    time, steps, completed, failed, number of forces, number of collisions, number of awake bodies
+    per row of BodyArrays: the body in it                  (as an index into Simulation.entities)
+    every BodyArrays field for every body, field by field
+    per body: angle, angleDir, lastPos, rect, the force table's total and frictionTotal
+    player fuel and collisions
+    per objective: complete
+    per force: body, source, kind, x, y            (bodies and sources are indices into Simulation.entities)
+    per collision: object, collider, resolved      (in the order the collisions started)
+"""
+import pygame
+import numpy
+from constants import GREEN
+from physics import Force, ForceKind, Collision, CollisionHandler, rotateImage
+
+HEADER = 7
+EXTRAS = 13 # Floats kept per body besides its rows
+KINDS = list(ForceKind)
+
+def entities(simulation):
+    """:return: Everything a force or collision can refer to, in an order that is the same for any run of the level"""
+    return [simulation.player] + simulation.objects + simulation.world + simulation.objectives + \
+           simulation.obstacles + simulation.hazards
+
+def snapshot(simulation):
+    """
+    :param Simulation simulation: What to capture
+    :return: The state as a 1D float64 array
+    """
+    store = simulation.bodies
+    bodies = store.bodies
+    n = len(bodies)
+    index = simulation.entityIndex
+
+    forces = []
+    for i, body in enumerate(bodies):
+        for force in body.forces.table.values():
+            forces += (i, index[id(force.source)], KINDS.index(force.kind), force.x, force.y)
+    collisions = []
+    for collision in simulation.colHandler.collisions.values():
+        collisions += (index[id(collision.object)], index[id(collision.collider)], collision.resolved)
+
+    extras = numpy.empty((n, EXTRAS))
+    for i, body in enumerate(bodies):
+        rect, table = body.rect, body.forces
+        extras[i] = (body.angle, body.angleDir.x, body.angleDir.y, body.lastPos.x, body.lastPos.y,
+                     rect.x, rect.y, rect.w, rect.h, table.total.x, table.total.y,
+                     table.frictionTotal.x, table.frictionTotal.y)
+    player = simulation.player
+    return numpy.concatenate(
+        [(simulation.time, simulation.steps, simulation.completed, simulation.failed, len(forces) // 5, len(collisions) // 3,
+          store.awake), [index[id(body)] for body in bodies]] +
+        [getattr(store, field)[:n].ravel() for field in store.Fields()] +
+        [extras.ravel(), (player.fuel, player.collisions), [x.complete for x in simulation.objectives], forces, collisions])
+
+def restore(simulation, state):
+    """
+    Puts a Simulation back into a captured state. The simulation must be of the same level as the one captured, but
+    doesn't have to be the same instance, which is how a run is forked.
+
+    :param Simulation simulation: What to restore into
+    :param state: An array from snapshot()
+    """
+    store = simulation.bodies
+    bodies = store.bodies
+    n = len(bodies)
+    allEntities = simulation.entities
+    time, steps, completed, failed, nForces, nCollisions, awake = state[:HEADER].tolist()
+    simulation.time, simulation.steps = time, int(steps)
+    simulation.completed, simulation.failed = bool(completed), bool(failed)
+
+    # Bodies change rows as they sleep and wake, so put each back in the row it had before the rows are filled in
+    store.bodies = bodies = [allEntities[int(i)] for i in state[HEADER:HEADER + n].tolist()]
+    for row, body in enumerate(bodies):
+        body.row = row
+    store.awake = int(awake)
+
+    offset = HEADER + n
+    for field in store.Fields():
+        array = getattr(store, field)
+        size = n * (array[0].size if array.ndim > 1 else 1)
+        array[:n] = state[offset:offset + size].reshape(array[:n].shape)
+        offset += size
+
+    extras = state[offset:offset + n * EXTRAS].reshape(n, EXTRAS).tolist()
+    offset += n * EXTRAS
+    for body, (angle, dirX, dirY, lastX, lastY, x, y, w, h, totalX, totalY, frictionX, frictionY) in zip(bodies, extras):
+        if angle != body.angle:
+            body.image = rotateImage(body.image_clean, angle)
+        body.angle = angle
+        body.angleDir.Set(dirX, dirY)
+        body.lastPos.Set(lastX, lastY)
+        body.rect = pygame.Rect(int(x), int(y), int(w), int(h))
+        body.forces.table = {}
+        body.forces.total.Set(totalX, totalY) # Restored rather than summed again, so rounding matches the original
+        body.forces.frictionTotal.Set(frictionX, frictionY)
+        if body in simulation.grid:
+            simulation.grid.Update(body)
+
+    player = simulation.player
+    fuel, collisions = state[offset:offset + 2].tolist()
+    player.fuel, player.collisions = fuel, int(collisions)
+    offset += 2
+
+    for objective, complete in zip(simulation.objectives, state[offset:offset + len(simulation.objectives)].tolist()):
+        objective.complete = bool(complete)
+        objective.colour = GREEN if complete else objective.original
+    offset += len(simulation.objectives)
+
+    for i, source, kind, x, y in state[offset:offset + int(nForces) * 5].reshape(-1, 5).tolist():
+        body, source = bodies[int(i)], allEntities[int(source)]
+        kind = KINDS[int(kind)]
+        body.forces.table[(source, kind)] = Force(source, kind, x, y) # In the order they were in, as iteration sees them
+    offset += int(nForces) * 5
+
+    handler = simulation.colHandler
+    handler.collisions = {}
+    for obj, collider, resolved in state[offset:offset + int(nCollisions) * 3].reshape(-1, 3).tolist():
+        obj, collider = allEntities[int(obj)], allEntities[int(collider)]
+        collision = handler.collisions[CollisionHandler.PairKey(obj, collider)] = Collision(obj, collider)
+        collision.resolved = bool(resolved)
+
+class SnapshotRing:
+    def __init__(self, capacity):
+        """
+        Keeps the most recent snapshots of a run, e.g. one a second for rewinding.
+
+        :param int capacity: Most snapshots kept; the oldest is dropped to make room
+        """
+        self.capacity = capacity
+        self.states = [None] * capacity
+        self.count = 0 # Snapshots pushed so far
+        self.oldest = 0 # Number of the oldest snapshot still kept; ones before it have been written over
+    def Push(self, simulation):
+        self.states[self.count % self.capacity] = snapshot(simulation)
+        self.count += 1
+        self.oldest = max(self.oldest, self.count - self.capacity)
+    def Get(self, back=0):
+        """
+        :param int back: How many snapshots before the latest one
+        :return: The state array, or None if it has been dropped or was never taken
+        """
+        if back >= len(self) or back < 0:
+            return None
+        return self.states[(self.count - 1 - back) % self.capacity]
+    def Rewind(self, simulation, back=0):
+        """Restores a snapshot and forgets the ones after it, so the run carries on from there"""
+        state = self.Get(back)
+        if state is not None:
+            restore(simulation, state)
+            self.count -= back
+        return state is not None
+    def __len__(self):
+        return self.count - self.oldest
@@ -0,0 +1,589 @@
+"""
+Many copies of a level stepped at once, for training and evaluating autopilots.
+
+Every body of every copy (the level's objects, then the player) is a row of a few NumPy arrays, and Step() advances all
+of them with array operations that follow Simulation.Step() rule for rule: airstreams, objectives and obstacles; then
+for each awake body the contact forces as ForceManager.UpdateContacts() works them out, integration as in
+BodyArrays.Integrate() and moving one axis at a time against the level's colliders as SafeMove() does; then collisions
+between bodies as the CollisionHandler resolves them, sleeping, and the controls. A copy given the same inputs as a
+Simulation of the level finishes on the same step with the same score.
+
+A body's forces are kept in a table with a column for every source and kind of force it can have, and the running
+totals are added to and taken from in the order the forces were added, as in ForceManager, so that they come out the
+same to the last bit. An episode ends when the game would show the scoring screen, or after a time limit, and its
+reward is the score that screen would give.
+
+    env = VectorEnv(1)
+    observations = env.Reset(4096)
+    observations, rewards, done = env.Step(actions) # actions: Inputs.Pack() bits, one per copy
+"""
+import math
+import numpy
+from constants import PHYSICS_RATE, PLAYER_ROTATION_SPEED, RAD, METRE, GRAVITYON, ROTATION_STEP, SLEEP_TIME, \
+    SLEEP_VELOCITY, SLEEP_FORCE
+from physics import Objective, PlayerObjective, KeyObject, rotate
+from raycast import raycastPairs, rectArray
+from .simulation import Simulation
+from .scoring import level_score
+
+# The four columns each collider has in a body's force table
+REACTION_X, REACTION_Y, FRICTION_X, FRICTION_Y = range(4)
+
+def overlapping(box, others):
+    """:return: (..., n, k) whether each box overlaps each of the others, as Rect.colliderect() decides"""
+    a, b = box[..., :, None, :], others[..., None, :, :]
+    return (a[..., 0] < b[..., 2]) & (b[..., 0] < a[..., 2]) & (a[..., 1] < b[..., 3]) & (b[..., 1] < a[..., 3])
+
+def sides(box, others):
+    """:return: (..., n, k) arrays of whether each of the others touches each box on its left, top, right and bottom"""
+    a, b = box[..., :, None, :], others[..., None, :, :]
+    checky = (b[..., 1] <= a[..., 3]) & (b[..., 3] >= a[..., 1])
+    checkx = (b[..., 0] <= a[..., 2]) & (b[..., 2] >= a[..., 0])
+    return (a[..., 0] == b[..., 2]) & checky, (a[..., 1] == b[..., 3]) & checkx, \
+           (a[..., 2] == b[..., 0]) & checky, (a[..., 3] == b[..., 1]) & checkx
+
+def touches(box, others):
+    """:return: (..., n, k) whether each of the others overlaps or touches each box, as Objective.Update() checks"""
+    left, top, right, bottom = sides(box, others)
+    return overlapping(box, others) | left | top | right | bottom
+
+def roundHalfAway(x):
+    """Rounds like assigning a float to a Rect's centre does"""
+    return numpy.sign(x) * numpy.floor(numpy.abs(x) + 0.5)
+
+def last(mask):
+    """:return: Index of the last True in each row of a 2D mask (0 where there is none)"""
+    return mask.shape[1] - 1 - numpy.argmax(mask[:, ::-1], axis=1)
+
+class VectorEnv:
+    def __init__(self, level, seconds=60, autoreset=True, dt=1 / PHYSICS_RATE):
+        """
+        :param level: The level every copy plays
+        :param float seconds: Simulated time after which an episode is stopped
+        :param bool autoreset: Start a finished copy again straight away, so Step() can be called indefinitely
+        :param float dt: Length of each step in seconds
+        """
+        simulation = Simulation(level)
+        self.level = level
+        self.dt = dt
+        self.maxSteps = int(seconds / dt)
+        self.autoreset = autoreset
+        self.constants = simulation.constants
+        self.reach = math.hypot(*simulation.level_size) # How far Collision.pushing() casts
+
+        ## BODIES, IN THE ORDER THE COLLISIONHANDLER IS GIVEN THEM ##
+        player = simulation.player
+        bodies = simulation.objects + [player]
+        self.B = B = len(bodies)
+        self.PLAYER = B - 1
+        self.keys = numpy.array([isinstance(x, KeyObject) for x in bodies])
+        self.canSleep = numpy.array([x.canSleep for x in bodies])
+        self.Cd = numpy.array([x.Cd for x in bodies])
+        self.COR = numpy.array([x.COR for x in bodies])
+        self.weightless = numpy.array([x.weightless for x in bodies])
+        self.start = {"pos": numpy.array([(x.pos.x, x.pos.y) for x in bodies]),
+                      "rect": numpy.array([(x.rect.x, x.rect.y, x.rect.w, x.rect.h) for x in bodies], dtype=float),
+                      "mass": numpy.array([x.mass for x in bodies]), "fuel": player.fuel, "angle": player.angle}
+        self.bodymass, self.weightlessfuel = player.bodymass, player.weightlessfuel
+        self.tank, self.thrust = player.tank, player.thrust
+        step = ROTATION_STEP or 1
+        self.angleStep = step
+        self.sizes = numpy.array([rotate(player.image_clean, i * step).get_size() for i in range(int(round(360 / step)))],
+                                 dtype=float) # Rect size at every angle the rotation cache gives
+
+        ## LEVEL ##
+        colliders = simulation.world + simulation.objectives + simulation.obstacles + simulation.hazards
+        self.colliders = rectArray(colliders) # In the order the SpatialHash gives them
+        self.C = C = len(colliders)
+        self.harmless = numpy.array([isinstance(x, Objective) for x in colliders]) # Hitting these isn't a damaging collision
+        self.muStatic = numpy.array([x.GetMuStatic() for x in colliders])
+        self.muKinetic = numpy.array([x.GetMuKinetic() for x in colliders])
+        self.streams = rectArray([x.streamRect for x in simulation.hazards])
+        self.wind = numpy.array([(x.force.x, x.force.y) for x in simulation.hazards], dtype=float).reshape(-1, 2)
+        self.H = H = len(simulation.hazards)
+        self.objectives = rectArray(simulation.objectives)
+        self.playerObjectives = numpy.array([isinstance(x, PlayerObjective) for x in simulation.objectives], dtype=bool)
+        self.obstacles = rectArray(simulation.obstacles)
+
+        ## FORCE TABLE COLUMNS ##
+        # Four per collider (see REACTION_X...), then wind from each airstream, pushes and reactions from each body,
+        # and the player's drive
+        self.WIND, self.PUSH = 4 * C, 4 * C + H
+        self.REACTION = self.PUSH + B
+        self.DRIVE = self.REACTION + B
+        self.S = self.DRIVE + 1
+        self.frictionColumns = [numpy.zeros(self.S, dtype=bool) for _ in range(2)] # Along x, then along y
+        self.frictionColumns[0][FRICTION_X:4 * C:4] = self.frictionColumns[1][FRICTION_Y:4 * C:4] = True
+        self.isFriction = self.frictionColumns[0] | self.frictionColumns[1]
+
+        # Pairs of bodies that can collide, in the order ColScan() starts their collisions in
+        self.pairs = numpy.array([(i, j) for i in range(B) for j in range(i + 1, B)], dtype=int).reshape(-1, 2)
+        self.n = 0
+
+    def Reset(self, n=None, which=None):
+        """
+        :param int n: Number of copies to start; leave out to keep the current number
+        :param which: Boolean array of the copies to restart; leave out for all of them
+        :return: The observations
+        """
+        B, S, P = self.B, self.S, len(self.pairs)
+        if n is not None and n != self.n:
+            self.n = n
+            R = n * B
+            self.pos, self.velocity, self.acceleration, self.rForce, self.momentum, self.weight, self.drag, \
+                self.total, self.frictionTotal = (numpy.zeros((R, 2)) for _ in range(9))
+            self.rect = numpy.zeros((R, 4)) # x, y, width, height
+            self.mass, self.restTime = numpy.zeros(R), numpy.zeros(R)
+            self.asleep = numpy.zeros(R, dtype=bool)
+            self.forces = numpy.zeros((R, S, 2)) # Every body's force table: a column per source and kind
+            self.present = numpy.zeros((R, S), dtype=bool)
+            self.order = numpy.zeros((R, S), dtype=numpy.int64) # When each force was added, for the table's order
+            self.count = numpy.zeros(R, dtype=int)
+            self.added = 0
+            self.rowCd, self.rowCOR = numpy.tile(self.Cd, n), numpy.tile(self.COR, n)
+            self.rowWeightless = numpy.tile(self.weightless, n)
+            self.angle, self.fuel, self.time = numpy.zeros(n), numpy.zeros(n), numpy.zeros(n)
+            self.steps, self.collisions = numpy.zeros(n, dtype=int), numpy.zeros(n, dtype=int)
+            self.failed = numpy.zeros(n, dtype=bool)
+            self.complete = numpy.zeros((n, len(self.objectives)), dtype=bool)
+            self.colliding = numpy.zeros((n, P), dtype=bool) # The CollisionHandler's collisions
+            self.resolved = numpy.zeros((n, P), dtype=bool)
+            self.since = numpy.zeros((n, P), dtype=numpy.int64) # When each collision started, for the handler's order
+            self.started = 0
+        which = numpy.ones(self.n, dtype=bool) if which is None else numpy.asarray(which, dtype=bool)
+        rows = numpy.repeat(which, B)
+        start = self.start
+        self.pos.reshape(-1, B, 2)[which] = start["pos"]
+        self.rect.reshape(-1, B, 4)[which] = start["rect"]
+        self.mass.reshape(-1, B)[which] = start["mass"]
+        for array in (self.velocity, self.acceleration, self.rForce, self.momentum, self.weight, self.drag, self.total,
+                      self.frictionTotal):
+            array[rows] = 0
+        self.restTime[rows], self.asleep[rows] = 0, False
+        self.present[rows], self.count[rows] = False, 0
+        self.angle[which], self.fuel[which] = start["angle"], start["fuel"]
+        self.time[which], self.steps[which], self.collisions[which], self.failed[which] = 0, 0, 0, False
+        self.complete[which] = False
+        self.colliding[which] = self.resolved[which] = False
+        return self.Observe()
+
+    def Observe(self):
+        """
+        :return: (n, 6 + objectives + 2 * objects) float32 array of the player's x, y, x velocity, y velocity, angle
+                 and fuel fraction, then 1 for each objective met, then the x and y of each object
+        """
+        n, B, player = self.n, self.B, self.PLAYER
+        pos = self.pos.reshape(n, B, 2)
+        return numpy.hstack([pos[:, player], self.velocity.reshape(n, B, 2)[:, player], self.angle[:, None],
+                             (self.fuel / self.tank)[:, None], self.complete,
+                             pos[:, :player].reshape(n, -1)]).astype(numpy.float32)
+
+    def Box(self, rows=slice(None)):
+        """:return: (rows, 4) left, top, right, bottom of the given bodies (all of them by default)"""
+        rect = self.rect[rows]
+        return numpy.concatenate([rect[:, :2], rect[:, :2] + rect[:, 2:]], axis=1)
+
+    ## FORCE TABLES ##
+
+    def _wake(self, rows):
+        rows = rows[self.asleep[rows]]
+        self.asleep[rows], self.restTime[rows] = False, 0
+
+    def _add(self, rows, columns, x, y, wake=False):
+        """
+        ForceManager.AddForce() for one column of each row's table.
+
+        :param rows: Index array of bodies, each at most once
+        :param columns: The column for each body, or one for all of them
+        :param bool wake: Wake a body whose force changes, as PhysObject.AddForce() does
+        """
+        columns = numpy.broadcast_to(columns, rows.shape)
+        x = numpy.broadcast_to(numpy.asarray(x, dtype=float), rows.shape)
+        y = numpy.broadcast_to(numpy.asarray(y, dtype=float), rows.shape)
+        negligible = (numpy.abs(x) < 0.05) & (numpy.abs(y) < 0.05) # round(x, 1) == 0 and round(y, 1) == 0
+        if negligible.any():
+            self._remove(rows[negligible], columns[negligible], wake)
+            keep = ~negligible
+            rows, columns, x, y = rows[keep], columns[keep], x[keep], y[keep]
+        if not len(rows):
+            return
+        force = numpy.stack([x, y], axis=1)
+        held = self.present[rows, columns]
+        old = self.forces[rows, columns]
+        if wake:
+            self._wake(rows[~held | (old != force).any(axis=1)])
+        # A force that's already there is taken off the totals before its new value is added, as ForceManager does
+        self.total[rows] = numpy.where(held[:, None], self.total[rows] + -old, self.total[rows]) + force
+        friction = self.isFriction[columns]
+        if friction.any():
+            f = rows[friction]
+            self.frictionTotal[f] = numpy.where(held[friction, None], self.frictionTotal[f] + -old[friction],
+                                                self.frictionTotal[f]) + force[friction]
+        self.forces[rows, columns] = force
+        new = ~held
+        self.present[rows[new], columns[new]] = True
+        self.order[rows[new], columns[new]] = self.added
+        self.added += 1
+        self.count[rows[new]] += 1
+
+    def _remove(self, rows, columns, wake=False):
+        """ForceManager.RemoveForce() for one column of each row's table; wake as PhysObject.RemoveForce() does"""
+        columns = numpy.broadcast_to(columns, rows.shape)
+        held = self.present[rows, columns]
+        rows, columns = rows[held], columns[held]
+        if not len(rows):
+            return
+        if wake:
+            self._wake(rows)
+        old = self.forces[rows, columns]
+        self.total[rows] += -old
+        friction = self.isFriction[columns]
+        if friction.any():
+            self.frictionTotal[rows[friction]] += -old[friction]
+        self.present[rows, columns] = False
+        self.count[rows] -= 1
+        empty = rows[self.count[rows] == 0] # An emptied table's totals go back to exactly 0
+        self.total[empty] = self.frictionTotal[empty] = 0
+
+    def _removeAll(self, rows, columns):
+        """
+        Removes the forces in the chosen columns of each row's table, oldest first as ForceManager goes through its
+        table, so the totals are taken from in the same order.
+
+        :param columns: (len(rows), S) mask of the columns to remove from each row
+        """
+        r, c = numpy.nonzero(columns & self.present[rows])
+        if not len(r):
+            return
+        order = numpy.lexsort((self.order[rows[r], c], r))
+        r, c = r[order], c[order]
+        rank = numpy.arange(len(r)) - numpy.searchsorted(r, r) # How many of the row's removals come before this one
+        for i in range(rank.max() + 1):
+            now = rank == i
+            self._remove(rows[r[now]], c[now])
+
+    def _NOF(self, rows):
+        """ForceManager.GetResultantNOF()"""
+        return self.weight[rows] + self.total[rows] - self.frictionTotal[rows]
+
+    ## STEPPING BODIES ##
+
+    def _contacts(self, rows):
+        """ForceManager.UpdateContacts() for the given bodies"""
+        B, C = self.B, self.C
+        box = self.Box(rows)
+        touch = sides(box, self.colliders) # Left, top, right, bottom; (rows, C) each
+        touchingStatic = touch[0] | touch[1] | touch[2] | touch[3]
+        boxes = self.Box().reshape(-1, B, 4)
+        bodySides = sides(boxes, boxes)
+        touchingBody = (bodySides[0] | bodySides[1] | bodySides[2] | bodySides[3]).reshape(-1, B)[rows]
+        v = self.velocity[rows]
+        vx, vy = v[:, 0], v[:, 1]
+        rForce = self._NOF(rows)
+        fx, fy = rForce[:, 0], rForce[:, 1]
+
+        ## REMOVE FORCES FROM WHAT ISN'T TOUCHING ANY MORE, AND FRICTION WITH NOTHING TO RESIST ##
+        remove = numpy.zeros((len(rows), self.S), dtype=bool)
+        remove[:, :4 * C] = numpy.repeat(~touchingStatic, 4, axis=1)
+        remove[:, self.PUSH:self.PUSH + B] = remove[:, self.REACTION:self.REACTION + B] = ~touchingBody
+        remove[:, FRICTION_X:4 * C:4] |= ((vx == 0) & (fx == 0))[:, None]
+        remove[:, FRICTION_Y:4 * C:4] |= ((vy == 0) & (fy == 0))[:, None]
+        self._removeAll(rows, remove)
+
+        touched = numpy.flatnonzero(touchingStatic.any(axis=0))
+        ## NORMAL FORCES, GOING THROUGH THE CONTACTS IN touchingany()'s ORDER ##
+        for c in touched:
+            for side, into in enumerate((touch[0][:, c], touch[1][:, c], touch[2][:, c] & (fx > 0),
+                                         touch[3][:, c] & (fy > 0))):
+                if into.any():
+                    if side % 2:
+                        self._add(rows[into], 4 * c + REACTION_Y, 0, -fy[into])
+                    else:
+                        self._add(rows[into], 4 * c + REACTION_X, -fx[into], 0)
+
+        ## FRICTION ##
+        for c in touched:
+            for side in range(4):
+                on = touch[side][:, c] & (self.present[rows, 4 * c + REACTION_X] | self.present[rows, 4 * c + REACTION_Y])
+                if not on.any():
+                    continue
+                body = rows[on]
+                if side % 2: # Top or bottom, so friction along x
+                    normal, v, f, column = 4 * c + REACTION_Y, vx[on], fx[on], 4 * c + FRICTION_X
+                else:
+                    normal, v, f, column = 4 * c + REACTION_X, vy[on], fy[on], 4 * c + FRICTION_Y
+                N = numpy.where(self.present[body, normal], numpy.abs(self.forces[body, normal, side % 2]), 0)
+                trying = (v != 0) | (f != 0) # Moving or being pushed along the surface
+                scale = numpy.where(v == 0, -numpy.sign(f), -numpy.sign(v))
+                held = (numpy.abs(f) if side % 2 else f) < self.muStatic[c] * N
+                value = numpy.where((v == 0) & (f != 0) & held, -f, scale * N * self.muKinetic[c])
+                body, value = body[trying], value[trying]
+                if side % 2:
+                    self._add(body, column, value, 0)
+                else:
+                    self._add(body, column, 0, value)
+
+    def _integrate(self, rows):
+        """BodyArrays.Integrate() for the given bodies"""
+        dt = self.dt
+        gravity, airdensity = self.constants["gravity"], self.constants["airdensity"]
+        mass = self.mass[rows]
+        m = mass[:, None]
+        v = self.velocity[rows]
+
+        weight = numpy.zeros((len(rows), 2))
+        weight[:, 1] = numpy.where(self.rowWeightless[rows] | (not GRAVITYON), 0, mass * gravity)
+        self.weight[rows] = weight
+
+        sqrMag = v[:, 0] ** 2 + v[:, 1] ** 2
+        moving = sqrMag > 0
+        drag = self.drag[rows]
+        if moving.any():
+            size = self.rect[rows, 2:]
+            A = numpy.where(v[:, 0] > v[:, 1], size[:, 1], size[:, 0]) / METRE
+            dragmag = sqrMag * 0.5 * airdensity * self.rowCd[rows] * A
+            with numpy.errstate(divide="ignore", invalid="ignore"):
+                new = -(v / numpy.sqrt(sqrMag)[:, None]) * dragmag[:, None]
+            new[(numpy.round(new, 1) == 0).all(axis=1)] = 0
+            drag = numpy.where(moving[:, None], new, drag)
+            self.drag[rows] = drag
+
+        force = self.total[rows] + weight + drag
+        resultantv = v + force / m * dt
+        friction = self.frictionTotal[rows]
+        opposing = (resultantv != 0) & (friction != 0) & (numpy.sign(resultantv) == numpy.sign(friction))
+        if opposing.any():
+            force -= numpy.where(opposing, friction, 0)
+            for axis in (0, 1):
+                body = rows[opposing[:, axis]]
+                self._removeAll(body, numpy.broadcast_to(self.frictionColumns[axis], (len(body), self.S)))
+
+        acceleration = force / m
+        v = v + acceleration * dt
+        v[(numpy.round(v, 1) == 0) & (numpy.sign(v) != numpy.sign(force))] = 0
+        self.rForce[rows] = force
+        self.acceleration[rows] = acceleration
+        self.velocity[rows] = v
+        self.momentum[rows] = v * m
+
+    def _move(self, rows):
+        """BodyArrays.Move() for the given bodies, with each one moved as SafeMove() does it"""
+        colliders = self.colliders
+        v = self.velocity[rows]
+        delta = v * self.dt * METRE
+        pos, rect = self.pos[rows], self.rect[rows]
+        size = rect[:, 2:]
+        half = size // 2
+        player = (rows % self.B) == self.PLAYER
+        hits = numpy.zeros((len(rows), 2), dtype=bool)
+        for axis in (0, 1):
+            old = numpy.concatenate([rect[:, :2], rect[:, :2] + size], axis=1)
+            pos[:, axis] += delta[:, axis]
+            rect[:, axis] = roundHalfAway(pos[:, axis]) - half[:, axis]
+            hit = overlapping(numpy.concatenate([rect[:, :2], rect[:, :2] + size], axis=1), colliders)
+            if not hit.any():
+                continue
+            d = delta[:, axis, None]
+            low, high = colliders[:, axis], colliders[:, 2 + axis]
+            stops = hit & (((d > 0) & (old[:, None, 2 + axis] <= low)) | ((d < 0) & (old[:, None, axis] >= high)))
+            stopped = stops.any(axis=1)
+            if stopped.any():
+                c = last(stops) # Every collider it stops at moves it again, so the last one wins
+                rect[:, axis] = numpy.where(stopped, numpy.where(delta[:, axis] > 0, low[c] - size[:, axis], high[c]),
+                                            rect[:, axis])
+                pos[:] = numpy.where(stopped[:, None], rect[:, :2] + half, pos) # Both axes go to the rect's centre
+            hits[:, axis] = hit.any(axis=1)
+            damaging = player & hits[:, axis] & ~self.harmless[last(hit)] & (numpy.abs(v[:, axis]) >= 10)
+            if damaging.any():
+                self.collisions[rows[damaging] // self.B] += 1
+        self.pos[rows], self.rect[rows] = pos, rect
+        if hits.any():
+            COR = self.rowCOR[rows][:, None]
+            bounce = (COR > 0) & (numpy.abs(v) * COR > 1)
+            self.velocity[rows] = numpy.where(hits, numpy.where(bounce, v * (-1 * COR), 0), v)
+
+    ## COLLISIONS BETWEEN BODIES ##
+
+    def _pushing(self, a, b):
+        """Collision.pushing() of each body in rows a into the one in rows b"""
+        force, velocity = self.rForce[a], self.velocity[a]
+        moving = (force != 0).any(axis=1) & (velocity != 0).any(axis=1)
+        rect = self.rect[a]
+        centre = rect[:, :2] + rect[:, 2:] // 2
+        target = self.Box(b)
+        return moving & raycastPairs(centre, force, target, self.reach)[0] & \
+               raycastPairs(centre, velocity, target, self.reach)[0]
+
+    def _overlapping(self, a, b):
+        """Collision.CheckOverlap() for each pair of rows"""
+        return touches(self.Box(a)[:, None], self.Box(b)[:, None])[:, 0, 0]
+
+    def _collide(self):
+        """CollisionHandler.Update() for the collisions between bodies"""
+        P, B = len(self.pairs), self.B
+        if not P:
+            return
+        boxes = self.Box().reshape(-1, B, 4)
+        first, second = self.pairs[:, 0], self.pairs[:, 1]
+        new = overlapping(boxes, boxes)[:, first, second] & ~self.colliding
+        if new.any(): # Started in the order of the pairs, which is world order
+            self.since[new] = numpy.broadcast_to(self.started + numpy.arange(P), new.shape)[new]
+            self.started += P
+            self.colliding |= new
+            self.resolved[new] = False
+        order = numpy.argsort(numpy.where(self.colliding, self.since, numpy.iinfo(numpy.int64).max), axis=1, kind="stable")
+        envs = numpy.arange(self.n)
+        for i in range(P): # Each copy's i-th collision, oldest first
+            pair = order[:, i]
+            live = self.colliding[envs, pair]
+            e, pair = envs[live], pair[live]
+            if not len(e):
+                continue
+            i1, i2 = first[pair], second[pair]
+            a, b = e * B + i1, e * B + i2
+
+            ## RESOLVE NEW COLLISIONS ##
+            fresh = ~self.resolved[e, pair]
+            if fresh.any():
+                ra, rb = a[fresh], b[fresh]
+                massA = self.mass[ra][:, None]
+                pTotal = self.momentum[ra] + self.momentum[rb]
+                finalA = self.velocity[rb] - self.velocity[ra]
+                pTotal = pTotal - (finalA * massA)
+                finalB = pTotal / (massA + self.mass[rb][:, None])
+                finalA = finalA + finalB
+                self.velocity[ra], self.velocity[rb] = finalA, finalB
+                self.resolved[e[fresh], pair[fresh]] = True
+
+            ## PUSHING, AND SEPARATING ##
+            old = ~fresh
+            e, pair, i1, i2, a, b = e[old], pair[old], i1[old], i2[old], a[old], b[old]
+            if not len(e):
+                continue
+            over = self._overlapping(a, b)
+            if over.any():
+                for pusher, pushed, j1, j2 in ((a, b, i1, i2), (b, a, i2, i1)):
+                    p, q, k1, k2 = pusher[over], pushed[over], j1[over], j2[over]
+                    pushing = self._pushing(p, q)
+                    self._add(q[pushing], self.PUSH + k1[pushing], *self._NOF(p[pushing]).T, wake=True)
+                    self._add(p[pushing], self.REACTION + k2[pushing], *self._NOF(p[pushing]).T, wake=True)
+                    self._remove(q[~pushing], self.PUSH + k1[~pushing], wake=True)
+                    self._remove(p[~pushing], self.REACTION + k2[~pushing], wake=True)
+            apart = ~self._overlapping(a, b)
+            if apart.any():
+                a, b, i1, i2 = a[apart], b[apart], i1[apart], i2[apart]
+                self._remove(a, self.PUSH + i2, wake=True)
+                self._remove(b, self.REACTION + i1, wake=True)
+                self._remove(b, self.PUSH + i1, wake=True)
+                self._remove(a, self.REACTION + i2, wake=True)
+                self.colliding[e[apart], pair[apart]] = False
+
+    def _sleep(self):
+        """BodyArrays.UpdateSleep(), with the collisions between bodies as the contacts"""
+        if SLEEP_TIME <= 0:
+            return
+        B, awake = self.B, ~self.asleep
+        v, force = self.velocity, self.rForce
+        resting = ((v[:, 0] ** 2 + v[:, 1] ** 2) < SLEEP_VELOCITY ** 2) & \
+                  ((force[:, 0] ** 2 + force[:, 1] ** 2) < SLEEP_FORCE ** 2)
+        self.restTime[awake] = numpy.where(resting[awake], self.restTime[awake] + self.dt, 0)
+
+        # Bodies in contact are in the same island, which is labelled by its first body
+        island = numpy.tile(numpy.arange(B), (self.n, 1))
+        for _ in range(B - 1):
+            for p, (i, j) in enumerate(self.pairs):
+                joined = numpy.where(self.colliding[:, p], numpy.minimum(island[:, i], island[:, j]), island[:, i])
+                island[:, i] = joined
+                island[:, j] = numpy.where(self.colliding[:, p], joined, island[:, j])
+        asleep, restTime = self.asleep.reshape(-1, B), self.restTime.reshape(-1, B)
+        sleepy = self.canSleep & (asleep | (restTime >= SLEEP_TIME))
+        moving = ~asleep & (restTime == 0)
+        for label in range(B):
+            members = island == label
+            sleep = (sleepy | ~members).all(axis=1) & members.any(axis=1)
+            wake = ~sleep & (moving & members).any(axis=1)
+            falling = (members & sleep[:, None] & ~asleep).reshape(-1) # It was barely moving, and now stays put
+            self.velocity[falling] = self.momentum[falling] = self.acceleration[falling] = 0
+            woken = members & wake[:, None] & asleep
+            asleep[members & sleep[:, None]] = True
+            asleep[woken], restTime[woken] = False, 0
+
+    def Step(self, actions):
+        """
+        :param actions: Array of Inputs.Pack() bits, one per copy
+        :return: (observations, rewards, done). The reward is what the scoring screen would award a copy whose episode
+                 ended this step, and 0 for the rest; with autoreset the observations of a finished copy are the start of its next episode.
+        """
+        actions = numpy.asarray(actions)
+        thrust, reverse, left, right = (actions & 1) > 0, (actions & 2) > 0, (actions & 4) > 0, (actions & 8) > 0
+        n, B, dt = self.n, self.B, self.dt
+        rows = numpy.arange(n * B)
+        players = numpy.arange(n) * B + self.PLAYER
+        self.time += dt
+        self.steps += 1
+
+        ## AIRSTREAMS ##
+        for h in range(self.H):
+            inside = overlapping(self.Box(), self.streams[h:h + 1])[:, 0]
+            self._add(rows[inside], self.WIND + h, *self.wind[h], wake=True)
+            self._remove(rows[~inside], self.WIND + h, wake=True)
+
+        ## OBJECTIVES AND OBSTACLES ##
+        boxes = self.Box().reshape(n, B, 4)
+        self.complete = numpy.where(self.playerObjectives, touches(boxes[:, self.PLAYER], self.objectives),
+                                    touches(boxes[:, self.keys], self.objectives).any(axis=1))
+        completed = self.complete.all(axis=1)
+        if len(self.obstacles):
+            self.failed |= touches(boxes[:, self.PLAYER], self.obstacles).any(axis=1)
+
+        ## BODIES ##
+        if not self.weightlessfuel:
+            self.mass[players] = self.bodymass + self.fuel
+        awake = rows[~self.asleep]
+        self._contacts(awake)
+        self._integrate(awake)
+        self._move(awake)
+        self._remove(players[self.fuel <= 1], self.DRIVE)
+        self._collide()
+        self._sleep()
+
+        ## CONTROLS ##
+        for scale, pressed in ((1, right), (-1, left)):
+            turning = players[pressed]
+            if not len(turning):
+                continue
+            box = self.Box(turning)
+            touch = sides(box, self.colliders)
+            bodies = sides(box[:, None], self.Box().reshape(n, B, 4)[turning // B])
+            free = ~(touch[0] | touch[1] | touch[2] | touch[3]).any(axis=1) & \
+                   ~(bodies[0] | bodies[1] | bodies[2] | bodies[3])[:, 0].any(axis=1) # Only away from everything
+            turning = turning[free]
+            e = turning // B
+            self.angle[e] += PLAYER_ROTATION_SPEED * -scale * dt
+            quantized = numpy.round(self.angle[e] / self.angleStep).astype(int) % len(self.sizes)
+            rect = self.rect[turning]
+            centre = rect[:, :2] + rect[:, 2:] // 2
+            size = self.sizes[quantized]
+            self.rect[turning] = numpy.concatenate([centre - size // 2, size], axis=1)
+        engine = thrust | reverse
+        burning = engine & (self.fuel >= 1)
+        if burning.any():
+            rads, inverse = numpy.unique(self.angle[burning] * RAD, return_inverse=True)
+            cos = numpy.array([math.cos(x) for x in rads])[inverse] # The same values Player.Thrust() gets
+            sin = numpy.array([math.sin(x) for x in rads])[inverse]
+            x, y = (0 * cos) - (self.thrust * sin), -((0 * sin) + (self.thrust * cos))
+            backwards = (reverse & ~thrust)[burning]
+            x, y = numpy.where(backwards, x * -1, x), numpy.where(backwards, y * -1, y)
+            self._add(players[burning], self.DRIVE, x, y)
+            self.fuel[burning] -= 1
+        self._remove(players[~engine], self.DRIVE)
+
+        ## EPISODE ENDS ##
+        done = completed | self.failed | (self.steps >= self.maxSteps)
+        rewards = numpy.zeros(n)
+        for i in numpy.flatnonzero(done):
+            rewards[i], _ = level_score(self.level, int(self.complete[i].sum()), len(self.objectives), self.time[i],
+                                        int(self.collisions[i]), self.fuel[i] / self.tank)
+        if self.autoreset and done.any():
+            self.Reset(which=done)
+        return self.Observe(), rewards, done
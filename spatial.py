@@ -0,0 +1,229 @@
+"""
+Broadphase structures for narrowing down which objects need to be tested against each other.
+
+SpatialHash is a uniform grid used for contact and overlap queries against the level. Every object is binned into
+all the cells its rect covers, with the right and bottom edges counted as inside so that objects which are only
+touching still share a cell. Static colliders are binned once when the level loads; dynamic
+bodies are re-binned through Update() whenever they move, which only touches the dictionary when the set of cells
+they cover changes.
+
+SweepAndPrune finds every overlapping pair among the dynamic bodies. It keeps them sorted by their left edge between
+frames with an insertion sort, which is close to linear since bodies barely move from one frame to the next.
+
+CollisionMask rasterises the static colliders into a grid of labels so that thousands of particles can look up what
+they might be touching with array indexing instead of testing every collider.
+"""
+import math, numpy
+from constants import SPATIAL_CELL_SIZE, COLLISION_MASK_CELL
+from raycast import rectArray
+
+class SpatialHash:
+    def __init__(self, objects=(), cellSize=SPATIAL_CELL_SIZE):
+        """
+        :param objects: Objects to insert straight away (anything with a GetRect() method)
+        :param int cellSize: Width and height of each cell in pixels
+        """
+        self.cellSize = cellSize
+        self.cells = {} # (cx, cy) -> {object: None}; dicts keep insertion order so queries are deterministic
+        self.bins = {} # object -> the (x0, y0, x1, y1) cell range it is currently stored under
+        self.order = {} # object -> insertion number, used to return query results in a stable order
+        self.count = 0
+        for obj in objects:
+            self.Insert(obj)
+
+    def CellRange(self, rect):
+        """:return: The inclusive range of cells (x0, y0, x1, y1) covered by rect"""
+        size = self.cellSize
+        return (int(rect.left // size), int(rect.top // size), int(rect.right // size), int(rect.bottom // size))
+
+    def _bin(self, obj, cellRange):
+        x0, y0, x1, y1 = cellRange
+        cells = self.cells
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = cells.get((cx, cy))
+                if cell is None:
+                    cells[(cx, cy)] = cell = {}
+                cell[obj] = None
+        self.bins[obj] = cellRange
+
+    def _unbin(self, obj):
+        x0, y0, x1, y1 = self.bins.pop(obj)
+        cells = self.cells
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = cells[(cx, cy)]
+                del cell[obj]
+                if not cell:
+                    del cells[(cx, cy)]
+
+    def Insert(self, obj):
+        if obj in self.bins:
+            return self.Update(obj)
+        self.order[obj] = self.count
+        self.count += 1
+        self._bin(obj, self.CellRange(obj.GetRect()))
+
+    def Remove(self, obj):
+        if obj in self.bins:
+            self._unbin(obj)
+            del self.order[obj]
+
+    def Update(self, obj):
+        """Re-bins an object after it has moved or changed size. Cheap when it is still inside the same cells."""
+        cellRange = self.CellRange(obj.GetRect())
+        if self.bins.get(obj) != cellRange:
+            self._unbin(obj)
+            self._bin(obj, cellRange)
+
+    def Query(self, rect, exclude=None, kind=None):
+        """
+        :param rect: The area of interest
+        :param exclude: An object to leave out of the results, usually the one asking
+        :param kind: Optional class (or tuple of classes) to filter the results by
+        :return: Every object sharing a cell with rect, in insertion order
+        """
+        x0, y0, x1, y1 = self.CellRange(rect)
+        cells = self.cells
+        if x0 == x1 and y0 == y1: # By far the most common case for the small dynamic bodies
+            found = cells.get((x0, y0), ())
+        else:
+            found = {}
+            for cx in range(x0, x1 + 1):
+                for cy in range(y0, y1 + 1):
+                    cell = cells.get((cx, cy))
+                    if cell is not None:
+                        found.update(cell)
+        results = [x for x in found if x is not exclude and (kind is None or isinstance(x, kind))]
+        if len(results) > 1:
+            results.sort(key=self.order.__getitem__)
+        return results
+
+    def __contains__(self, obj):
+        return obj in self.bins
+    def __iter__(self):
+        return iter(sorted(self.bins, key=self.order.__getitem__))
+    def __len__(self):
+        return len(self.bins)
+
+
+class SweepAndPrune:
+    def __init__(self):
+        self.bodies = [] # Sorted by rect.left as of the last call to Pairs()
+        self.members = set()
+
+    def Sync(self, world):
+        """Adds new bodies and drops ones that are no longer in the world, keeping the rest in their sorted order"""
+        if len(world) == len(self.members) and all(x in self.members for x in world):
+            return
+        current = set(world)
+        self.bodies = [x for x in self.bodies if x in current] + [x for x in world if x not in self.members]
+        self.members = current
+
+    def Pairs(self):
+        """
+        :return: A list of (body, body) tuples whose rects overlap (touching edges do not count, as with colliderect)
+        """
+        bodies = self.bodies
+        rects = [x.GetRect() for x in bodies]
+
+        # Insertion sort on the left edge; bodies are almost always still in order from last frame
+        for i in range(1, len(bodies)):
+            body, rect = bodies[i], rects[i]
+            j = i - 1
+            while j >= 0 and rects[j].left > rect.left:
+                bodies[j + 1], rects[j + 1] = bodies[j], rects[j]
+                j -= 1
+            bodies[j + 1], rects[j + 1] = body, rect
+
+        # Sweep along x keeping the bodies whose x interval is still open, then check the y intervals
+        pairs = []
+        active = []
+        for body, rect in zip(bodies, rects):
+            if not (rect.width and rect.height): # An empty rect overlaps nothing
+                continue
+            active = [x for x in active if x[1].right > rect.left]
+            for other, otherRect in active:
+                if otherRect.top < rect.bottom and rect.top < otherRect.bottom:
+                    pairs.append((other, body))
+            active.append((body, rect))
+        return pairs
+
+
+class CollisionMask:
+    def __init__(self, colliders, cellSize=COLLISION_MASK_CELL):
+        """
+        :param colliders: The static colliders to rasterise (anything with a GetRect() method)
+        :param int cellSize: Width and height of each cell in pixels
+        """
+        self.cellSize = cellSize
+        self.colliders = list(colliders)
+        self.members = {id(x) for x in self.colliders}
+
+        # Row 0 stands for 'nothing here' and is a rect that nothing can overlap
+        self.bounds = numpy.vstack([[math.inf, math.inf, -math.inf, -math.inf], rectArray(self.colliders)])
+        self.ids = numpy.array([0] + [id(x) for x in self.colliders], dtype=numpy.int64)
+
+        rects = self.bounds[1:]
+        self.origin = rects[:, :2].min(axis=0) if len(rects) else numpy.zeros(2)
+        end = rects[:, 2:].max(axis=0) if len(rects) else numpy.zeros(2)
+        shape = numpy.maximum(numpy.ceil((end - self.origin) / cellSize).astype(int), 1)
+        dtype = numpy.int16 if len(rects) < 32767 else numpy.int32
+        self.labels = numpy.zeros((1,) + tuple(shape), dtype=dtype) # [layer, cx, cy]
+
+        # A cell is occupied by a collider if any part of the collider lies inside it. Colliders that overlap go in
+        # separate layers, so every cell lists everything occupying it.
+        for label, (left, top, right, bottom) in enumerate(rects, 1):
+            x0, y0 = numpy.floor((numpy.array([left, top]) - self.origin) / cellSize).astype(int)
+            x1, y1 = numpy.ceil((numpy.array([right, bottom]) - self.origin) / cellSize).astype(int)
+            free = [i for i, layer in enumerate(self.labels) if not layer[x0:x1, y0:y1].any()]
+            if not free:
+                self.labels = numpy.concatenate([self.labels, numpy.zeros((1,) + tuple(shape), dtype=dtype)])
+                free = [len(self.labels) - 1]
+            self.labels[free[0], x0:x1, y0:y1] = label
+        self.occupied = (self.labels != 0).any(axis=0) # Lets most boxes be ruled out with a single lookup
+
+    def __contains__(self, obj):
+        return id(obj) in self.members
+
+    def _cells(self, low, high):
+        """
+        :return: (xs, ys, inside): the cells covered by each box as (n, samples) arrays of indices clipped to the
+                 mask, and whether each was really inside it
+        """
+        size = self.cellSize
+        local = lambda x: (x - self.origin) / size
+        low, high = local(low), local(high)
+        # Enough samples along each side that no cell the box covers is stepped over
+        samples = int(math.ceil((high - low).max(initial=0))) + 1
+        steps = numpy.linspace(0, 1, max(samples, 2))
+        span = (high - 1e-6 / size) - low
+        xs = numpy.floor(low[:, 0:1] + span[:, 0:1] * steps).astype(int) # (n, samples)
+        ys = numpy.floor(low[:, 1:2] + span[:, 1:2] * steps).astype(int)
+        xs, ys = numpy.repeat(xs, len(steps), axis=1), numpy.tile(ys, (1, len(steps))) # Every pairing of the two
+
+        layers, width, height = self.labels.shape
+        inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        return numpy.clip(xs, 0, width - 1), numpy.clip(ys, 0, height - 1), inside
+
+    def Occupied(self, low, high):
+        """
+        :param low: (n, 2) array of the boxes' top left corners
+        :param high: (n, 2) array of the boxes' bottom right corners
+        :return: Boolean array of which boxes cover a cell that any collider occupies
+        """
+        xs, ys, inside = self._cells(low, high)
+        return (self.occupied[xs, ys] & inside).any(axis=1)
+
+    def Candidates(self, low, high):
+        """
+        Finds the colliders each box could be touching.
+
+        :param low: (n, 2) array of the boxes' top left corners
+        :param high: (n, 2) array of the boxes' bottom right corners
+        :return: (bounds, ids): an (n, k, 4) array of candidate rects, empty candidates being a
+                 rect nothing overlaps, and an (n, k) array of the id() of each candidate collider
+        """
+        xs, ys, inside = self._cells(low, high)
+        labels = numpy.concatenate([numpy.where(inside, layer[xs, ys], 0) for layer in self.labels], axis=1)
+        return self.bounds[labels], self.ids[labels]
@@ -0,0 +1,10 @@
+"""
+The game reads its levels and sprites relative to the repository root and needs no window for the simulation, so
+tests run from the root with SDL's dummy video driver whichever directory pytest was started in.
+"""
+import os, sys
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.chdir(ROOT)
+sys.path.insert(0, ROOT)
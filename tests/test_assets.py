@@ -0,0 +1,44 @@
+import os, threading
+from display import AssetCache
+from constants import imageSize, PLAYER_SPRITE, BALL_SPRITE, BALL_SPRITE_WHITE
+
+def estimate(path):
+    width, height = imageSize(path)
+    return width * height * 4
+
+def wait(cache):
+    cache.worker.submit(lambda: None).result() # The worker runs jobs in order, so everything before this is done
+
+def test_preload_then_load():
+    cache = AssetCache()
+    cache.Preload([PLAYER_SPRITE])
+    assert cache.pendingBytes == estimate(PLAYER_SPRITE)
+    surface = cache.Load(PLAYER_SPRITE)
+    assert surface.get_size() == imageSize(PLAYER_SPRITE)
+    assert cache.pendingBytes == 0 and not cache.pending and cache.misses == 1
+
+def test_pending_images_count_against_the_budget():
+    cache = AssetCache(budget=estimate(PLAYER_SPRITE) + estimate(BALL_SPRITE))
+    cache.Preload([PLAYER_SPRITE, BALL_SPRITE, BALL_SPRITE_WHITE])
+    assert set(cache.pending) == {PLAYER_SPRITE, BALL_SPRITE}
+    assert cache.pendingBytes <= cache.budget
+
+def test_preload_replaces_stale_requests():
+    cache = AssetCache()
+    cache.Preload([PLAYER_SPRITE, BALL_SPRITE])
+    cache.Preload([BALL_SPRITE_WHITE])
+    assert set(cache.pending) == {BALL_SPRITE_WHITE}
+    assert cache.pendingBytes == estimate(BALL_SPRITE_WHITE)
+    cache.Clear()
+    assert not cache.pending and cache.pendingBytes == 0
+
+def test_paths_are_found_on_the_worker():
+    cache = AssetCache()
+    threads = []
+    def getPaths():
+        threads.append(threading.current_thread())
+        return [PLAYER_SPRITE]
+    cache.PreloadFrom(getPaths)
+    wait(cache)
+    assert threads and threads[0] is not threading.main_thread()
+    assert set(cache.pending) == {PLAYER_SPRITE}
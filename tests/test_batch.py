@@ -0,0 +1,11 @@
+import csv, subprocess, sys
+
+def test_small_sweep_exits_cleanly(tmp_path):
+    output = tmp_path / "sweep.csv"
+    finished = subprocess.run([sys.executable, "batch.py", "-l", "1", "2", "--set", "drag=1,1.15", "--seconds", "1",
+                               "-j", "2", "-o", str(output)], capture_output=True, timeout=120)
+    assert finished.returncode == 0, finished.stderr.decode()
+    with open(output, newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert sorted((row["level"], row["drag"]) for row in rows) == \
+           [("1", "1.0"), ("1", "1.15"), ("2", "1.0"), ("2", "1.15")]
@@ -0,0 +1,31 @@
+from physics import BodyArrays, PhysObject, Vec2
+from sim import Simulation, Sprite
+
+def body(x, store=None):
+    return PhysObject((x, 100), Sprite(10, 10), 5, store=store)
+
+def test_vectors_are_made_once_per_body():
+    a = body(0)
+    assert a.pos is a.pos and a.velocity is a.velocity
+
+def test_bodies_are_made_in_the_given_arrays():
+    store = BodyArrays()
+    bodies = [body(x, store) for x in range(0, 200, 20)] # More than the starting capacity
+    assert store.bodies == bodies and [b.row for b in bodies] == list(range(len(bodies)))
+    assert [b.pos.x for b in bodies] == list(range(0, 200, 20))
+
+def test_simulation_shares_one_store():
+    simulation = Simulation(2)
+    assert simulation.bodies.bodies == [simulation.player] + simulation.objects
+    assert all(b.store is simulation.bodies for b in simulation.bodies.bodies)
+
+def test_vectors_follow_their_body_between_rows():
+    store = BodyArrays()
+    a, b, c = body(1, store), body(2, store), body(3, store)
+    velocity = a.velocity
+    velocity.x = 7
+    store.Swap(a.row, c.row)
+    assert a.row == 2 and velocity.x == 7 and c.velocity.x == 0 and a.pos.x == 1
+    store.Remove(b)
+    velocity.y = 4
+    assert (a.velocity.x, a.velocity.y) == (7, 4) and a.pos == Vec2(1, 100) and c.pos == Vec2(3, 100)
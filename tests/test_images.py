@@ -0,0 +1,28 @@
+import glob, os
+import pygame, pytest
+from constants import imageSize, METRE, PLAYER_SPRITE
+from physics import RotationCache
+from sim import Simulation, Sprite
+
+@pytest.mark.parametrize("path", sorted(glob.glob(os.path.join("assets", "sprites", "*.png"))))
+def test_header_size_matches_decoded(path):
+    assert imageSize(path) == pygame.image.load(path).get_size()
+
+def test_metre_is_the_player_height_over_1_7():
+    assert METRE == pytest.approx(pygame.image.load(PLAYER_SPRITE).get_height() / 1.7)
+
+def test_headless_sprites_share_rotations():
+    cache = RotationCache(step=1, maxsize=720)
+    for _ in range(3): # Each Simulation loads its own Sprites
+        player = Simulation(1).player
+        for angle in range(0, 90, 5):
+            cache.Get(player.image_clean, angle)
+    assert len(cache.images) == 18
+    assert Sprite(14, 39) != pygame.Surface((14, 39)) and Sprite(14, 39) != Sprite(39, 14)
+
+def test_prebuild_fills_every_angle():
+    cache = RotationCache(step=2, maxsize=720)
+    image = pygame.Surface((14, 39))
+    cache.Prebuild(image)
+    assert len(cache.images) == 180
+    assert cache.Get(image, 91) is cache.images[(image, 92)]
@@ -0,0 +1,70 @@
+import os, shutil, threading
+import numpy
+from sim import level as levels
+from sim.level import level_cached, level_compile, level_read, level_write, LEVEL_BINARY, LEVEL_SOURCES
+
+def copyLevel(tmp_path, monkeypatch, level="1"):
+    """Copies a level's CSVs, without its compiled file, into a scratch levels directory and works from there"""
+    os.makedirs(tmp_path / "levels" / level)
+    for name in LEVEL_SOURCES:
+        shutil.copy(os.path.join("levels", level, name), tmp_path / "levels" / level / name)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path / "levels" / level
+
+def test_compiles_once_and_reads_back(tmp_path, monkeypatch):
+    directory = copyLevel(tmp_path, monkeypatch)
+    arrays = level_cached(1)
+    binary = directory / LEVEL_BINARY
+    written = os.stat(binary).st_mtime_ns
+    cached = level_cached(1)
+    assert os.stat(binary).st_mtime_ns == written # Not compiled again
+    assert isinstance(cached["world"].base, numpy.memmap)
+    for name, array in level_compile(1).items():
+        assert numpy.array_equal(cached[name], array) and numpy.array_equal(arrays[name], array)
+
+def test_changed_csv_recompiles(tmp_path, monkeypatch):
+    directory = copyLevel(tmp_path, monkeypatch)
+    world = len(level_cached(1)["world"])
+    with open(directory / "world.csv", "a") as file:
+        file.write("10,20,30,40\n")
+    stat = os.stat(directory / "world.csv")
+    os.utime(directory / "world.csv", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9)) # However coarse the clock
+    assert len(level_cached(1)["world"]) == world + 1
+    assert tuple(level_read(str(directory / LEVEL_BINARY))["world"][-1]) == (10, 20, 30, 40, -1)
+
+def test_unreadable_binary_recompiles(tmp_path, monkeypatch):
+    directory = copyLevel(tmp_path, monkeypatch)
+    level_cached(1)
+    (directory / LEVEL_BINARY).write_bytes(b"PHXL\xff\xff\xff\xff")
+    assert level_read(str(directory / LEVEL_BINARY)) is None
+    assert numpy.array_equal(level_cached(1)["world"], level_compile(1)["world"])
+    assert level_read(str(directory / LEVEL_BINARY)) is not None
+
+def test_concurrent_writes_leave_a_whole_file(tmp_path, monkeypatch):
+    directory = copyLevel(tmp_path, monkeypatch)
+    arrays = level_compile(1)
+    path = str(directory / LEVEL_BINARY)
+    threads = [threading.Thread(target=lambda: [level_write(arrays, path) for _ in range(20)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    written = level_read(path)
+    assert all(numpy.array_equal(written[name], array) for name, array in arrays.items())
+    assert sorted(os.listdir(directory)) == sorted(LEVEL_SOURCES + (LEVEL_BINARY,)) # No temp files left behind
+
+def test_csv_saved_while_compiling_recompiles(tmp_path, monkeypatch):
+    directory = copyLevel(tmp_path, monkeypatch)
+    read = levels.csv.reader
+    def edited(file):
+        rows = list(read(file))
+        if file.name.endswith("world.csv"): # Saved again just after the compile has read it
+            with open(directory / "world.csv", "a") as changed:
+                changed.write("10,20,30,40\n")
+            stat = os.stat(directory / "world.csv")
+            os.utime(directory / "world.csv", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        return iter(rows)
+    monkeypatch.setattr(levels.csv, "reader", edited)
+    world = len(level_cached(1)["world"])
+    monkeypatch.setattr(levels.csv, "reader", read)
+    assert len(level_cached(1)["world"]) == world + 1
@@ -0,0 +1,40 @@
+import numpy
+import pytest
+from physics import ParticleHandler
+
+def pool(n, capacity=64):
+    """A pool of n particles, each with its number stored in every field so rows can be told apart"""
+    particles = ParticleHandler(capacity)
+    for i in range(n):
+        particles.Add([(i, -i)], [(2 * i, 3 * i)], i + 1, (i, i, i), radius=i, extent=i, bounce=i, endRadius=i,
+                      weightless=i % 2 == 1, colSim=i % 3 == 0)
+    return particles
+
+def rows(particles):
+    """:return: Each live particle as a tuple of everything stored about it"""
+    return [tuple(numpy.concatenate([numpy.ravel(field[i]) for field in particles.Fields()]).tolist())
+            for i in range(particles.count)]
+
+@pytest.mark.parametrize("seed", range(20))
+def test_compact_keeps_exactly_the_live_particles(seed):
+    rng = numpy.random.default_rng(seed)
+    n = int(rng.integers(0, 65))
+    particles = pool(n)
+    before = rows(particles)
+    alive = rng.random(n) < rng.random()
+    particles.Compact(alive)
+    after = rows(particles)
+    assert particles.count == alive.sum()
+    assert sorted(after) == sorted(x for x, keep in zip(before, alive) if keep)
+    # Live particles that were already inside the new end of the pool stay where they were
+    assert all(after[i] == before[i] for i in numpy.flatnonzero(alive[:particles.count]))
+
+def test_compact_all_or_nothing():
+    particles = pool(10)
+    before = rows(particles)
+    particles.Compact(numpy.ones(10, bool))
+    assert rows(particles) == before
+    particles.Compact(numpy.zeros(10, bool))
+    assert particles.count == 0
+    particles.Add([(1, 1)], [(0, 0)], 1, (255, 0, 0))
+    assert particles.count == 1 and tuple(particles.pos[0]) == (1, 1)
@@ -0,0 +1,57 @@
+import math, random
+import pygame, pytest
+from raycast import raycast, raycastMany, raycastRays, raycastPairs, rectArray, closestHit, MISS
+
+RECT = pygame.Rect(10, 20, 30, 40) # Covers 10 <= x < 40 and 20 <= y < 60
+
+def inside(x, y, rect=RECT):
+    return rect.left <= x < rect.right and rect.top <= y < rect.bottom
+
+@pytest.mark.parametrize("origin, direction, hit", [
+    ((0, 30), (1, 0), True),       # Straight through
+    ((10, 0), (0, 1), True),       # Along the left edge, which is in the rect
+    ((40, 0), (0, 1), False),      # Along the right edge, which isn't
+    ((0, 20), (1, 0), True),       # Along the top edge
+    ((0, 60), (1, 0), False),      # Along the bottom edge
+    ((50, 30), (-1, 0), True),     # Coming from the right
+    ((40, 30), (1, 0), False),     # Starting on the right edge, going away
+    ((10, 30), (-1, 0), True),     # Starting on the left edge, which is inside
+    ((0, 50), (1, 1), False),      # Only touching the bottom-left corner, which isn't in the rect
+    ((0, 30), (1, -1), True),      # Only touching the top-left corner, which is
+])
+def test_edges_match_pygame(origin, direction, hit):
+    assert bool(raycast(origin, direction, RECT)) is hit
+    assert bool(raycastMany(origin, direction, [RECT])[0][0]) is hit
+    assert bool(raycastRays([origin], [direction], RECT)[0][0]) is hit
+    assert bool(raycastPairs([origin], [direction], rectArray([RECT]))[0][0]) is hit
+
+def test_hit_point_is_in_the_rect():
+    rng = random.Random(1)
+    for _ in range(2000):
+        origin = (rng.uniform(-20, 70), rng.uniform(-20, 90))
+        angle = rng.uniform(0, 2 * math.pi)
+        direction = (math.cos(angle), math.sin(angle))
+        result = raycast(origin, direction, RECT)
+        many = raycastMany(origin, direction, [RECT])
+        assert bool(many[0][0]) == result.hit
+        if result:
+            assert many[1][0] == pytest.approx(result.distance)
+            # Just past the entry point the ray is inside the half-open rect
+            x, y = origin[0] + direction[0] * (result.distance + 1e-6), origin[1] + direction[1] * (result.distance + 1e-6)
+            assert inside(x, y)
+        elif inside(*origin):
+            pytest.fail(f"Ray from inside the rect at {origin} missed")
+
+def test_origin_inside():
+    result = raycast((20, 30), (0, -1), RECT)
+    assert result.hit and result.distance == 0 and result.normal == (0, 0)
+
+def test_normal_and_distance():
+    result = raycast((0, 30), (2, 0), RECT)
+    assert result.distance == 10 and result.point == (10, 30) and result.normal == (-1, 0)
+
+def test_miss_is_immutable():
+    assert raycast((0, 0), (0, 0), RECT) is MISS
+    with pytest.raises(AttributeError):
+        MISS.hit = True
+    assert not MISS and closestHit((0, 0), (1, 0), [])[1] is MISS
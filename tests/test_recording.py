@@ -0,0 +1,42 @@
+import random
+import numpy
+from sim import Simulation, Inputs, Recording, replay
+from sim.recording import MAX_RUN
+
+def fly(level, steps, seed):
+    """Plays a level with random inputs while recording them, returning the Simulation and the Recording"""
+    rng = random.Random(seed)
+    simulation = Simulation(level)
+    recording = Recording(level, simulation.constants)
+    script = [0] * (MAX_RUN + 10) # Longer than one run can hold
+    while len(script) < steps:
+        script += [rng.choice([0, 1, 1, 2, 4, 8, 5, 9])] * rng.randint(1, 60)
+    for bits in script[:steps]:
+        inputs = Inputs.Unpack(bits)
+        recording.Record(inputs)
+        simulation.Step(inputs, recording.dt)
+        if simulation.Finished():
+            break
+    return simulation, recording
+
+def test_runs_are_split_and_packed():
+    recording = Recording(1, {"gravity": 15, "airdensity": 1.2})
+    for _ in range(MAX_RUN + 3):
+        recording.Record(Inputs(thrust=True))
+    recording.Record(Inputs(left=True))
+    assert recording.runs == [[1, MAX_RUN], [1, 3], [4, 1]]
+    assert recording.Steps() == MAX_RUN + 4
+    assert list(recording.StepInputs())[-1] == Inputs(left=True)
+
+def test_text_round_trip():
+    _, recording = fly(2, 6000, 1)
+    copy = Recording.FromText(recording.ToText())
+    assert (copy.level, copy.constants, copy.dt, copy.runs) == \
+           (recording.level, recording.constants, recording.dt, recording.runs)
+
+def test_replay_is_bit_identical():
+    for level, seed in ((1, 0), (2, 1), (3, 2)):
+        simulation, recording = fly(level, 6000, seed)
+        replayed = replay(Recording.FromText(recording.ToText()))
+        assert numpy.array_equal(replayed.Snapshot(), simulation.Snapshot())
+        assert replayed.Score() == simulation.Score()
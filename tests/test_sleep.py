@@ -0,0 +1,48 @@
+import pytest
+import physics
+from physics import Vec2
+from sim import Simulation, Inputs
+
+def hitResting(level, sleepTime, monkeypatch):
+    """Lets a level's first object settle, throws the player into it and returns where everything ends up"""
+    monkeypatch.setattr(physics, "SLEEP_TIME", sleepTime)
+    simulation = Simulation(level)
+    target, player = simulation.objects[0], simulation.player
+    simulation.Run(Inputs(), 1000)
+    asleep = simulation.bodies.Asleep(target)
+    player.pos = Vec2(target.pos.x - 60, target.pos.y - 5)
+    player.rect.center = tuple(player.pos)
+    simulation.grid.Update(player)
+    player.velocity = Vec2(30, 0)
+    woke = False
+    trace = []
+    for _ in range(600):
+        simulation.Step(Inputs(), 1 / 200)
+        woke = woke or not simulation.bodies.Asleep(target)
+        trace.append((tuple(target.pos), tuple(target.velocity), tuple(player.pos), tuple(player.velocity)))
+    return asleep, woke, trace
+
+@pytest.mark.parametrize("level", [2, 3])
+def test_hitting_a_sleeping_body_matches_no_sleep(level, monkeypatch):
+    asleep, woke, trace = hitResting(level, 1, monkeypatch)
+    _, _, reference = hitResting(level, 0, monkeypatch)
+    assert asleep and woke
+    assert trace == reference
+    assert reference[-1][0] != reference[0][0] # The hit actually moved it
+
+def test_sleep_clears_motion(monkeypatch):
+    simulation = Simulation(2)
+    body, store = simulation.objects[0], simulation.bodies
+    body.velocity = Vec2(0.005, 0)
+    body.momentum = body.velocity * body.mass
+    store.Sleep(body)
+    assert store.Asleep(body)
+    assert body.velocity == Vec2(0, 0) and body.momentum == Vec2(0, 0) and body.acceleration == Vec2(0, 0)
+
+def test_sleeping_bodies_are_not_stepped():
+    simulation = Simulation(2)
+    simulation.Run(Inputs(), 1000)
+    assert simulation.bodies.awake == 1 # Only the player, which never sleeps
+    positions = [tuple(x.pos) for x in simulation.objects]
+    simulation.Run(Inputs(), 200)
+    assert [tuple(x.pos) for x in simulation.objects] == positions
@@ -0,0 +1,51 @@
+import random
+import numpy
+from sim import Simulation, Inputs, SnapshotRing
+
+def script(seed, steps):
+    rng = random.Random(seed)
+    bits = []
+    while len(bits) < steps:
+        bits += [rng.choice([0, 1, 1, 2, 4, 8, 5, 9])] * rng.randint(1, 60)
+    return [Inputs.Unpack(x) for x in bits[:steps]]
+
+def run(simulation, inputs):
+    for x in inputs:
+        simulation.Step(x, 1 / 200)
+    return simulation.Snapshot()
+
+def test_restore_round_trips():
+    simulation = Simulation(2)
+    run(simulation, script(0, 1500))
+    state = simulation.Snapshot()
+    run(simulation, script(1, 500))
+    simulation.Restore(state)
+    assert numpy.array_equal(simulation.Snapshot(), state)
+
+def test_forked_and_rewound_runs_match_the_original():
+    for level in (1, 2, 3):
+        before, after = script(level, 1500), script(level + 10, 2500)
+        simulation = Simulation(level)
+        run(simulation, before)
+        state = simulation.Snapshot()
+        original = run(simulation, after)
+
+        fork = Simulation(level)
+        fork.Restore(state)
+        assert numpy.array_equal(run(fork, after), original)
+
+        simulation.Restore(state) # Rewinding the same simulation, whose bodies may have swapped rows since
+        assert numpy.array_equal(run(simulation, after), original)
+
+def test_ring_rewinds_and_drops_the_oldest():
+    simulation = Simulation(2)
+    ring = SnapshotRing(3)
+    states = []
+    for inputs in numpy.array_split(script(5, 1000), 5):
+        run(simulation, inputs)
+        ring.Push(simulation)
+        states.append(simulation.Snapshot())
+    assert len(ring) == 3 and ring.Get(3) is None
+    assert ring.Rewind(simulation, 2)
+    assert numpy.array_equal(simulation.Snapshot(), states[2])
+    assert len(ring) == 1 and numpy.array_equal(ring.Get(), states[2])
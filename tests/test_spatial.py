@@ -0,0 +1,51 @@
+import random
+import pygame
+from physics import WorldCollider
+from spatial import SpatialHash, SweepAndPrune
+
+def boxes(rng, n, size=600):
+    return [WorldCollider(pygame.Rect(rng.randrange(-100, size), rng.randrange(-100, size), rng.randrange(0, 120),
+                                      rng.randrange(0, 120))) for _ in range(n)]
+
+def touching(a, b):
+    """Overlapping or sharing an edge, which is what contact queries need to find"""
+    return a.left <= b.right and b.left <= a.right and a.top <= b.bottom and b.top <= a.bottom
+
+def test_query_finds_everything_touching():
+    rng = random.Random(0)
+    objects = boxes(rng, 200)
+    grid = SpatialHash(objects, cellSize=64)
+    for _ in range(50):
+        for obj in rng.sample(objects, 40):
+            obj.rect.move_ip(rng.randrange(-50, 51), rng.randrange(-50, 51))
+            grid.Update(obj)
+        for obj in objects:
+            found = grid.Query(obj.rect, exclude=obj)
+            assert obj not in found
+            assert {x for x in objects if x is not obj and touching(x.rect, obj.rect)} <= set(found)
+            assert found == sorted(found, key=objects.index) # Insertion order
+
+def test_remove_and_kind():
+    rng = random.Random(1)
+    objects = boxes(rng, 50)
+    grid = SpatialHash(objects)
+    everything = pygame.Rect(-1000, -1000, 3000, 3000)
+    for obj in objects[::2]:
+        grid.Remove(obj)
+    assert grid.Query(everything) == objects[1::2] and len(grid) == 25
+    assert grid.Query(everything, kind=str) == []
+
+def test_sweep_pairs_match_brute_force():
+    rng = random.Random(2)
+    world = boxes(rng, 120, 400) # Some are empty, which colliderect() never reports
+    sweep = SweepAndPrune()
+    for frame in range(60):
+        if frame % 10 == 5: # Bodies come and go
+            world = world[7:] + boxes(rng, 7, 400)
+        for obj in world:
+            obj.rect.move_ip(rng.randrange(-8, 9), rng.randrange(-8, 9))
+        sweep.Sync(world)
+        pairs = sweep.Pairs()
+        assert len(pairs) == len({frozenset(x) for x in pairs}) # Each pair once
+        assert {frozenset(x) for x in pairs} == {frozenset((a, b)) for i, a in enumerate(world) for b in world[i + 1:]
+                                                if a.rect.colliderect(b.rect)}
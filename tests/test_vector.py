@@ -0,0 +1,61 @@
+import random
+import numpy
+import pytest
+from sim import Simulation, Inputs, VectorEnv
+
+# Packed Inputs held for a number of steps. This one flies up the level 3 updraft, leaves it along the ceiling, drops
+# onto the ball to knock it into the other objective and rides the updraft back up to the top one.
+FINISHES_LEVEL_3 = [(9, 67), (1, 62), (8, 31), (0, 1529), (1, 206), (4, 157), (5, 59), (1, 161), (4, 32), (0, 844)]
+
+def expand(runs):
+    return [bits for bits, steps in runs for _ in range(steps)]
+
+def wander(seed, steps):
+    """:return: A reproducible script of random inputs, each held for a while"""
+    rng = random.Random(seed)
+    script = []
+    while len(script) < steps:
+        script += [rng.choice([0, 1, 1, 1, 2, 4, 8, 5, 9])] * rng.randint(5, 80)
+    return script[:steps]
+
+def stepTogether(level, scripts):
+    """
+    Runs each script in its own Simulation and in one VectorEnv with a copy per script, checking that every body,
+    objective and the outcome agree after every step
+
+    :return: (done, reward) of each copy when its script ended or its level finished
+    """
+    simulations = [Simulation(level) for _ in scripts]
+    env = VectorEnv(level, autoreset=False)
+    env.Reset(len(scripts))
+    results = [None] * len(scripts)
+    for t in range(max(len(x) for x in scripts)):
+        actions = numpy.array([x[t] if t < len(x) else 0 for x in scripts])
+        _, rewards, done = env.Step(actions)
+        for i, simulation in enumerate(simulations):
+            if results[i] is not None:
+                continue
+            simulation.Step(Inputs.Unpack(scripts[i][t]), env.dt)
+            bodies = simulation.objects + [simulation.player]
+            rows = slice(i * env.B, (i + 1) * env.B)
+            assert [tuple(x) for x in env.pos[rows]] == [tuple(x.pos) for x in bodies], f"step {t}"
+            assert [tuple(x) for x in env.velocity[rows]] == [tuple(x.velocity) for x in bodies], f"step {t}"
+            assert list(env.complete[i]) == [x.complete for x in simulation.objectives], f"step {t}"
+            assert (env.fuel[i], env.angle[i], env.collisions[i]) == \
+                   (simulation.player.fuel, simulation.player.angle, simulation.player.collisions)
+            assert done[i] == simulation.Finished(), f"step {t}"
+            if done[i] or t == len(scripts[i]) - 1:
+                if done[i]:
+                    assert rewards[i] == simulation.Score()[0]
+                results[i] = done[i], rewards[i]
+    return results
+
+def test_completing_a_level_matches_simulation():
+    finishes = expand(FINISHES_LEVEL_3)
+    (done, reward), (wandered, _) = stepTogether(3, [finishes, wander(0, len(finishes))])
+    assert done and reward > 0
+    assert not wandered
+
+@pytest.mark.parametrize("level", [1, 2])
+def test_pushing_objects_matches_simulation(level):
+    stepTogether(level, [wander(seed, 3000) for seed in range(3)])
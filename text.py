@@ -0,0 +1,52 @@
+"""
+Caching for fonts and rendered text. Fonts are loaded once per file and size, and rendered strings are kept so that
+text which hasn't changed since the last frame costs a blit rather than a render.
+"""
+from collections import OrderedDict
+import pygame
+from constants import TEXT_CACHE_SIZE
+
+fonts = {} # (path, size) -> Font
+
+def getFont(path, size):
+    """
+    :param path: Font file, or None for pygame's default font
+    :param int size: Point size
+    :return: The Font, loading it the first time it is asked for
+    """
+    font = fonts.get((path, size))
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = fonts[(path, size)] = pygame.font.Font(path, size)
+    return font
+
+class TextCache:
+    def __init__(self, maxsize=TEXT_CACHE_SIZE):
+        """
+        :param int maxsize: Most rendered strings kept; the least recently used are dropped first
+        """
+        self.maxsize = maxsize
+        self.surfaces = OrderedDict() # (font, text, colour, antialias) -> Surface, oldest first
+        self.hits = 0
+        self.misses = 0
+    def Render(self, font, text, colour, antialias=True):
+        """Font.render, reusing the surface from last time for the same font, text, colour and antialiasing"""
+        key = (font, text, tuple(colour), antialias)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            self.misses += 1
+            surface = self.surfaces[key] = font.render(text, antialias, colour)
+            if len(self.surfaces) > self.maxsize:
+                self.surfaces.popitem(last=False)
+        else:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+        return surface
+    def Clear(self):
+        self.surfaces.clear()
+        self.hits = self.misses = 0
+    def __len__(self):
+        return len(self.surfaces)
+
+textCache = TextCache()